@@ -0,0 +1,68 @@
+"""
+Blink GPT - Autômato de Aho-Corasick
+Verifica milhares de padrões em uma única passada pelo texto
+"""
+
+
+class AhoCorasick:
+    """Autômato de busca de vários padrões ao mesmo tempo"""
+
+    def __init__(self, patterns):
+        self.patterns = []
+        self.goto = [{}]
+        self.fail = [0]
+        self.output = [()]  # índices dos padrões que terminam no estado (ou via falha)
+
+        seen = set()
+        for pattern in patterns:
+            if not pattern or pattern in seen:
+                continue
+            seen.add(pattern)
+            state = 0
+            for char in pattern:
+                next_state = self.goto[state].get(char)
+                if next_state is None:
+                    next_state = len(self.goto)
+                    self.goto[state][char] = next_state
+                    self.goto.append({})
+                    self.fail.append(0)
+                    self.output.append(())
+                state = next_state
+            self.output[state] = (len(self.patterns),)
+            self.patterns.append(pattern)
+
+        # Links de falha em largura (BFS); saídas herdadas pelo link de falha
+        queue = list(self.goto[0].values())
+        for state in queue:
+            for char, next_state in self.goto[state].items():
+                queue.append(next_state)
+                fallback = self.fail[state]
+                while fallback and char not in self.goto[fallback]:
+                    fallback = self.fail[fallback]
+                self.fail[next_state] = self.goto[fallback].get(char, 0)
+                self.output[next_state] += self.output[self.fail[next_state]]
+
+    def __len__(self):
+        return len(self.patterns)
+
+    def first_match(self, text):
+        """Primeiro padrão encontrado no texto (o que termina antes), ou None
+
+        Só vale o padrão que começa e termina em limite de palavra: "ana"
+        encontra "a ana", mas não "analise" nem "semana".
+        """
+        state = 0
+        goto, fail, output, patterns = self.goto, self.fail, self.output, self.patterns
+        for end, char in enumerate(text, 1):
+            while state and char not in goto[state]:
+                state = fail[state]
+            state = goto[state].get(char, 0)
+            if not output[state]:
+                continue
+            for index in output[state]:
+                start = end - len(patterns[index])
+                starts_word = start == 0 or not text[start - 1].isalnum()
+                ends_word = end == len(text) or not text[end].isalnum()
+                if starts_word and ends_word:
+                    return patterns[index]
+        return None
@@ -0,0 +1,175 @@
+"""
+Blink GPT - Índice aproximado (IVF) dos vetores semânticos
+Um k-means esférico divide as perguntas em listas. A busca compara a consulta
+com os centróides e só pontua as nprobe listas mais próximas, em vez de todas
+as linhas da matriz. Mais listas visitadas = mais recall e mais latência.
+Vetores e índice são gravados ao lado do manual (data/qa_data.semantic.npz) e
+reaproveitados enquanto o JSON não mudar.
+"""
+
+import hashlib
+import json
+import math
+import os
+
+import numpy as np
+
+import semantic
+import stemmer
+from semantic import SemanticIndex
+
+# Manuais a partir deste tamanho usam o índice aproximado (menores: busca exata)
+ANN_MIN_DOCS = int(os.environ.get("BLINK_ANN_MIN_DOCS", "20000"))
+# Listas visitadas por consulta (recall x latência)
+ANN_NPROBE = int(os.environ.get("BLINK_ANN_NPROBE", "8"))
+# Número de listas; 0 = raiz quadrada do número de perguntas
+ANN_LISTS = int(os.environ.get("BLINK_ANN_LISTS", "0"))
+
+KMEANS_ITERATIONS = 10
+# Pontos da amostra de treino do k-means por lista
+KMEANS_SAMPLE_PER_LIST = 64
+
+FORMAT_VERSION = 1
+
+
+def vectors_path_for(json_path):
+    """Arquivo dos vetores ao lado do JSON: data/qa_data.json -> data/qa_data.semantic.npz"""
+    return os.path.splitext(json_path)[0] + ".semantic.npz"
+
+
+def store_signature(extra=()):
+    """Identifica os parâmetros que mudam os vetores gravados (extra: regras do chamador)"""
+    payload = json.dumps([FORMAT_VERSION, semantic.SEMANTIC_DIM, semantic.NGRAM_SIZES,
+                          semantic.HASH_BITS, semantic.TOPIC_WEIGHT, semantic.ANSWER_WEIGHT,
+                          semantic.SVD_SAMPLE, ANN_LISTS, KMEANS_ITERATIONS, stemmer.RULES,
+                          list(extra)])
+    return hashlib.sha256(payload.encode("utf-8")).hexdigest()
+
+
+def _normalized(matrix):
+    return matrix / np.maximum(np.linalg.norm(matrix, axis=1, keepdims=True), 1e-12)
+
+
+def assign_lists(vectors, centroids, block_size=8192):
+    """Centróide mais próximo (maior produto interno) de cada vetor"""
+    labels = np.empty(len(vectors), dtype=np.int64)
+    for start in range(0, len(vectors), block_size):
+        labels[start:start + block_size] = (vectors[start:start + block_size] @ centroids.T).argmax(axis=1)
+    return labels
+
+
+def spherical_kmeans(vectors, n_lists, iterations=KMEANS_ITERATIONS, seed=0):
+    """Centróides de norma 1 treinados em uma amostra dos vetores"""
+    rng = np.random.default_rng(seed)
+    n_sample = min(len(vectors), n_lists * KMEANS_SAMPLE_PER_LIST)
+    sample = vectors[np.sort(rng.choice(len(vectors), n_sample, replace=False))]
+    centroids = sample[rng.choice(n_sample, n_lists, replace=False)].copy()
+
+    for _ in range(iterations):
+        labels = assign_lists(sample, centroids)
+        order = np.argsort(labels, kind="stable")
+        counts = np.bincount(labels, minlength=n_lists)
+        filled = np.flatnonzero(counts)
+        sums = np.add.reduceat(sample[order], np.cumsum(counts)[filled] - counts[filled], axis=0)
+        centroids[filled] = _normalized(sums)
+        # Lista vazia recomeça em um ponto qualquer da amostra
+        empty = np.flatnonzero(counts == 0)
+        if len(empty):
+            centroids[empty] = sample[rng.choice(n_sample, len(empty), replace=False)]
+    return centroids.astype(np.float32)
+
+
+class IVFIndex:
+    """Listas invertidas sobre os vetores: centróides e vetores agrupados por lista
+
+    ids[indptr[l]:indptr[l + 1]] são as posições (no manual) da lista l e
+    vectors guarda as mesmas linhas na mesma ordem, contíguas.
+    """
+
+    def __init__(self, centroids, indptr, ids, vectors, nprobe=ANN_NPROBE):
+        self.centroids = centroids
+        self.indptr = indptr
+        self.ids = ids
+        self.vectors = np.ascontiguousarray(vectors, dtype=np.float32)
+        self.nprobe = nprobe
+
+    @property
+    def n_lists(self):
+        return len(self.centroids)
+
+    @classmethod
+    def build(cls, vectors, n_lists=ANN_LISTS, nprobe=ANN_NPROBE, seed=0):
+        """Agrupa os vetores (linhas de norma 1) em n_lists listas"""
+        n_lists = min(len(vectors), n_lists or max(1, round(math.sqrt(len(vectors)))))
+        centroids = spherical_kmeans(vectors, n_lists, seed=seed)
+        labels = assign_lists(vectors, centroids)
+        ids = np.argsort(labels, kind="stable")
+        indptr = np.zeros(n_lists + 1, dtype=np.int64)
+        np.cumsum(np.bincount(labels, minlength=n_lists), out=indptr[1:])
+        return cls(centroids, indptr, ids, vectors[ids], nprobe)
+
+    def search(self, query, k=1, nprobe=None):
+        """(posições, similaridades) das k melhores nas nprobe listas mais próximas
+
+        Ordem: maior similaridade primeiro; no empate, a primeira pergunta do
+        manual (como o argmax da busca exata).
+        """
+        nprobe = min(nprobe or self.nprobe, self.n_lists)
+        probed = np.argpartition(-(self.centroids @ query), nprobe - 1)[:nprobe]
+        spans = [(self.indptr[l], self.indptr[l + 1]) for l in probed.tolist()]
+        spans = [(a, b) for a, b in spans if b > a]
+        if not spans:
+            return np.empty(0, dtype=np.int64), np.empty(0, dtype=np.float32)
+
+        # Um produto matriz-vetor por lista (fatias contíguas, sem cópia)
+        scores = np.concatenate([self.vectors[a:b] @ query for a, b in spans])
+        positions = np.concatenate([self.ids[a:b] for a, b in spans])
+        k = min(k, len(scores))
+        best = np.argpartition(-scores, k - 1)[:k]
+        best = best[np.lexsort((positions[best], -scores[best]))]
+        return positions[best], scores[best]
+
+
+def save_vectors(path, index, source_hash, signature):
+    """Grava vetores (e o IVF, se houver) em .npz; troca atômica do arquivo"""
+    arrays = {
+        "buckets": index.buckets,
+        "idf": index.idf,
+        "projection": index.projection,
+        "vectors": index.vectors,
+    }
+    if index.ann is not None:
+        arrays.update(centroids=index.ann.centroids, indptr=index.ann.indptr, ids=index.ann.ids)
+    header = {"format_version": FORMAT_VERSION, "signature": signature, "source_hash": source_hash}
+
+    tmp_path = path + ".tmp"
+    with open(tmp_path, "wb") as f:
+        np.savez(f, header=np.array(json.dumps(header)), **arrays)
+    os.replace(tmp_path, path)
+
+
+def load_vectors(path, source_hash, signature):
+    """Índice semântico gravado; None se ausente, inválido ou de outra versão do manual"""
+    try:
+        with np.load(path, allow_pickle=False) as data:
+            header = json.loads(str(data["header"]))
+            if (header.get("format_version") != FORMAT_VERSION or header.get("signature") != signature
+                    or header.get("source_hash") != source_hash):
+                return None
+            arrays = {name: data[name] for name in data.files if name != "header"}
+    except (OSError, ValueError, KeyError):
+        return None
+
+    index = SemanticIndex(arrays["buckets"], arrays["idf"], arrays["projection"], arrays["vectors"])
+    if "centroids" in arrays:
+        ids = arrays["ids"]
+        index.ann = IVFIndex(arrays["centroids"], arrays["indptr"], ids, index.vectors[ids])
+    return index
+
+
+def build_ann(index, min_docs=ANN_MIN_DOCS):
+    """Anexa o IVF ao índice semântico se o manual for grande; retorna True se anexou"""
+    if index.n_docs < max(1, min_docs) or index.ann is not None:
+        return False
+    index.ann = IVFIndex.build(index.vectors)
+    return True
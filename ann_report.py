@@ -0,0 +1,155 @@
+#!/usr/bin/env python3
+"""
+Blink GPT - Recall x latência do índice aproximado (IVF) contra a busca exata
+Para cada nprobe, mede quantas das k melhores perguntas da busca exata o IVF
+encontra e quanto tempo cada consulta leva.
+
+Uso:
+    python ann_report.py [--input data/qa_data.json] [--synthetic 100000]
+                         [--nprobe 1,2,4,8,16,32] [--queries 1000] [--k 10] [--lists 0] [--json]
+"""
+
+import argparse
+import json
+import sys
+import time
+
+import numpy as np
+
+import qa_engine
+from ann_index import ANN_LISTS, IVFIndex
+from benchmark import generate_corpus, make_queries, percentile
+from qa_engine import DATA_PATH, build_index, load_corpus
+
+DEFAULT_NPROBES = "1,2,4,8,16,32"
+
+
+def query_vectors(qa_data, semantic, n_queries, seed=7):
+    """Vetores das perguntas de teste (mesma mistura do benchmark)"""
+    vectors = []
+    for _, text in make_queries(qa_data, n_queries, seed=seed):
+        words = qa_engine.stem_words(qa_engine.tokenize(qa_engine.normalize_text(text)))
+        query = semantic.embed(qa_engine.expand_query(words)) if words else None
+        if query is not None:
+            vectors.append(query)
+    return vectors
+
+
+def exact_top_k(vectors, query, k):
+    """k melhores da busca exata, na mesma ordem do IVF"""
+    scores = vectors @ query
+    best = np.argpartition(-scores, k - 1)[:k]
+    return best[np.lexsort((best, -scores[best]))]
+
+
+def timed(function, *args):
+    started = time.perf_counter_ns()
+    result = function(*args)
+    return result, (time.perf_counter_ns() - started) / 1e6
+
+
+def run_report(semantic, queries, nprobes, k, n_lists):
+    """Recall@1, recall@k e latências do IVF para cada nprobe"""
+    k = min(k, semantic.n_docs)
+    started = time.perf_counter()
+    ivf = IVFIndex.build(semantic.vectors, n_lists=n_lists)
+    build_s = time.perf_counter() - started
+
+    exact = []
+    exact_ms = []
+    for query in queries:
+        best, elapsed = timed(exact_top_k, semantic.vectors, query, k)
+        exact.append(best)
+        exact_ms.append(elapsed)
+    exact_ms.sort()
+    exact_p50 = percentile(exact_ms, 50)
+
+    sizes = np.diff(ivf.indptr)
+    rows = []
+    for nprobe in nprobes:
+        hits_1 = 0
+        hits_k = 0
+        latencies = []
+        scanned = 0
+        for query, expected in zip(queries, exact):
+            (positions, _), elapsed = timed(ivf.search, query, k, nprobe)
+            latencies.append(elapsed)
+            hits_1 += bool(len(positions)) and positions[0] == expected[0]
+            hits_k += len(np.intersect1d(positions, expected))
+            probed = np.argpartition(-(ivf.centroids @ query), min(nprobe, ivf.n_lists) - 1)[:nprobe]
+            scanned += int(sizes[probed].sum())
+        latencies.sort()
+        p50 = percentile(latencies, 50)
+        rows.append({
+            "nprobe": nprobe,
+            "recall_at_1": hits_1 / len(queries),
+            f"recall_at_{k}": hits_k / (k * len(queries)),
+            "p50_ms": p50,
+            "p95_ms": percentile(latencies, 95),
+            "speedup": exact_p50 / p50 if p50 else None,
+            "scanned": scanned / (len(queries) * semantic.n_docs),
+        })
+
+    return {
+        "size": semantic.n_docs,
+        "dim": semantic.dim,
+        "lists": ivf.n_lists,
+        "queries": len(queries),
+        "k": k,
+        "ivf_build_s": round(build_s, 3),
+        "exact_p50_ms": exact_p50,
+        "exact_p95_ms": percentile(exact_ms, 95),
+        "rows": rows,
+    }
+
+
+def print_report(report):
+    k = report["k"]
+    print(f"📐 {report['size']} perguntas, {report['dim']} dimensões, {report['lists']} listas "
+          f"(IVF construído em {report['ivf_build_s']} s)")
+    print(f"🎯 Busca exata: p50 {report['exact_p50_ms']:.3f} ms, p95 {report['exact_p95_ms']:.3f} ms "
+          f"({report['queries']} consultas)")
+    print()
+    print(f"{'nprobe':>6}  {'recall@1':>8}  {f'recall@{k}':>9}  {'p50 ms':>8}  {'p95 ms':>8}  "
+          f"{'ganho':>6}  {'varrido':>7}")
+    for row in report["rows"]:
+        print(f"{row['nprobe']:>6}  {row['recall_at_1']:>8.3f}  {row[f'recall_at_{k}']:>9.3f}  "
+              f"{row['p50_ms']:>8.3f}  {row['p95_ms']:>8.3f}  {row['speedup']:>5.1f}x  "
+              f"{row['scanned']:>6.1%}")
+
+
+def main():
+    """Linha de comando"""
+    parser = argparse.ArgumentParser(description="Recall x latência do índice aproximado (IVF)")
+    parser.add_argument("--input", default=DATA_PATH, help="manual (JSON)")
+    parser.add_argument("--synthetic", type=int, help="usa um manual sintético com este número de perguntas")
+    parser.add_argument("--nprobe", default=DEFAULT_NPROBES, help="valores de nprobe, separados por vírgula")
+    parser.add_argument("--queries", type=int, default=1000, help="perguntas de teste")
+    parser.add_argument("--k", type=int, default=10, help="tamanho da lista comparada (recall@k)")
+    parser.add_argument("--lists", type=int, default=ANN_LISTS, help="listas do IVF (0 = raiz do tamanho)")
+    parser.add_argument("--json", action="store_true", help="saída em JSON")
+    args = parser.parse_args()
+
+    if args.synthetic:
+        qa_data = build_index(generate_corpus(args.synthetic))
+    else:
+        qa_data = load_corpus(args.input)
+
+    print("⏳ Calculando vetores...", file=sys.stderr)
+    semantic = qa_data["index"].semantic
+    queries = query_vectors(qa_data, semantic, args.queries)
+    if not queries:
+        print("❌ Nenhuma pergunta de teste com palavras conhecidas", file=sys.stderr)
+        return 1
+
+    nprobes = [int(value) for value in args.nprobe.split(",") if value]
+    report = run_report(semantic, queries, nprobes, args.k, args.lists)
+    if args.json:
+        print(json.dumps(report, indent=2))
+    else:
+        print_report(report)
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
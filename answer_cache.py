@@ -0,0 +1,76 @@
+"""
+Blink GPT - Cache de respostas compartilhado entre sessões
+LRU com expiração (TTL); a versão do manual faz parte da chave, então
+manuais diferentes (ou versões recarregadas) nunca trocam respostas entre si
+"""
+
+import threading
+import time
+from collections import OrderedDict
+
+
+class AnswerCache:
+    """Cache LRU + TTL de respostas, seguro para várias threads"""
+
+    def __init__(self, max_size=1024, ttl=3600.0):
+        self.max_size = max_size
+        self.ttl = ttl
+        self._entries = OrderedDict()
+        self._lock = threading.Lock()
+        self.hits = 0
+        self.misses = 0
+        self.evictions = 0
+        self.expirations = 0
+
+    def get(self, key, version):
+        """Retorna o valor guardado ou None"""
+        key = (version, key)
+        with self._lock:
+            entry = self._entries.get(key)
+            if entry is None:
+                self.misses += 1
+                return None
+
+            expires_at, value = entry
+            if expires_at < time.monotonic():
+                del self._entries[key]
+                self.expirations += 1
+                self.misses += 1
+                return None
+
+            self._entries.move_to_end(key)
+            self.hits += 1
+            return value
+
+    def put(self, key, version, value):
+        """Guarda um valor, removendo os menos usados se passar do limite"""
+        if self.max_size <= 0:
+            return
+        # Versões antigas deixam de ser consultadas e saem pelo LRU
+        key = (version, key)
+        with self._lock:
+            self._entries[key] = (time.monotonic() + self.ttl, value)
+            self._entries.move_to_end(key)
+            while len(self._entries) > self.max_size:
+                self._entries.popitem(last=False)
+                self.evictions += 1
+
+    def clear(self):
+        """Esvazia o cache (os contadores são mantidos)"""
+        with self._lock:
+            self._entries.clear()
+
+    def stats(self):
+        """Contadores para dimensionar o cache"""
+        with self._lock:
+            lookups = self.hits + self.misses
+            return {
+                "size": len(self._entries),
+                "max_size": self.max_size,
+                "ttl": self.ttl,
+                "hits": self.hits,
+                "misses": self.misses,
+                "evictions": self.evictions,
+                "expirations": self.expirations,
+                "hit_rate": self.hits / lookups if lookups else 0.0,
+            }
@@ -0,0 +1,301 @@
+#!/usr/bin/env python3
+"""
+Blink GPT - API HTTP (asyncio, sem Streamlit)
+Serve o mesmo motor de ask_question para terminais de loja e bots internos.
+
+Uso:
+    python api_server.py [--host 127.0.0.1] [--port 8080] [--engine bm25] [--reload]
+
+Rotas:
+    GET  /health                   estado e versão do manual
+    GET  /metrics                  métricas no formato Prometheus (BLINK_METRICS=1)
+    GET  /manuals                  manuais disponíveis e carregados
+    GET  /ask?q=<pergunta>         uma pergunta
+    POST /ask        {"question": "..."}
+    POST /ask/batch  {"questions": ["...", "..."]}
+
+Todas as rotas de pergunta (e /health) aceitam o manual: ?manual=rh ou
+"manual": "rh" no corpo. Sem ele, vale o manual padrão.
+"""
+
+import argparse
+import asyncio
+import json
+import sys
+from urllib.parse import parse_qs, urlsplit
+
+import qa_engine
+from corpus_registry import MANUALS_DIR, CorpusRegistry
+from metrics import METRICS
+from query_log import QUERY_LOG
+from qa_engine import DATA_PATH, ENGINES, match_question, match_questions
+
+MAX_HEADER_SIZE = 16 * 1024
+MAX_BODY_SIZE = 1024 * 1024
+MAX_BATCH = 10000
+KEEP_ALIVE_TIMEOUT = 30.0
+
+STATUS_TEXT = {
+    200: "OK",
+    400: "Bad Request",
+    404: "Not Found",
+    405: "Method Not Allowed",
+    413: "Payload Too Large",
+    500: "Internal Server Error",
+}
+
+
+class HTTPError(Exception):
+    """Erro HTTP com status e mensagem para o cliente"""
+
+    def __init__(self, status, message):
+        super().__init__(message)
+        self.status = status
+        self.message = message
+
+
+def answer_payload(question, result):
+    """Resposta JSON de uma pergunta (id e tópico da pergunta encontrada)"""
+    source = result.sources[0] if result.sources else None
+    return {
+        "question": question,
+        "answer": result.answer,
+        "found": source is not None,
+        "stage": result.stage,
+        "score": result.score,
+        "blocked_by": result.blocked_by,
+        "id": source["id"] if source else None,
+        "topic": source["topic"] if source else None,
+        "matched_question": source["question"] if source else None,
+        "corrections": result.corrections,
+    }
+
+
+class QAServer:
+    """Servidor HTTP/1.1 com keep-alive sobre o motor de perguntas"""
+
+    def __init__(self, registry, engine=None):
+        self.registry = registry
+        self.engine = engine
+
+    async def qa_data(self, manual=None):
+        """Manual pedido; o primeiro uso carrega (e indexa) fora do loop"""
+        if manual is not None and not isinstance(manual, str):
+            raise HTTPError(400, "Informe 'manual' como texto")
+        loop = asyncio.get_running_loop()
+        try:
+            qa_data = await loop.run_in_executor(None, self.registry.get, manual)
+        except KeyError:
+            raise HTTPError(404, f"Manual não encontrado: {manual}")
+        if (self.engine or qa_engine.DEFAULT_ENGINE) == "semantic":
+            # Vetores semânticos são calculados no primeiro uso: também fora do loop
+            await loop.run_in_executor(None, getattr, qa_data["index"], "semantic")
+        return qa_data
+
+    async def handle_connection(self, reader, writer):
+        """Atende requisições em sequência na mesma conexão (keep-alive)"""
+        try:
+            while True:
+                try:
+                    head = await asyncio.wait_for(reader.readuntil(b"\r\n\r\n"), KEEP_ALIVE_TIMEOUT)
+                except (asyncio.IncompleteReadError, asyncio.TimeoutError, ConnectionError):
+                    break
+                except asyncio.LimitOverrunError:
+                    await self.send(writer, 413, {"error": "Cabeçalho muito grande"}, keep_alive=False)
+                    break
+
+                keep_alive = False
+                try:
+                    method, target, version, headers = self.parse_head(head)
+                    keep_alive = self.wants_keep_alive(version, headers)
+                    body = await self.read_body(reader, headers)
+                    status, payload = await self.route(method, target, body)
+                except HTTPError as e:
+                    status, payload = e.status, {"error": e.message}
+                except Exception as e:
+                    status, payload = 500, {"error": str(e)}
+
+                await self.send(writer, status, payload, keep_alive)
+                if not keep_alive:
+                    break
+        finally:
+            writer.close()
+            try:
+                await writer.wait_closed()
+            except ConnectionError:
+                pass
+
+    @staticmethod
+    def parse_head(head):
+        """Linha de requisição e cabeçalhos"""
+        lines = head.decode("latin-1").split("\r\n")
+        try:
+            method, target, version = lines[0].split(" ", 2)
+        except ValueError:
+            raise HTTPError(400, "Linha de requisição inválida")
+
+        headers = {}
+        for line in lines[1:]:
+            if not line:
+                continue
+            name, sep, value = line.partition(":")
+            if not sep:
+                raise HTTPError(400, "Cabeçalho inválido")
+            headers[name.strip().lower()] = value.strip()
+        return method.upper(), target, version, headers
+
+    @staticmethod
+    def wants_keep_alive(version, headers):
+        connection = headers.get("connection", "").lower()
+        if version == "HTTP/1.0":
+            return connection == "keep-alive"
+        return connection != "close"
+
+    @staticmethod
+    async def read_body(reader, headers):
+        if "transfer-encoding" in headers:
+            raise HTTPError(400, "Transfer-Encoding não suportado; envie Content-Length")
+        try:
+            length = int(headers.get("content-length", "0"))
+        except ValueError:
+            raise HTTPError(400, "Content-Length inválido")
+        if length > MAX_BODY_SIZE:
+            raise HTTPError(413, "Corpo da requisição muito grande")
+        return await reader.readexactly(length) if length else b""
+
+    async def route(self, method, target, body):
+        """Despacha a requisição para a rota"""
+        url = urlsplit(target)
+        query = parse_qs(url.query)
+        manual = query.get("manual", [None])[0]
+
+        if url.path == "/health":
+            if method != "GET":
+                raise HTTPError(405, "Use GET")
+            qa_data = await self.qa_data(manual)
+            return 200, {
+                "status": "ok",
+                "engine": self.engine or qa_engine.DEFAULT_ENGINE,
+                "manual": self.registry.resolve(manual),
+                "version": qa_data.get("version"),
+                "last_updated": qa_data.get("last_updated"),
+                "total_questions": len(qa_data.get("questions", [])),
+                "query_log": QUERY_LOG.stats(),
+                "answer_cache": qa_engine.ANSWER_CACHE.stats(),
+            }
+
+        if url.path == "/metrics":
+            if method != "GET":
+                raise HTTPError(405, "Use GET")
+            return 200, METRICS.render()
+
+        if url.path == "/manuals":
+            if method != "GET":
+                raise HTTPError(405, "Use GET")
+            self.registry.refresh()
+            return 200, self.registry.stats()
+
+        if url.path == "/ask":
+            if method == "GET":
+                question = query.get("q", [""])[0]
+            elif method == "POST":
+                data = self.parse_json(body)
+                question = data.get("question", "")
+                manual = data.get("manual", manual)
+            else:
+                raise HTTPError(405, "Use GET ou POST")
+            if not isinstance(question, str) or not question.strip():
+                raise HTTPError(400, "Informe a pergunta")
+            qa_data = await self.qa_data(manual)
+            result = match_question(question, qa_data, engine=self.engine)
+            return 200, answer_payload(question, result)
+
+        if url.path == "/ask/batch":
+            if method != "POST":
+                raise HTTPError(405, "Use POST")
+            data = self.parse_json(body)
+            questions = data.get("questions")
+            if not isinstance(questions, list) or not all(isinstance(q, str) for q in questions):
+                raise HTTPError(400, "Informe 'questions' como lista de textos")
+            if len(questions) > MAX_BATCH:
+                raise HTTPError(413, f"Máximo de {MAX_BATCH} perguntas por lote")
+            qa_data = await self.qa_data(data.get("manual", manual))
+            # Lotes grandes rodam fora do loop para não travar as outras conexões
+            loop = asyncio.get_running_loop()
+            results = await loop.run_in_executor(None, match_questions, questions, qa_data, self.engine)
+            return 200, {"results": [answer_payload(question, result)
+                                     for question, result in zip(questions, results)]}
+
+        raise HTTPError(404, "Rota não encontrada")
+
+    @staticmethod
+    def parse_json(body):
+        try:
+            data = json.loads(body.decode("utf-8") or "{}")
+        except (UnicodeDecodeError, ValueError):
+            raise HTTPError(400, "JSON inválido")
+        if not isinstance(data, dict):
+            raise HTTPError(400, "O corpo deve ser um objeto JSON")
+        return data
+
+    @staticmethod
+    async def send(writer, status, payload, keep_alive):
+        # Texto (métricas) vai como está; o resto é JSON
+        if isinstance(payload, str):
+            body = payload.encode("utf-8")
+            content_type = "text/plain; version=0.0.4; charset=utf-8"
+        else:
+            body = json.dumps(payload, ensure_ascii=False).encode("utf-8")
+            content_type = "application/json; charset=utf-8"
+        head = (
+            f"HTTP/1.1 {status} {STATUS_TEXT.get(status, '')}\r\n"
+            f"Content-Type: {content_type}\r\n"
+            f"Content-Length: {len(body)}\r\n"
+            f"Connection: {'keep-alive' if keep_alive else 'close'}\r\n"
+            f"\r\n"
+        )
+        writer.write(head.encode("latin-1") + body)
+        try:
+            await writer.drain()
+        except ConnectionError:
+            pass
+
+
+async def serve(host, port, registry, engine=None):
+    """Inicia o servidor e atende até ser interrompido"""
+    server = QAServer(registry, engine)
+    listener = await asyncio.start_server(server.handle_connection, host, port, limit=MAX_HEADER_SIZE)
+    print(f"🚀 Blink GPT API em http://{host}:{port}", file=sys.stderr)
+    async with listener:
+        await listener.serve_forever()
+
+
+def main():
+    """Linha de comando"""
+    parser = argparse.ArgumentParser(description="API HTTP do Blink GPT")
+    parser.add_argument("--host", default="127.0.0.1")
+    parser.add_argument("--port", type=int, default=8080)
+    parser.add_argument("--data", default=DATA_PATH, help="arquivo do manual padrão")
+    parser.add_argument("--manuals", default=MANUALS_DIR, help="pasta com os demais manuais (*.json)")
+    parser.add_argument("--engine", choices=ENGINES, help="motor de busca (padrão: BLINK_ENGINE)")
+    parser.add_argument("--reload", action="store_true", help="recarrega os manuais quando os arquivos mudarem")
+    args = parser.parse_args()
+
+    # Cada manual é carregado uma única vez por processo, no primeiro pedido
+    registry = CorpusRegistry(args.data, args.manuals, hot_reload=args.reload)
+    if not registry.names():
+        print(f"❌ Nenhum manual encontrado em {args.data} ou {args.manuals}", file=sys.stderr)
+        return 1
+    registry.get()
+
+    try:
+        asyncio.run(serve(args.host, args.port, registry, args.engine))
+    except KeyboardInterrupt:
+        pass
+    finally:
+        registry.close()
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
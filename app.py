@@ -5,12 +5,15 @@ Desenvolvido por Fabrício Zamprogno
 """
 
 import streamlit as st
-import json
 import re
-import unicodedata
-import os
 from datetime import datetime
 
+from qa_engine import normalize_text, match_question, filter_topics
+from corpus_registry import CorpusRegistry
+from metrics import METRICS
+from chat_history import (HISTORY_PAGE_SIZE, UPDATED_NOTE, add_exchange, history_window,
+                          user_message, answer_message, resolve_message)
+
 # Cores da Blink Jeans
 COLORS = {
     "primary": "#DC1727",
@@ -23,94 +26,42 @@ COLORS = {
     "error": "#FF6B6B"
 }
 
-def normalize_text(text):
-    """Normaliza texto removendo acentos, til, cedilha, etc."""
-    if not text:
-        return text
-    
-    text = text.lower()
-    text = unicodedata.normalize('NFD', text)
-    text = ''.join(char for char in text if unicodedata.category(char) != 'Mn')
-    
-    return text
-
 @st.cache_resource
-def load_qa_data():
-    """Carrega dados QA do JSON"""
+def get_registry():
+    """Manuais disponíveis, carregados sob demanda (um registro por processo)"""
+    return CorpusRegistry()
+
+def current_qa_data():
+    """Manual escolhido na sessão: carregado no primeiro uso, recarregado se BLINK_HOT_RELOAD=1"""
+    registry = get_registry()
     try:
-        if os.path.exists("data/qa_data.json"):
-            with open("data/qa_data.json", "r", encoding="utf-8") as f:
-                return json.load(f)
-        else:
-            st.error("❌ Arquivo data/qa_data.json não encontrado")
+        return registry.get(st.session_state.get("manual"))
+    except KeyError:
+        # Manual removido ou nenhum disponível: volta para o padrão
+        st.session_state.pop("manual", None)
+        try:
+            return registry.get()
+        except KeyError:
+            st.error("❌ Nenhum manual encontrado em data/qa_data.json ou data/manuals/")
             return None
     except Exception as e:
         st.error(f"❌ Erro ao carregar dados: {str(e)}")
         return None
 
-def ask_question(question, qa_data):
-    """Busca resposta para uma pergunta"""
-    
-    if not qa_data:
-        return None, []
-    
-    question_lower = normalize_text(question)
-    
-    # Filtros de perguntas irrelevantes
-    irrelevant_patterns = [
-        'fabricio', 'joão', 'maria', 'josé', 'ana', 'carlos', 'pedro', 'paulo', 'lucas',
-        'quanto ganha', 'salário de', 'telefone de', 'endereço de', 'idade de',
-        'casado com', 'namorada de', 'esposa de'
-    ]
-    
-    for pattern in irrelevant_patterns:
-        if pattern in question_lower:
-            return "Não encontrei informações específicas sobre sua pergunta no Manual de Procedimentos. Tente reformular sua pergunta ou selecione sugestões no painel lateral.", []
-    
-    # Busca direta
-    best_match = None
-    best_score = 0
-    
-    for question_obj in qa_data.get("questions", []):
-        pergunta_excel = normalize_text(question_obj['question'])
-        
-        # Comparar palavras
-        words_user = set(question_lower.split())
-        words_excel = set(pergunta_excel.split())
-        
-        generic_words = {'o', 'a', 'os', 'as', 'um', 'uma', 'de', 'da', 'do', 'das', 'dos',
-                        'em', 'na', 'no', 'nas', 'nos', 'para', 'por', 'com', 'como', 'quando',
-                        'onde', 'que', 'qual', 'quais', 'quem', 'é', 'são', 'foi', 'será',
-                        'tem', 'ter', 'fazer', 'feito', 'pode', 'posso', 'devo', 'deve'}
-        
-        words_user_filtered = words_user - generic_words
-        words_excel_filtered = words_excel - generic_words
-        
-        if len(words_user_filtered) == 0 or len(words_excel_filtered) == 0:
-            continue
-        
-        common_words = words_user_filtered.intersection(words_excel_filtered)
-        
-        if len(common_words) > 0:
-            score = len(common_words) / len(words_user_filtered)
-            
-            if len(words_user_filtered) > 3 and len(common_words) < 2:
-                continue
-            
-            if score > best_score:
-                best_score = score
-                best_match = question_obj
-    
-    # Se não encontrou boa correspondência, usar keywords
-    if best_score < 0.6:
-        for question_obj in qa_data.get("questions", []):
-            if question_lower in normalize_text(question_obj['question']):
-                return question_obj['answer'], [question_obj]
-    
-    if best_match and best_score > 0.3:
-        return best_match['answer'], [best_match]
-    
-    return "Não encontrei uma resposta exata para sua pergunta. Tente usar as sugestões no painel lateral ou reformule sua pergunta.", []
+def clear_history():
+    """Limpa a conversa (ao trocar de manual os ids das respostas mudam de sentido)"""
+    st.session_state.messages = []
+    st.session_state.history_exchanges = HISTORY_PAGE_SIZE
+    st.session_state.history_trimmed = 0
+
+def select_manual():
+    """Seletor de manual na barra lateral, se houver mais de um"""
+    registry = get_registry()
+    names = registry.names()
+    if len(names) < 2:
+        return
+    st.session_state.setdefault("manual", registry.resolve())
+    st.selectbox("📚 Manual", names, key="manual", on_change=clear_history)
 
 def setup_page():
     """Configura a página Streamlit"""
@@ -246,29 +197,19 @@ def setup_page():
 def create_sidebar(qa_data):
     """Cria sidebar com sugestões"""
     with st.sidebar:
+        select_manual()
+
         st.markdown(f"## 🎯 Sugestões de Perguntas")
         
         # Busca
         search_text = st.text_input(
             "🔍 Buscar tópico ou pergunta",
             placeholder="Digite aqui..."
-        ).lower()
+        )
+        search_text = normalize_text(search_text)
         
-        if not search_text:
-            topics = qa_data.get("topics", {})
-        else:
-            # Filtrar tópicos que contenham a busca
-            topics = {}
-            for topic, data in qa_data.get("topics", {}).items():
-                if search_text in normalize_text(topic):
-                    topics[topic] = data
-                else:
-                    filtered_questions = [
-                        q for q in data.get("questions", [])
-                        if search_text in normalize_text(q['question'])
-                    ]
-                    if filtered_questions:
-                        topics[topic] = {"questions": filtered_questions}
+        # Filtrar tópicos e perguntas que contenham a busca (índice de trigramas)
+        topics = filter_topics(qa_data, search_text)
         
         # Exibir tópicos
         for topic, data in topics.items():
@@ -296,12 +237,50 @@ def create_sidebar(qa_data):
         </div>
         """, unsafe_allow_html=True)
 
+def render_history(qa_data):
+    """Últimas trocas da conversa em um único bloco HTML, com botão para as anteriores"""
+    visible, hidden = history_window(st.session_state.messages, st.session_state.history_exchanges)
+
+    if hidden:
+        if st.button(f"⬆️ Carregar mensagens anteriores ({hidden})", key="load_older", use_container_width=True):
+            st.session_state.history_exchanges += HISTORY_PAGE_SIZE
+            st.rerun()
+    elif st.session_state.history_trimmed:
+        st.caption(f"As {st.session_state.history_trimmed} trocas mais antigas foram removidas do histórico.")
+
+    # Um único st.markdown por rerun, em vez de um bloco por mensagem
+    blocks = []
+    for msg in visible:
+        if msg.role == 'user':
+            blocks.append(
+                f'<div style="background-color: {COLORS["secondary"]}; color: white; '
+                f'padding: 12px; border-radius: 8px; margin: 8px 0;">'
+                f'<strong>Você:</strong> {msg.text}</div>'
+            )
+        else:
+            answer, topic, updated = resolve_message(msg, qa_data)
+            note = f'<br><em style="font-size: 0.85em;">🔄 {UPDATED_NOTE}</em>' if updated else ''
+            blocks.append(
+                f'<div style="background-color: {COLORS["light_bg"]}; '
+                f'padding: 12px; border-left: 4px solid {COLORS["primary"]}; '
+                f'border-radius: 8px; margin: 8px 0;">'
+                f'<strong>Assistente:</strong><br>{answer}{note}</div>'
+            )
+            if topic:
+                blocks.append(
+                    f'<div style="background-color: {COLORS["light_bg"]}; '
+                    f'border-left: 4px solid {COLORS["secondary"]}; '
+                    f'padding: 8px; border-radius: 8px; font-size: 0.9em; margin: 4px 0;">'
+                    f'📋 <strong>Tópico:</strong> {topic}</div>'
+                )
+    st.markdown("\n".join(blocks), unsafe_allow_html=True)
+
 def main():
     """Função principal"""
     setup_page()
     
     # Carregar dados
-    qa_data = load_qa_data()
+    qa_data = current_qa_data()
     
     if qa_data is None:
         st.error("❌ Falha ao carregar dados. Verifique se o arquivo data/qa_data.json existe.")
@@ -332,38 +311,19 @@ def main():
         st.session_state.messages = []
     if 'user_question' not in st.session_state:
         st.session_state.user_question = ""
+    if 'history_exchanges' not in st.session_state:
+        st.session_state.history_exchanges = HISTORY_PAGE_SIZE
+    if 'history_trimmed' not in st.session_state:
+        st.session_state.history_trimmed = 0
     
     # Área de chat
     col1, col2 = st.columns([3, 1], gap="small")
     
     with col1:
-        # Histórico de mensagens
+        # Histórico de mensagens (só as últimas trocas)
         if st.session_state.messages:
             st.subheader("💬 Histórico de Conversa")
-            for msg in st.session_state.messages:
-                if msg['role'] == 'user':
-                    st.markdown(f"""
-                    <div style="background-color: {COLORS['secondary']}; color: white; 
-                                padding: 12px; border-radius: 8px; margin: 8px 0;">
-                    <strong>Você:</strong> {msg['content']}
-                    </div>
-                    """, unsafe_allow_html=True)
-                else:
-                    st.markdown(f"""
-                    <div style="background-color: {COLORS['light_bg']}; 
-                                padding: 12px; border-left: 4px solid {COLORS['primary']}; 
-                                border-radius: 8px; margin: 8px 0;">
-                    <strong>Assistente:</strong><br>{msg['content']}
-                    </div>
-                    """, unsafe_allow_html=True)
-                    if 'source' in msg and msg['source']:
-                        st.markdown(f"""
-                        <div style="background-color: {COLORS['light_bg']}; 
-                                    border-left: 4px solid {COLORS['secondary']}; 
-                                    padding: 8px; border-radius: 8px; font-size: 0.9em; margin: 4px 0;">
-                        📋 <strong>Tópico:</strong> {msg['source']['topic']}
-                        </div>
-                        """, unsafe_allow_html=True)
+            render_history(qa_data)
         
         # Input
         st.subheader("❓ Faça sua Pergunta")
@@ -382,17 +342,15 @@ def main():
         
         # Processar pergunta
         if send_button and user_input.strip():
-            st.session_state.messages.append({"role": "user", "content": user_input})
-            
-            # Buscar resposta
-            answer, sources = ask_question(user_input, qa_data)
-            
-            source_info = sources[0] if sources else None
-            st.session_state.messages.append({
-                "role": "assistant",
-                "content": answer,
-                "source": source_info
-            })
+            # Buscar resposta (a mensagem guarda só o id; o texto vem do manual)
+            result = match_question(user_input, qa_data)
+
+            st.session_state.history_trimmed += add_exchange(
+                st.session_state.messages,
+                user_message(user_input),
+                answer_message(result, qa_data),
+            )
+            st.session_state.history_exchanges = HISTORY_PAGE_SIZE
             
             st.session_state.user_question = ""
             st.rerun()
@@ -400,7 +358,7 @@ def main():
     with col2:
         st.subheader("🧹 Ações")
         if st.button("🗑️ Limpar Chat", use_container_width=True):
-            st.session_state.messages = []
+            clear_history()
             st.rerun()
         
         # Info box
@@ -425,4 +383,9 @@ def main():
     """, unsafe_allow_html=True)
 
 if __name__ == "__main__":
-    main()
+    # Tempo de cada execução do script (inclusive as interrompidas por st.rerun)
+    try:
+        with METRICS.stage("rerun"):
+            main()
+    finally:
+        METRICS.dump_if_due()
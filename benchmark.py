@@ -0,0 +1,285 @@
+#!/usr/bin/env python3
+"""
+Blink GPT - Benchmark da busca de respostas
+Gera manuais sintéticos no formato de data/qa_data.json (10^2 a 10^6 perguntas),
+repete uma mistura realista de perguntas contra cada motor de busca e imprime
+latências (p50/p95/p99), vazão, tempo de construção dos índices (os vetores
+semânticos à parte) e pico de memória em JSON.
+
+Uso:
+    python benchmark.py
+    python benchmark.py --sizes 100,1000,10000 --queries 2000 --output bench.json
+"""
+
+import argparse
+import itertools
+import json
+import random
+import resource
+import subprocess
+import sys
+import time
+
+import qa_engine
+from qa_engine import DATA_PATH, ENGINES, build_index
+
+DEFAULT_SIZES = "100,1000,10000,100000,1000000"
+
+SYLLABLES = ["ba", "be", "ca", "co", "cu", "da", "de", "do", "fa", "fi", "ga", "go", "la",
+             "le", "li", "lo", "ma", "me", "mo", "na", "ne", "no", "pa", "pe", "po", "ra",
+             "re", "ri", "ro", "sa", "se", "so", "ta", "te", "ti", "to", "va", "ve", "vi",
+             "ção", "ões", "ão", "ém", "ária", "ário", "ença", "inho", "mento", "dade"]
+
+TOPIC_EMOJIS = ["🏢", "💳", "🏪", "👥", "📦", "👕", "🔄", "🛠️", "🎨", "💰", "📝", "📞", "💼", "👔", "📋"]
+
+QUESTION_TEMPLATES = [
+    "Como funciona {a} {b} ?",
+    "O que é {a} de {b} ?",
+    "Quando devo fazer {a} {b} ?",
+    "Quais são as regras de {a} para {b} ?",
+    "Como proceder com {a} {b} {c} ?",
+    "Onde registrar {a} do {b} ?",
+    "Qual o prazo para {a} {b} ?",
+]
+
+# Mistura de perguntas: (tipo, peso)
+QUERY_MIX = [
+    ("exact", 0.30),       # pergunta do manual copiada
+    ("partial", 0.25),     # parte das palavras da pergunta
+    ("shuffled", 0.10),    # mesmas palavras em outra ordem
+    ("no_accents", 0.10),  # digitada sem acentos
+    ("typo", 0.10),        # uma letra trocada
+    ("unknown", 0.10),     # assunto fora do manual
+    ("blocked", 0.05),     # pergunta pessoal filtrada
+]
+
+
+def load_base_words():
+    """Palavras reais do manual para dar cara de português ao vocabulário"""
+    try:
+        with open(DATA_PATH, "r", encoding="utf-8") as f:
+            data = json.load(f)
+        words = {word.strip("?.,!:;()").lower()
+                 for q in data.get("questions", []) for word in q["question"].split()}
+        return sorted(word for word in words if len(word) > 3 and word.isalpha())
+    except (OSError, ValueError):
+        return []
+
+
+def make_vocabulary(rng, size):
+    """Vocabulário: palavras do manual + palavras sintéticas por sílabas"""
+    vocabulary = load_base_words()
+    seen = set(vocabulary)
+    while len(vocabulary) < size:
+        word = "".join(rng.choice(SYLLABLES) for _ in range(rng.randint(2, 4)))
+        if word not in seen:
+            seen.add(word)
+            vocabulary.append(word)
+    rng.shuffle(vocabulary)
+    return vocabulary
+
+
+def generate_corpus(n_questions, seed=42):
+    """Manual sintético com a mesma estrutura de data/qa_data.json"""
+    rng = random.Random(seed)
+
+    # Vocabulário cresce com o manual (lei de Heaps)
+    vocabulary = make_vocabulary(rng, max(500, int(40 * n_questions ** 0.6)))
+    cum_weights = list(itertools.accumulate(1 / (rank + 1) for rank in range(len(vocabulary))))
+
+    def words(k):
+        return rng.choices(vocabulary, cum_weights=cum_weights, k=k)
+
+    n_topics = max(5, min(200, n_questions // 8))
+    topic_names = [f"{TOPIC_EMOJIS[i % len(TOPIC_EMOJIS)]} {' '.join(words(2)).title()}"
+                   for i in range(n_topics)]
+
+    topics = {name: {"count": 0, "questions": []} for name in topic_names}
+    questions = []
+    for qid in range(1, n_questions + 1):
+        topic = topic_names[rng.randrange(n_topics)]
+        a, b, c = words(3)
+        record = {
+            "id": qid,
+            "topic": topic,
+            "question": rng.choice(QUESTION_TEMPLATES).format(a=a, b=b, c=c).capitalize(),
+            "answer": " ".join(words(rng.randint(15, 40))).capitalize() + ".",
+        }
+        questions.append(record)
+        topics[topic]["questions"].append(dict(record))
+        topics[topic]["count"] += 1
+
+    return {
+        "version": "bench",
+        "last_updated": time.strftime("%Y-%m-%d"),
+        "total_questions": n_questions,
+        "topics": topics,
+        "questions": questions,
+    }
+
+
+def make_queries(qa_data, n_queries, seed=7):
+    """Gera a mistura de perguntas de teste"""
+    rng = random.Random(seed)
+    records = qa_data["questions"]
+    kinds = rng.choices([kind for kind, _ in QUERY_MIX],
+                        weights=[weight for _, weight in QUERY_MIX], k=n_queries)
+
+    queries = []
+    for kind in kinds:
+        text = rng.choice(records)["question"]
+        words = text.split()
+        if kind == "partial":
+            text = " ".join(rng.sample(words, max(1, len(words) // 2)))
+        elif kind == "shuffled":
+            rng.shuffle(words)
+            text = " ".join(words)
+        elif kind == "no_accents":
+            text = qa_engine.normalize_text(text)
+        elif kind == "typo":
+            pos = rng.randrange(len(text))
+            text = text[:pos] + rng.choice("aeiourstn") + text[pos + 1:]
+        elif kind == "unknown":
+            text = " ".join(rng.choices(SYLLABLES, k=4))
+        elif kind == "blocked":
+            text = f"Quanto ganha o {rng.choice(['Carlos', 'Pedro', 'Ana'])} ?"
+        queries.append((kind, text))
+    return queries
+
+
+def percentile(sorted_values, pct):
+    """Percentil por interpolação mais próxima"""
+    if not sorted_values:
+        return None
+    pos = min(len(sorted_values) - 1, int(round(pct / 100 * (len(sorted_values) - 1))))
+    return sorted_values[pos]
+
+
+def peak_memory_bytes():
+    """Pico de memória residente do processo"""
+    peak = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss
+    return peak if sys.platform == "darwin" else peak * 1024
+
+
+def run_engine(qa_data, engine, queries, max_seconds):
+    """Repete as perguntas em um motor e mede latência e vazão"""
+    # Aquecimento: estruturas construídas no primeiro uso não entram na medição
+    started = time.perf_counter()
+    qa_engine.ask_question(queries[0][1], qa_data, engine=engine, cache=None)
+    warmup = time.perf_counter() - started
+
+    latencies = []
+    answered = 0
+    deadline = time.perf_counter() + max_seconds
+    for _, text in queries:
+        started = time.perf_counter_ns()
+        _, sources = qa_engine.ask_question(text, qa_data, engine=engine, cache=None)
+        latencies.append((time.perf_counter_ns() - started) / 1e6)
+        answered += bool(sources)
+        if time.perf_counter() > deadline:
+            break
+
+    total = sum(latencies) / 1000
+    latencies.sort()
+    result = {
+        "queries": len(latencies),
+        "answered": answered,
+        "warmup_s": round(warmup, 6),
+        "p50_ms": percentile(latencies, 50),
+        "p95_ms": percentile(latencies, 95),
+        "p99_ms": percentile(latencies, 99),
+        "max_ms": latencies[-1] if latencies else None,
+        "throughput_qps": len(latencies) / total if total else None,
+    }
+
+    # Modo em lote (ask_questions), com as mesmas perguntas medidas acima
+    texts = [text for _, text in queries[:len(latencies)]]
+    started = time.perf_counter()
+    qa_engine.ask_questions(texts, qa_data, engine=engine)
+    elapsed = time.perf_counter() - started
+    result["batch_throughput_qps"] = len(texts) / elapsed if elapsed else None
+    return result
+
+
+def run_size(n_questions, n_queries, engines, max_seconds, seed):
+    """Mede um tamanho de manual (executado em processo separado)"""
+    started = time.perf_counter()
+    qa_data = generate_corpus(n_questions, seed=seed)
+    generate_s = time.perf_counter() - started
+
+    # Constrói todos os índices, inclusive os que só seriam criados no primeiro uso
+    started = time.perf_counter()
+    build_index(qa_data)
+    qa_data["index"].bm25
+    build_s = time.perf_counter() - started
+
+    queries = make_queries(qa_data, n_queries, seed=seed + 1)
+    result = {
+        "size": n_questions,
+        "vocabulary": len(qa_data["index"].postings),
+        "generate_s": round(generate_s, 6),
+        "index_build_s": round(build_s, 6),
+        "engines": {},
+    }
+    # Vetores semânticos (TF-IDF, SVD e projeção) medidos à parte: é a etapa mais lenta
+    if "semantic" in engines:
+        started = time.perf_counter()
+        qa_data["index"].semantic
+        result["semantic_build_s"] = round(time.perf_counter() - started, 6)
+    for engine in engines:
+        result["engines"][engine] = run_engine(qa_data, engine, queries, max_seconds)
+    result["peak_memory_bytes"] = peak_memory_bytes()
+    return result
+
+
+def main():
+    """Linha de comando"""
+    parser = argparse.ArgumentParser(description="Benchmark da busca de respostas do Blink GPT")
+    parser.add_argument("--sizes", default=DEFAULT_SIZES, help="tamanhos do manual, separados por vírgula")
+    parser.add_argument("--queries", type=int, default=1000, help="perguntas por motor")
+    parser.add_argument("--engines", default=",".join(ENGINES), help="motores a medir")
+    parser.add_argument("--max-seconds", type=float, default=60.0, help="tempo máximo por motor e tamanho")
+    parser.add_argument("--seed", type=int, default=42)
+    parser.add_argument("--output", help="grava o JSON neste arquivo (padrão: saída padrão)")
+    parser.add_argument("--worker", type=int, help=argparse.SUPPRESS)
+    args = parser.parse_args()
+
+    engines = [engine for engine in args.engines.split(",") if engine]
+
+    if args.worker:
+        json.dump(run_size(args.worker, args.queries, engines, args.max_seconds, args.seed), sys.stdout)
+        return 0
+
+    # Cada tamanho roda em um processo próprio para medir o pico de memória isolado
+    results = []
+    for size in (int(s) for s in args.sizes.split(",") if s):
+        print(f"⏱️  {size} perguntas...", file=sys.stderr)
+        proc = subprocess.run(
+            [sys.executable, __file__, "--worker", str(size), "--queries", str(args.queries),
+             "--engines", ",".join(engines), "--max-seconds", str(args.max_seconds),
+             "--seed", str(args.seed)],
+            capture_output=True, text=True,
+        )
+        if proc.returncode != 0:
+            lines = proc.stderr.strip().splitlines()
+            results.append({"size": size, "error": lines[-1] if lines else f"código {proc.returncode}"})
+            continue
+        results.append(json.loads(proc.stdout))
+
+    report = {
+        "python": sys.version.split()[0],
+        "queries_per_engine": args.queries,
+        "query_mix": dict(QUERY_MIX),
+        "results": results,
+    }
+    output = json.dumps(report, indent=2, ensure_ascii=False)
+    if args.output:
+        with open(args.output, "w", encoding="utf-8") as f:
+            f.write(output + "\n")
+    else:
+        print(output)
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,161 @@
+"""
+Blink GPT - Ranqueamento BM25
+Matriz termo-documento esparsa (CSR) com pesos IDF pré-calculados
+"""
+
+import math
+
+import numpy as np
+
+# Parâmetros clássicos do BM25
+K1 = 1.5
+B = 0.75
+
+
+class BM25Index:
+    """Matriz esparsa termo -> (documentos, pesos BM25) para pontuação vetorizada"""
+
+    def __init__(self, token_lists, k1=K1, b=B):
+        self.n_docs = len(token_lists)
+        self.vocab = {}
+
+        # Frequência de cada termo em cada documento
+        term_docs = []
+        lengths = np.zeros(self.n_docs, dtype=np.float32)
+        for doc, tokens in enumerate(token_lists):
+            lengths[doc] = len(tokens)
+            counts = {}
+            for token in tokens:
+                counts[token] = counts.get(token, 0) + 1
+            for token, tf in counts.items():
+                row = self.vocab.get(token)
+                if row is None:
+                    row = self.vocab[token] = len(term_docs)
+                    term_docs.append([])
+                term_docs[row].append((doc, tf))
+
+        avg_length = float(lengths.mean()) if self.n_docs and lengths.sum() else 1.0
+        norm = k1 * (1 - b + b * lengths / avg_length)
+
+        # Layout CSR: linha = termo, colunas = documentos
+        sizes = np.fromiter((len(p) for p in term_docs), dtype=np.int64, count=len(term_docs))
+        self.indptr = np.zeros(len(term_docs) + 1, dtype=np.int64)
+        np.cumsum(sizes, out=self.indptr[1:])
+        self.doc_ids = np.fromiter((doc for p in term_docs for doc, _ in p),
+                                   dtype=np.int32, count=int(self.indptr[-1]))
+        tf = np.fromiter((tf for p in term_docs for _, tf in p),
+                         dtype=np.float32, count=int(self.indptr[-1]))
+
+        # IDF do BM25 (variante sempre positiva)
+        self.idf = np.log(1 + (self.n_docs - sizes + 0.5) / (sizes + 0.5)).astype(np.float32)
+        self.unseen_idf = math.log(1 + (self.n_docs + 0.5) / 0.5)
+
+        term_idf = np.repeat(self.idf, sizes)
+        self.weights = term_idf * tf * (k1 + 1) / (tf + norm[self.doc_ids])
+
+    @classmethod
+    def from_arrays(cls, terms, indptr, doc_ids, weights, idf, n_docs, unseen_idf):
+        """Reconstrói o índice a partir de arrays já calculados (ex.: snapshot)"""
+        index = cls.__new__(cls)
+        index.n_docs = n_docs
+        index.vocab = {term: row for row, term in enumerate(terms)}
+        index.indptr = indptr
+        index.doc_ids = doc_ids
+        index.weights = weights
+        index.idf = idf
+        index.unseen_idf = unseen_idf
+        return index
+
+    def term_idf(self, term):
+        """IDF de um termo (termos fora do vocabulário recebem o IDF máximo)"""
+        row = self.vocab.get(term)
+        return self.unseen_idf if row is None else float(self.idf[row])
+
+    def score(self, query_groups):
+        """Pontua todos os documentos de uma vez
+
+        query_groups: um grupo termo -> peso por palavra da consulta (a palavra
+        e seus sinônimos); cada grupo soma o maior peso entre os seus termos.
+        """
+        cells, values = self._cells([query_groups])
+        if cells is None:
+            return np.zeros(self.n_docs, dtype=np.float32)
+        return np.bincount(cells, weights=values, minlength=self.n_docs)
+
+    def iter_batch_scores(self, query_groups, binary=False, max_cells=1 << 14):
+        """Pontua várias consultas em blocos (produto consulta x matriz esparsa)
+
+        query_groups: por consulta, a lista de grupos de score(). Gera (início
+        do bloco, matriz densa consultas x documentos). O bloco tem no máximo
+        max_cells células, pequeno o bastante para ficar no cache do
+        processador; com binary=True o peso BM25 é ignorado e a pontuação é a
+        soma, por grupo, do maior peso dos termos em comum (o número de
+        palavras em comum, se os pesos forem 1).
+        """
+        chunk_size = max(1, max_cells // max(1, self.n_docs))
+        for chunk_start in range(0, len(query_groups), chunk_size):
+            chunk = query_groups[chunk_start:chunk_start + chunk_size]
+            cells, values = self._cells(chunk, binary)
+            if cells is None:
+                dense = np.zeros(len(chunk) * self.n_docs)
+            else:
+                dense = np.bincount(cells, weights=values, minlength=len(chunk) * self.n_docs)
+            yield chunk_start, dense.reshape(len(chunk), self.n_docs)
+
+    def _cells(self, chunk, binary=False):
+        """(célula consulta x documento, peso) de cada termo em comum, ou (None, None)
+
+        Grupos com mais de um termo no vocabulário ficam só com o maior peso
+        de cada documento.
+        """
+        # Trincas (consulta do bloco, linha do termo, peso do termo); os grupos
+        # com vários termos também guardam o número do grupo
+        singles = []
+        shared = []
+        vocab = self.vocab
+        for q, groups in enumerate(chunk):
+            for group in groups:
+                present = [(vocab[term], weight) for term, weight in group.items() if term in vocab]
+                if len(present) == 1:
+                    singles.append((q, *present[0]))
+                elif present:
+                    group_id = shared[-1][0] + 1 if shared else 0
+                    shared.extend((group_id, q, row, weight) for row, weight in present)
+
+        cell_parts = []
+        weight_parts = []
+        if singles:
+            query_ids, rows, term_weights = zip(*singles)
+            cells, _, values = self._postings(query_ids, rows, term_weights, binary)
+            cell_parts.append(cells)
+            weight_parts.append(values)
+        if shared:
+            group_ids, query_ids, rows, term_weights = zip(*shared)
+            cells, sizes, values = self._postings(query_ids, rows, term_weights, binary)
+            keys = np.repeat(np.array(group_ids, dtype=np.int64), sizes) * self.n_docs + cells % self.n_docs
+            order = np.lexsort((-values, keys))
+            keys = keys[order]
+            first = np.ones(len(keys), dtype=bool)
+            first[1:] = keys[1:] != keys[:-1]
+            cell_parts.append(cells[order][first])
+            weight_parts.append(values[order][first])
+
+        if not cell_parts:
+            return None, None
+        return np.concatenate(cell_parts), np.concatenate(weight_parts)
+
+    def _postings(self, query_ids, rows, term_weights, binary):
+        """Posting lists dos termos concatenadas: (células, tamanhos, pesos)"""
+        rows = np.array(rows, dtype=np.int64)
+
+        # Concatena as posting lists de cada termo (fatias contíguas)
+        starts = self.indptr[rows]
+        ends = self.indptr[rows + 1]
+        sizes = ends - starts
+        bounds = list(zip(starts.tolist(), ends.tolist()))
+        docs = np.concatenate([self.doc_ids[a:b] for a, b in bounds])
+        cells = np.repeat(np.array(query_ids, dtype=np.int64) * self.n_docs, sizes) + docs
+        values = np.repeat(np.array(term_weights, dtype=np.float64), sizes)
+        if not binary:
+            values *= np.concatenate([self.weights[a:b] for a, b in bounds])
+        return cells, sizes, values
@@ -0,0 +1,86 @@
+"""
+Blink GPT - Histórico de conversa da sessão
+Janela das últimas trocas (pergunta + resposta) e limite de tamanho, para que
+o tempo de cada rerun e a memória da sessão não cresçam com o turno inteiro.
+As respostas guardam só o id da pergunta encontrada; texto e tópico vêm do
+manual compartilhado na hora de exibir.
+"""
+
+import os
+
+from qa_engine import IRRELEVANT_ANSWER, NOT_FOUND_ANSWER
+
+# Trocas exibidas por vez (o botão "carregar anteriores" soma mais uma página)
+HISTORY_PAGE_SIZE = int(os.environ.get("BLINK_HISTORY_PAGE_SIZE", "10"))
+# Trocas guardadas na sessão; as mais antigas são descartadas
+HISTORY_MAX_EXCHANGES = int(os.environ.get("BLINK_HISTORY_MAX", "100"))
+
+OUTDATED_ANSWER = "Esta resposta não está mais no Manual de Procedimentos atual. Faça a pergunta novamente."
+UPDATED_NOTE = "O manual foi atualizado depois desta pergunta; a resposta exibida é a do manual atual."
+
+
+class ChatMessage:
+    """Mensagem da conversa sem cópia do manual
+
+    Pergunta: role="user" e text. Resposta: role="assistant", question_id da
+    pergunta encontrada (None se não encontrou), stage da busca e version
+    (content_hash) do manual usado.
+    """
+
+    __slots__ = ("role", "text", "question_id", "stage", "version")
+
+    def __init__(self, role, text=None, question_id=None, stage=None, version=None):
+        self.role = role
+        self.text = text
+        self.question_id = question_id
+        self.stage = stage
+        self.version = version
+
+
+def user_message(question):
+    """Mensagem com a pergunta digitada"""
+    return ChatMessage("user", text=question)
+
+
+def answer_message(result, qa_data):
+    """Resposta compacta a partir do MatchResult da busca"""
+    source = result.sources[0] if result.sources else None
+    return ChatMessage("assistant",
+                       question_id=source.get("id") if source else None,
+                       stage=result.stage,
+                       version=qa_data.get("content_hash"))
+
+
+def resolve_message(msg, qa_data):
+    """Texto e tópico da resposta, buscados no manual atual: (texto, tópico, atualizada)
+
+    atualizada: a resposta veio de uma pergunta do manual e o manual mudou
+    desde então (version diferente do content_hash atual); o texto pode não
+    ser o que foi respondido na hora. Respostas padrão nunca são marcadas.
+    """
+    if msg.question_id is None:
+        return (IRRELEVANT_ANSWER if msg.stage == "blocked" else NOT_FOUND_ANSWER), None, False
+
+    record = qa_data["index"].record_by_id(msg.question_id)
+    if record is None:
+        # O manual foi recarregado e a pergunta saiu dele
+        return OUTDATED_ANSWER, None, False
+    updated = msg.version is not None and msg.version != qa_data.get("content_hash")
+    return record["answer"], record.get("topic"), updated
+
+
+def add_exchange(messages, question_msg, answer_msg, max_exchanges=HISTORY_MAX_EXCHANGES):
+    """Acrescenta pergunta e resposta; retorna quantas trocas antigas foram descartadas"""
+    messages.append(question_msg)
+    messages.append(answer_msg)
+    excess = len(messages) - 2 * max_exchanges
+    if excess <= 0:
+        return 0
+    del messages[:excess]
+    return excess // 2
+
+
+def history_window(messages, exchanges):
+    """Últimas trocas a exibir: (mensagens visíveis, trocas ocultas)"""
+    start = max(0, len(messages) - 2 * exchanges)
+    return messages[start:], start // 2
@@ -0,0 +1,255 @@
+"""
+Blink GPT - Vários manuais no mesmo processo
+Descobre os arquivos de perguntas (data/qa_data.json e data/manuals/*.json),
+carrega e indexa cada manual só quando ele é pedido pela primeira vez e
+descarta os menos usados quando a memória estimada passa do limite.
+"""
+
+import glob
+import os
+import sys
+import threading
+from collections import OrderedDict
+
+from corpus_reloader import HOT_RELOAD, CorpusReloader
+from corpus_snapshot import load_snapshot_or_json
+from corpus_store import LazyRecords
+from qa_engine import DATA_PATH
+
+# Pasta com os manuais adicionais (um JSON por manual; o nome do arquivo é o nome do manual)
+MANUALS_DIR = os.environ.get("BLINK_MANUALS_DIR", "data/manuals")
+# Nome dado ao manual de data/qa_data.json e manual usado quando nenhum é escolhido
+DEFAULT_MANUAL = os.environ.get("BLINK_DEFAULT_MANUAL", "principal")
+# Memória estimada máxima dos manuais carregados, em MB
+CORPUS_MEMORY_MB = float(os.environ.get("BLINK_CORPUS_MEMORY_MB", "512"))
+
+
+def snapshot_path_for(json_path):
+    """Snapshot ao lado do JSON: data/manuals/rh.json -> data/manuals/rh.snapshot"""
+    return os.path.splitext(json_path)[0] + ".snapshot"
+
+
+def load_manual(json_path):
+    """Carrega um manual usando o snapshot dele, se estiver em dia"""
+    return load_snapshot_or_json(json_path, snapshot_path_for(json_path))
+
+
+def discover_manuals(default_path=DATA_PATH, manuals_dir=MANUALS_DIR, default_name=DEFAULT_MANUAL):
+    """Nome -> caminho dos manuais disponíveis (só lista os arquivos, não lê)"""
+    manuals = {}
+    if default_path and os.path.exists(default_path):
+        manuals[default_name] = default_path
+    for path in sorted(glob.glob(os.path.join(manuals_dir, "*.json"))):
+        # Manifesto da importação da planilha (ingest_excel.py), não é um manual
+        if path.endswith(".manifest.json"):
+            continue
+        name = os.path.splitext(os.path.basename(path))[0]
+        manuals.setdefault(name, path)
+    return manuals
+
+
+def estimate_size(qa_data):
+    """Memória aproximada de um manual carregado, em bytes
+
+    Conta os textos e palavras de cada pergunta e as estruturas dos índices,
+    inclusive as construídas no primeiro uso (BM25, vetores semânticos e
+    índice aproximado, corretor ortográfico) que já existirem. É uma
+    estimativa para decidir o descarte, não uma medida exata.
+    """
+    size = 0
+    records = qa_data.get("questions", [])
+    if isinstance(records, LazyRecords):
+        # Snapshot: conta os registros codificados, sem decodificá-los
+        size += records.nbytes
+        records = ()
+    for record in records:
+        size += sys.getsizeof(record) + sys.getsizeof(record.tokens)
+        for text in (record.question, record.answer, record.normalized_question):
+            size += sys.getsizeof(text) if text else 0
+
+    index = qa_data.get("index")
+    if index is None:
+        return size
+    size += _postings_size(index.postings) + _postings_size(index.trigrams.postings)
+    if index._bm25 is not None:
+        size += _arrays_size(index._bm25) + sys.getsizeof(index._bm25.vocab)
+    if index._semantic is not None:
+        size += _arrays_size(index._semantic)
+        if index._semantic.ann is not None:
+            size += _arrays_size(index._semantic.ann)
+    if index._speller is not None:
+        size += index._speller.nbytes
+    return size
+
+
+def index_generation(qa_data):
+    """Muda quando o índice é trocado ou ganha uma estrutura construída no primeiro uso"""
+    index = qa_data.get("index")
+    return None if index is None else (id(index), index.builds)
+
+
+def _arrays_size(obj):
+    """Bytes dos arrays NumPy guardados como atributos de obj"""
+    return sum(value.nbytes for value in vars(obj).values() if hasattr(value, "nbytes"))
+
+
+def _postings_size(postings):
+    """Tamanho das posting lists (dicionário de listas ou arrays CSR)"""
+    if isinstance(postings, dict):
+        return sys.getsizeof(postings) + sum(sys.getsizeof(value) for value in postings.values())
+    return sys.getsizeof(postings.vocab) + sum(
+        value.nbytes for value in vars(postings).values() if hasattr(value, "nbytes"))
+
+
+class CorpusRegistry:
+    """Manuais carregados sob demanda, com descarte LRU por memória
+
+    get(name) devolve o qa_data do manual; quem já o recebeu continua usando
+    o mesmo objeto mesmo que ele seja descartado do registro depois.
+    """
+
+    def __init__(self, default_path=DATA_PATH, manuals_dir=MANUALS_DIR,
+                 default_name=DEFAULT_MANUAL, memory_mb=CORPUS_MEMORY_MB,
+                 hot_reload=HOT_RELOAD, loader=load_manual):
+        self.default_path = default_path
+        self.manuals_dir = manuals_dir
+        self.default_name = default_name
+        self.memory_budget = int(memory_mb * 1024 * 1024)
+        self.hot_reload = hot_reload
+        self.loader = loader
+        self.loads = 0
+        self.evictions = 0
+        self._lock = threading.Lock()
+        self._load_locks = {}
+        # Nome -> [manual (qa_data ou CorpusReloader), tamanho estimado, geração do
+        # índice estimada], do menos ao mais usado
+        self._loaded = OrderedDict()
+        self._paths = {}
+        self.refresh()
+
+    def refresh(self):
+        """Relê a lista de manuais disponíveis"""
+        paths = discover_manuals(self.default_path, self.manuals_dir, self.default_name)
+        with self._lock:
+            self._paths = paths
+        return paths
+
+    def names(self):
+        """Nomes dos manuais disponíveis (o padrão primeiro)"""
+        return list(self._paths)
+
+    def loaded(self):
+        """Nomes dos manuais em memória, do menos ao mais usado"""
+        with self._lock:
+            return list(self._loaded)
+
+    def path(self, name):
+        return self._paths.get(name)
+
+    def resolve(self, name=None):
+        """Nome válido do manual: None escolhe o padrão (ou o primeiro disponível)"""
+        if name is None:
+            name = self.default_name if self.default_name in self._paths else next(iter(self._paths), None)
+        if name not in self._paths:
+            # Manual criado depois da inicialização
+            self.refresh()
+        if name not in self._paths:
+            raise KeyError(name)
+        return name
+
+    def get(self, name=None):
+        """qa_data do manual, carregado no primeiro uso (KeyError se não existir)"""
+        name = self.resolve(name)
+        with self._lock:
+            entry = self._loaded.get(name)
+            if entry is not None:
+                self._loaded.move_to_end(name)
+            else:
+                load_lock = self._load_locks.setdefault(name, threading.Lock())
+
+        if entry is not None:
+            qa_data = self._current(entry[0])
+            if index_generation(qa_data) != entry[2]:
+                # Índices construídos no primeiro uso (ou manual recarregado) desde a estimativa
+                self._resize(name, entry, qa_data)
+            return qa_data
+
+        # Carrega fora do lock geral: outros manuais continuam respondendo
+        with load_lock:
+            with self._lock:
+                entry = self._loaded.get(name)
+            if entry is None:
+                entry = self._load(name)
+        return self._current(entry[0])
+
+    def _load(self, name):
+        path = self._paths[name]
+        if self.hot_reload:
+            corpus = CorpusReloader(path, loader=self.loader).start()
+        else:
+            corpus = self.loader(path)
+        qa_data = self._current(corpus)
+        entry = [corpus, estimate_size(qa_data), index_generation(qa_data)]
+
+        with self._lock:
+            self._loaded[name] = entry
+            self.loads += 1
+            evicted = self._evict(keep=name)
+        self._stop(evicted)
+        return entry
+
+    def _resize(self, name, entry, qa_data):
+        """Refaz a estimativa de um manual carregado e descarta outros se passar do limite"""
+        generation = index_generation(qa_data)
+        size = estimate_size(qa_data)
+        with self._lock:
+            entry[1], entry[2] = size, generation
+            evicted = self._evict(keep=name) if name in self._loaded else []
+        self._stop(evicted)
+
+    @staticmethod
+    def _stop(evicted):
+        for corpus in evicted:
+            if isinstance(corpus, CorpusReloader):
+                corpus.stop()
+
+    def _evict(self, keep):
+        """Remove os menos usados até caber no limite (chamado com o lock)"""
+        evicted = []
+        total = sum(size for _, size, _ in self._loaded.values())
+        for name in list(self._loaded):
+            if total <= self.memory_budget:
+                break
+            if name == keep:
+                continue
+            corpus, size, _ = self._loaded.pop(name)
+            total -= size
+            evicted.append(corpus)
+            self.evictions += 1
+        return evicted
+
+    @staticmethod
+    def _current(corpus):
+        return corpus.current() if isinstance(corpus, CorpusReloader) else corpus
+
+    def stats(self):
+        """Manuais disponíveis, carregados e memória estimada"""
+        with self._lock:
+            loaded = {name: round(size / (1024 * 1024), 2) for name, (_, size, _) in self._loaded.items()}
+        return {
+            "available": self.names(),
+            "default": self.default_name,
+            "loaded_mb": loaded,
+            "memory_budget_mb": round(self.memory_budget / (1024 * 1024), 2),
+            "loads": self.loads,
+            "evictions": self.evictions,
+        }
+
+    def close(self):
+        """Interrompe as recargas automáticas e esvazia o registro"""
+        with self._lock:
+            corpora = [corpus for corpus, _, _ in self._loaded.values()]
+            self._loaded.clear()
+        for corpus in corpora:
+            if isinstance(corpus, CorpusReloader):
+                corpus.stop()
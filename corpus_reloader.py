@@ -0,0 +1,101 @@
+"""
+Blink GPT - Recarga automática do manual (hot reload)
+Observa data/qa_data.json e troca o manual carregado sem reiniciar o servidor
+"""
+
+import hashlib
+import os
+import threading
+
+from qa_engine import DATA_PATH, load_corpus
+
+# Ativa o modo hot reload e define o intervalo de verificação (segundos)
+HOT_RELOAD = os.environ.get("BLINK_HOT_RELOAD", "0") == "1"
+RELOAD_INTERVAL = float(os.environ.get("BLINK_RELOAD_INTERVAL", "5"))
+
+
+def file_digest(path):
+    """Hash SHA-256 do conteúdo do arquivo"""
+    digest = hashlib.sha256()
+    with open(path, "rb") as f:
+        for block in iter(lambda: f.read(1 << 20), b""):
+            digest.update(block)
+    return digest.hexdigest()
+
+
+class CorpusReloader:
+    """Mantém o manual e seus índices atualizados em uma thread de fundo
+
+    current() apenas lê uma referência: nunca espera pela recarga. O manual
+    novo é construído por completo antes da troca, inclusive o corretor, o
+    BM25 e os vetores semânticos, então perguntas em andamento continuam
+    usando o manual antigo até terminarem e a primeira pergunta depois da
+    troca não paga a construção dos índices.
+    """
+
+    def __init__(self, path=DATA_PATH, interval=RELOAD_INTERVAL, loader=load_corpus):
+        self.path = path
+        self.interval = interval
+        self.loader = loader
+        self.reloads = 0
+        self.last_error = None
+        self._stop = threading.Event()
+        self._thread = None
+
+        self._signature = self._stat()
+        self._qa_data = loader(path)
+
+    def _stat(self):
+        """Assinatura barata do arquivo: data de modificação e tamanho"""
+        stat = os.stat(self.path)
+        return stat.st_mtime_ns, stat.st_size
+
+    def current(self):
+        """Manual atual (snapshot imutável para quem o recebeu)"""
+        return self._qa_data
+
+    def check(self):
+        """Recarrega se o arquivo mudou; retorna True se houve troca"""
+        try:
+            signature = self._stat()
+            if signature == self._signature:
+                return False
+
+            # Data mudou mas o conteúdo pode ser o mesmo (ex.: git checkout)
+            if file_digest(self.path) == self._qa_data.get("content_hash"):
+                self._signature = signature
+                return False
+
+            qa_data = self.loader(self.path)
+            # Índices do primeiro uso construídos aqui, fora das requisições
+            if qa_data.get("index") is not None:
+                qa_data["index"].warm()
+        except Exception as e:
+            # Arquivo em escrita ou inválido: mantém o manual atual e tenta de novo
+            self.last_error = e
+            return False
+
+        self._qa_data = qa_data
+        self._signature = signature
+        self.reloads += 1
+        self.last_error = None
+        return True
+
+    def _run(self):
+        while not self._stop.wait(self.interval):
+            self.check()
+
+    def start(self):
+        """Inicia a verificação periódica em segundo plano"""
+        if self._thread is None:
+            self._stop.clear()
+            self._thread = threading.Thread(target=self._run, name="corpus-reloader", daemon=True)
+            self._thread.start()
+        return self
+
+    def stop(self):
+        """Interrompe a verificação periódica"""
+        self._stop.set()
+        if self._thread is not None:
+            self._thread.join()
+            self._thread = None
@@ -0,0 +1,255 @@
+"""
+Blink GPT - Snapshot binário do manual para partida rápida
+Compila data/qa_data.json (registros, textos normalizados, vocabulário,
+posting lists e trigramas) em um arquivo versionado lido via mmap, sem reconstruir índices.
+
+Uso:
+    python corpus_snapshot.py [--input data/qa_data.json] [--output data/qa_data.snapshot]
+"""
+
+import argparse
+import hashlib
+import json
+import mmap
+import os
+import struct
+import sys
+
+import numpy as np
+
+import bm25
+import stemmer
+from ann_index import vectors_path_for
+from bm25 import BM25Index
+from corpus_store import RECORD_FIELDS, FieldView, LazyRecords, RecordView
+from postings import CSRPostings, to_csr
+from qa_engine import DATA_PATH, GENERIC_WORDS, QAIndex, build_topic_search, load_corpus
+from trigram_index import TrigramIndex
+
+SNAPSHOT_PATH = "data/qa_data.snapshot"
+
+MAGIC = b"BLINKQA\0"
+FORMAT_VERSION = 3
+ALIGNMENT = 8
+
+
+def engine_signature():
+    """Identifica formato e regras de tokenização/pontuação usadas no snapshot"""
+    payload = json.dumps([FORMAT_VERSION, sorted(GENERIC_WORDS), bm25.K1, bm25.B, stemmer.RULES])
+    return hashlib.sha256(payload.encode("utf-8")).hexdigest()
+
+
+def source_digest(path):
+    """Hash SHA-256 do JSON de origem"""
+    with open(path, "rb") as f:
+        return hashlib.sha256(f.read()).hexdigest()
+
+
+def build_snapshot(json_path=DATA_PATH, snapshot_path=SNAPSHOT_PATH):
+    """Compila o JSON em um snapshot binário; retorna o cabeçalho gravado"""
+    # Data e tamanho lidos antes do conteúdo: se o JSON mudar no meio, o
+    # snapshot já nasce desatualizado (e o hash decide)
+    source_stat = os.stat(json_path)
+    qa_data = load_corpus(json_path)
+    index = qa_data["index"]
+    matrix = index.bm25
+
+    # Um JSON por registro, em sequência: a carga decodifica só os registros usados
+    records = [
+        json.dumps(dict({field: getattr(record, field) for field in RECORD_FIELDS},
+                        tokens=sorted(record.tokens)), ensure_ascii=False).encode("utf-8")
+        for record in index.records
+    ]
+    record_offsets = np.zeros(len(records) + 1, dtype=np.int64)
+    np.cumsum([len(record) for record in records], out=record_offsets[1:])
+
+    # Tópicos apontam para as posições dos registros (sem duplicar o conteúdo)
+    topics = {}
+    for topic, data in qa_data.get("topics", {}).items():
+        topics[topic] = {
+            "count": data.get("count", len(data["positions"])),
+            "normalized_topic": data.get("normalized_topic"),
+            "positions": data["positions"],
+        }
+
+    meta = {key: value for key, value in qa_data.items()
+            if key not in ("topics", "questions", "index", "topic_search")}
+    meta["topics"] = topics
+
+    terms = [None] * len(matrix.vocab)
+    for term, row in matrix.vocab.items():
+        terms[row] = term
+
+    grams, gram_indptr, gram_ids = to_csr(index.trigrams.postings)
+
+    sections = {
+        "meta": json.dumps(meta, ensure_ascii=False).encode("utf-8"),
+        "records": b"".join(records),
+        "record_offsets": record_offsets,
+        "ids": json.dumps([record.id for record in index.records]).encode("utf-8"),
+        "vocab": "\n".join(terms).encode("utf-8"),
+        "indptr": np.ascontiguousarray(matrix.indptr, dtype=np.int64),
+        "doc_ids": np.ascontiguousarray(matrix.doc_ids, dtype=np.int32),
+        "weights": np.ascontiguousarray(matrix.weights, dtype=np.float32),
+        "idf": np.ascontiguousarray(matrix.idf, dtype=np.float32),
+        "trigrams": json.dumps(grams, ensure_ascii=False).encode("utf-8"),
+        "trigram_indptr": gram_indptr,
+        "trigram_ids": gram_ids,
+    }
+
+    header = {
+        "format_version": FORMAT_VERSION,
+        "signature": engine_signature(),
+        "source_hash": qa_data["content_hash"],
+        "source_mtime_ns": source_stat.st_mtime_ns,
+        "source_size": source_stat.st_size,
+        "n_docs": matrix.n_docs,
+        "unseen_idf": matrix.unseen_idf,
+        "sections": {},
+    }
+
+    # Deslocamentos relativos ao início da área de dados (após o cabeçalho)
+    offset = 0
+    for name, data in sections.items():
+        raw = data.tobytes() if isinstance(data, np.ndarray) else data
+        header["sections"][name] = {
+            "offset": offset,
+            "size": len(raw),
+            "dtype": data.dtype.str if isinstance(data, np.ndarray) else "bytes",
+        }
+        offset += _padded(len(raw))
+
+    header_bytes = json.dumps(header).encode("utf-8")
+    data_start = _padded(len(MAGIC) + 4 + len(header_bytes))
+
+    tmp_path = snapshot_path + ".tmp"
+    with open(tmp_path, "wb") as f:
+        f.write(MAGIC)
+        f.write(struct.pack("<I", len(header_bytes)))
+        f.write(header_bytes)
+        f.write(b"\0" * (data_start - f.tell()))
+        for name, data in sections.items():
+            raw = data.tobytes() if isinstance(data, np.ndarray) else data
+            f.write(raw)
+            f.write(b"\0" * (_padded(len(raw)) - len(raw)))
+    os.replace(tmp_path, snapshot_path)
+    return header
+
+
+def _padded(size):
+    return (size + ALIGNMENT - 1) // ALIGNMENT * ALIGNMENT
+
+
+def read_header(mapped):
+    """Lê e valida o cabeçalho; retorna (cabeçalho, início dos dados)"""
+    if mapped[:len(MAGIC)] != MAGIC:
+        raise ValueError("Arquivo não é um snapshot do Blink GPT")
+    (header_size,) = struct.unpack_from("<I", mapped, len(MAGIC))
+    start = len(MAGIC) + 4
+    header = json.loads(bytes(mapped[start:start + header_size]).decode("utf-8"))
+    return header, _padded(start + header_size)
+
+
+def is_current(header, source_path):
+    """O snapshot corresponde ao JSON de origem?
+
+    Data de modificação e tamanho iguais bastam; só quando diferem o JSON é
+    lido e comparado pelo hash (ex.: arquivo copiado com o mesmo conteúdo).
+    """
+    stat = os.stat(source_path)
+    if (header.get("source_mtime_ns"), header.get("source_size")) == (stat.st_mtime_ns, stat.st_size):
+        return True
+    return header.get("source_hash") == source_digest(source_path)
+
+
+def load_snapshot(snapshot_path=SNAPSHOT_PATH, source_hash=None, source_path=None):
+    """Carrega o snapshot (arrays mapeados em memória); None se inválido ou desatualizado
+
+    A validade vem de source_hash (hash do JSON) ou de source_path (o próprio
+    JSON, conferido por is_current). Os registros são decodificados sob demanda.
+    """
+    try:
+        with open(snapshot_path, "rb") as f:
+            mapped = mmap.mmap(f.fileno(), 0, access=mmap.ACCESS_READ)
+        header, data_start = read_header(mapped)
+    except (OSError, ValueError):
+        return None
+
+    if header.get("format_version") != FORMAT_VERSION or header.get("signature") != engine_signature():
+        return None
+    if source_hash is not None and header.get("source_hash") != source_hash:
+        return None
+    if source_path is not None and not is_current(header, source_path):
+        return None
+
+    def section(name):
+        info = header["sections"][name]
+        start = data_start + info["offset"]
+        if info["dtype"] == "bytes":
+            return mapped[start:start + info["size"]]
+        dtype = np.dtype(info["dtype"])
+        return np.frombuffer(mapped, dtype=dtype, count=info["size"] // dtype.itemsize, offset=start)
+
+    def lines(name):
+        return section(name).decode("utf-8").split("\n") if header["sections"][name]["size"] else []
+
+    matrix = BM25Index.from_arrays(
+        lines("vocab"),
+        section("indptr"), section("doc_ids"), section("weights"), section("idf"),
+        header["n_docs"], header["unseen_idf"],
+    )
+
+    # Registros lidos direto do mapeamento (sem copiar a seção)
+    info = header["sections"]["records"]
+    record_data = memoryview(mapped)[data_start + info["offset"]:data_start + info["offset"] + info["size"]]
+    records = LazyRecords(record_data, section("record_offsets"),
+                          json.loads(section("ids").decode("utf-8")))
+
+    qa_data = json.loads(section("meta").decode("utf-8"))
+    qa_data["topics"] = {sys.intern(topic): data for topic, data in qa_data["topics"].items()}
+    for data in qa_data["topics"].values():
+        data["questions"] = RecordView(records, data["positions"])
+    qa_data["questions"] = records
+
+    grams = json.loads(section("trigrams").decode("utf-8"))
+    gram_postings = CSRPostings({gram: row for row, gram in enumerate(grams)},
+                                section("trigram_indptr"), section("trigram_ids"))
+    trigrams = TrigramIndex(FieldView(records, "normalized_question"), postings=gram_postings)
+
+    qa_data["index"] = QAIndex(records, bm25=matrix, trigrams=trigrams)
+    qa_data["topic_search"] = build_topic_search(qa_data)
+    return qa_data
+
+
+def load_snapshot_or_json(json_path=DATA_PATH, snapshot_path=SNAPSHOT_PATH):
+    """Usa o snapshot se estiver em dia com o JSON; senão lê o JSON"""
+    try:
+        qa_data = load_snapshot(snapshot_path, source_path=json_path)
+    except OSError:
+        qa_data = None
+    if qa_data is None:
+        return load_corpus(json_path)
+
+    # Vetores semânticos ficam em arquivo próprio, ao lado do JSON
+    qa_data["index"].vectors_path = vectors_path_for(json_path)
+    qa_data["index"].source_hash = qa_data.get("content_hash")
+    return qa_data
+
+
+def main():
+    """Linha de comando: compila o snapshot"""
+    parser = argparse.ArgumentParser(description="Compila data/qa_data.json em snapshot binário")
+    parser.add_argument("--input", default=DATA_PATH, help="JSON de origem")
+    parser.add_argument("--output", default=SNAPSHOT_PATH, help="arquivo de snapshot")
+    args = parser.parse_args()
+
+    header = build_snapshot(args.input, args.output)
+    size = os.path.getsize(args.output)
+    print(f"✅ Snapshot gerado: {args.output} ({size / 1024:.1f} KB)")
+    print(f"  └─ Perguntas: {header['n_docs']}")
+    print(f"  └─ Origem: {header['source_hash'][:12]}")
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
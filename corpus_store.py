@@ -0,0 +1,169 @@
+"""
+Blink GPT - Armazenamento compacto do manual
+O JSON traz cada pergunta duas vezes (em "questions" e dentro do tópico).
+Aqui cada id vira um único registro com __slots__, guardado em um só vetor;
+os tópicos passam a ser listas de posições nesse vetor.
+"""
+
+import json
+import sys
+from collections.abc import Sequence
+
+# Campos de cada pergunta (os normalizados e tokens são preenchidos pelo índice)
+RECORD_FIELDS = ("id", "topic", "question", "answer", "normalized_question", "normalized_topic")
+
+
+class QARecord:
+    """Uma pergunta do manual; aceita acesso como dicionário (record['answer'])"""
+
+    __slots__ = RECORD_FIELDS + ("tokens",)
+
+    def __init__(self, id=None, topic=None, question="", answer="",
+                 normalized_question=None, normalized_topic=None, tokens=frozenset()):
+        self.id = id
+        self.topic = sys.intern(topic) if topic else topic
+        self.question = question
+        self.answer = answer
+        self.normalized_question = normalized_question
+        self.normalized_topic = sys.intern(normalized_topic) if normalized_topic else normalized_topic
+        self.tokens = tokens
+
+    @classmethod
+    def from_dict(cls, data):
+        """Registro a partir de um dicionário do JSON"""
+        return cls(**{field: data[field] for field in RECORD_FIELDS if field in data})
+
+    def __getitem__(self, key):
+        try:
+            return getattr(self, key)
+        except (AttributeError, TypeError):
+            raise KeyError(key) from None
+
+    def get(self, key, default=None):
+        return getattr(self, key, default) if isinstance(key, str) else default
+
+    def keys(self):
+        return self.__slots__
+
+    def __contains__(self, key):
+        return key in self.__slots__
+
+    def to_dict(self):
+        """Campos do JSON original"""
+        return {"id": self.id, "topic": self.topic, "question": self.question, "answer": self.answer}
+
+    def __repr__(self):
+        return f"QARecord(id={self.id!r}, question={self.question!r})"
+
+
+class RecordView(Sequence):
+    """Perguntas de um tópico: posições no vetor de registros, sem cópias"""
+
+    __slots__ = ("records", "positions")
+
+    def __init__(self, records, positions):
+        self.records = records
+        self.positions = positions
+
+    def __len__(self):
+        return len(self.positions)
+
+    def __getitem__(self, index):
+        if isinstance(index, slice):
+            return [self.records[pos] for pos in self.positions[index]]
+        return self.records[self.positions[index]]
+
+    def __iter__(self):
+        records = self.records
+        return (records[pos] for pos in self.positions)
+
+
+class LazyRecords(Sequence):
+    """Registros gravados em JSON, um após o outro (snapshot), decodificados no primeiro acesso
+
+    data: bytes (ou mmap) com os registros; offsets: n + 1 deslocamentos;
+    ids: id de cada registro, para achar um registro sem decodificar os outros.
+    """
+
+    __slots__ = ("data", "offsets", "ids", "_records")
+
+    def __init__(self, data, offsets, ids):
+        self.data = data
+        self.offsets = offsets
+        self.ids = ids
+        self._records = [None] * (len(offsets) - 1)
+
+    def __len__(self):
+        return len(self._records)
+
+    def __getitem__(self, index):
+        if isinstance(index, slice):
+            return [self[pos] for pos in range(*index.indices(len(self)))]
+        record = self._records[index]
+        if record is None:
+            pos = range(len(self))[index]
+            start, end = int(self.offsets[pos]), int(self.offsets[pos + 1])
+            data = json.loads(bytes(self.data[start:end]).decode("utf-8"))
+            record = QARecord(**dict(data, tokens=frozenset(data["tokens"])))
+            self._records[pos] = record
+        return record
+
+    @property
+    def nbytes(self):
+        """Tamanho dos registros ainda codificados"""
+        return len(self.data) + self.offsets.nbytes
+
+
+class FieldView(Sequence):
+    """Um campo de cada registro (ex.: normalized_question), sem montar a lista inteira"""
+
+    __slots__ = ("records", "field")
+
+    def __init__(self, records, field):
+        self.records = records
+        self.field = field
+
+    def __len__(self):
+        return len(self.records)
+
+    def __getitem__(self, index):
+        if isinstance(index, slice):
+            return [getattr(record, self.field) for record in self.records[index]]
+        return getattr(self.records[index], self.field)
+
+
+def compact_corpus(qa_data):
+    """Troca as listas de dicionários do JSON por um único vetor de registros
+
+    qa_data["questions"] vira a lista de QARecord (um por id) e cada tópico
+    ganha "positions" e uma RecordView em "questions". Pode ser chamada de
+    novo sobre um manual já compactado.
+    """
+    records = []
+    positions = {}
+
+    def add(question):
+        qid = question.get("id")
+        pos = positions.get(qid) if qid is not None else None
+        if pos is None:
+            pos = len(records)
+            if qid is not None:
+                positions[qid] = pos
+            records.append(question if isinstance(question, QARecord) else QARecord.from_dict(question))
+        return pos
+
+    for question in qa_data.get("questions", []):
+        add(question)
+
+    topics = {}
+    for topic, data in qa_data.get("topics", {}).items():
+        data = dict(data)
+        topic_positions = [add(question) for question in data.get("questions", [])]
+        data["positions"] = topic_positions
+        data["questions"] = RecordView(records, topic_positions)
+        topics[sys.intern(topic)] = data
+
+    qa_data["questions"] = records
+    if "topics" in qa_data:
+        qa_data["topics"] = topics
+    return qa_data
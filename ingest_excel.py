@@ -0,0 +1,375 @@
+#!/usr/bin/env python3
+"""
+Blink GPT - Importação da planilha do manual para data/qa_data.json
+Lê a planilha linha a linha (openpyxl em modo somente leitura, memória
+constante na leitura) e grava o JSON com tópicos e contagens. Cada linha tem
+um hash guardado no manifesto (data/qa_data.manifest.json): só perguntas
+novas, alteradas ou removidas disparam atualização dos índices derivados.
+
+Uso:
+    python ingest_excel.py manual.xlsx [--sheet Aba] [--output data/qa_data.json]
+                           [--snapshot] [--full] [--dry-run]
+"""
+
+import argparse
+import hashlib
+import json
+import os
+import sys
+from datetime import date
+
+import numpy as np
+from openpyxl import load_workbook
+
+from ann_index import ANN_MIN_DOCS, build_ann, load_vectors, save_vectors, vectors_path_for
+from corpus_registry import snapshot_path_for
+from corpus_snapshot import build_snapshot, source_digest
+from corpus_store import QARecord
+from qa_engine import DATA_PATH, normalize_record, normalize_text, semantic_fields, semantic_signature
+from semantic import SemanticIndex
+
+JSON_VERSION = "2.0"
+MANIFEST_VERSION = 1
+
+# Fração máxima de perguntas vetorizadas sem refazer a SVD; acima dela os
+# vetores semânticos são reconstruídos do zero
+MAX_FOLDED_FRACTION = 0.2
+
+# Nomes aceitos no cabeçalho da planilha (normalizados: minúsculas, sem acento)
+COLUMN_NAMES = {
+    "id": ("id", "codigo", "numero", "n", "no"),
+    "topic": ("topico", "topicos", "topic", "tema", "assunto", "secao"),
+    "question": ("pergunta", "perguntas", "question"),
+    "answer": ("resposta", "respostas", "answer"),
+}
+
+
+class IngestError(ValueError):
+    """Planilha sem as colunas esperadas ou com ids repetidos"""
+
+
+def manifest_path_for(json_path):
+    """Manifesto ao lado do JSON: data/qa_data.json -> data/qa_data.manifest.json"""
+    return os.path.splitext(json_path)[0] + ".manifest.json"
+
+
+def _cell_text(value):
+    if value is None:
+        return ""
+    if isinstance(value, float) and value.is_integer():
+        value = int(value)
+    return str(value).strip()
+
+
+def find_columns(header):
+    """Coluna (índice) de cada campo a partir da linha de cabeçalho"""
+    columns = {}
+    for pos, value in enumerate(header):
+        name = normalize_text(_cell_text(value)).strip(" :#.")
+        for field, names in COLUMN_NAMES.items():
+            if name in names:
+                columns.setdefault(field, pos)
+    missing = [field for field in ("question", "answer") if field not in columns]
+    if missing:
+        raise IngestError("cabeçalho sem as colunas: " + ", ".join(missing)
+                          + " (esperado: Tópico, Pergunta, Resposta e, opcionalmente, ID)")
+    return columns
+
+
+def read_rows(path, sheet=None, stats=None):
+    """Gera (id ou None, tópico, pergunta, resposta) de cada linha da planilha
+
+    Células de tópico vazias herdam o tópico da linha anterior (células
+    mescladas). Linhas sem pergunta ou resposta são ignoradas e contadas em
+    stats["skipped"].
+    """
+    stats = {} if stats is None else stats
+    stats.update(sheet=None, skipped=0)
+    workbook = load_workbook(path, read_only=True, data_only=True)
+    try:
+        worksheet = workbook[sheet] if sheet else workbook.active
+        stats["sheet"] = worksheet.title
+        rows = worksheet.iter_rows(values_only=True)
+        columns = None
+        for header in rows:
+            if any(_cell_text(value) for value in header):
+                columns = find_columns(header)
+                break
+        if columns is None:
+            raise IngestError("planilha vazia")
+
+        def cell(values, field):
+            pos = columns.get(field)
+            return _cell_text(values[pos]) if pos is not None and pos < len(values) else ""
+
+        topic = ""
+        for values in rows:
+            topic = cell(values, "topic") or topic
+            question, answer = cell(values, "question"), cell(values, "answer")
+            if not question or not answer or not topic:
+                stats["skipped"] += any(_cell_text(value) for value in values)
+                continue
+            qid = cell(values, "id")
+            try:
+                qid = int(qid) if qid else None
+            except ValueError:
+                raise IngestError(f"id inválido na planilha: {qid!r}") from None
+            yield qid, topic, question, answer
+    finally:
+        workbook.close()
+
+
+def row_hash(topic, question, answer):
+    """Hash do conteúdo de uma linha"""
+    payload = json.dumps([topic, question, answer], ensure_ascii=False)
+    return hashlib.sha1(payload.encode("utf-8")).hexdigest()
+
+
+def row_key(qid, topic, question):
+    """Identidade da pergunta entre importações: o id da planilha ou tópico + pergunta"""
+    if qid is not None:
+        return f"id:{qid}"
+    text = normalize_text(topic) + "\n" + " ".join(normalize_text(question).split())
+    return "q:" + hashlib.sha1(text.encode("utf-8")).hexdigest()
+
+
+def load_manifest(path):
+    """Manifesto da importação anterior, ou None"""
+    try:
+        with open(path, "r", encoding="utf-8") as f:
+            manifest = json.load(f)
+    except (OSError, ValueError):
+        return None
+    return manifest if manifest.get("format_version") == MANIFEST_VERSION else None
+
+
+def diff_rows(rows, manifest):
+    """Compara as linhas lidas com o manifesto anterior
+
+    Retorna (registros, linhas do manifesto novo, posições antigas, resumo).
+    A posição antiga é a da mesma pergunta inalterada no JSON anterior, ou -1
+    para perguntas novas e alteradas. Sem id na planilha, cada pergunta
+    mantém o id da importação anterior; as novas recebem o próximo livre.
+    """
+    previous = {key: (qid, digest, pos)
+                for pos, (qid, key, digest) in enumerate((manifest or {}).get("rows", []))}
+
+    records = []
+    keys = []
+    digests = []
+    seen_keys = set()
+    explicit_ids = set()
+    for qid, topic, question, answer in rows:
+        if qid is not None:
+            if qid in explicit_ids:
+                raise IngestError(f"id repetido na planilha: {qid}")
+            explicit_ids.add(qid)
+        key = row_key(qid, topic, question)
+        # Mesma pergunta repetida no mesmo tópico: ocorrências distintas
+        base_key, repeat = key, 1
+        while key in seen_keys:
+            repeat += 1
+            key = f"{base_key}#{repeat}"
+        seen_keys.add(key)
+        records.append({"id": qid, "topic": topic, "question": question, "answer": answer})
+        keys.append(key)
+        digests.append(row_hash(topic, question, answer))
+
+    # Ids: os da planilha, depois os da importação anterior, depois novos
+    used_ids = set(explicit_ids)
+    next_id = max([qid for qid, _, _ in previous.values()] + list(explicit_ids) + [0]) + 1
+    manifest_rows = []
+    old_positions = []
+    summary = {"added": 0, "changed": 0, "removed": 0, "unchanged": 0}
+    for record, key, digest in zip(records, keys, digests):
+        old = previous.get(key)
+        if record["id"] is None:
+            if old is not None and old[0] not in used_ids:
+                record["id"] = old[0]
+            else:
+                record["id"] = next_id
+                next_id += 1
+            used_ids.add(record["id"])
+
+        if old is None:
+            summary["added"] += 1
+            old_positions.append(-1)
+        elif old[1] != digest or old[0] != record["id"]:
+            summary["changed"] += 1
+            old_positions.append(-1)
+        else:
+            summary["unchanged"] += 1
+            old_positions.append(old[2])
+        manifest_rows.append([record["id"], key, digest])
+
+    summary["removed"] = len(previous.keys() - seen_keys)
+    return records, manifest_rows, old_positions, summary
+
+
+def write_json(path, records, last_updated=None, buffer_size=1 << 20):
+    """Grava o JSON do manual em pedaços (mesmo formato e indentação do arquivo atual)
+
+    Retorna o hash SHA-256 do conteúdo gravado.
+    """
+    topics = {}
+    for record in records:
+        topics.setdefault(record["topic"], []).append(record)
+    data = {
+        "version": JSON_VERSION,
+        "last_updated": last_updated or date.today().isoformat(),
+        "total_questions": len(records),
+        "topics": {topic: {"count": len(questions), "questions": questions}
+                   for topic, questions in topics.items()},
+        "questions": records,
+    }
+
+    digest = hashlib.sha256()
+    pending = []
+    pending_size = 0
+    with open(path, "wb") as f:
+        for chunk in json.JSONEncoder(ensure_ascii=False, indent=2).iterencode(data):
+            pending.append(chunk)
+            pending_size += len(chunk)
+            if pending_size >= buffer_size:
+                block = "".join(pending).encode("utf-8")
+                digest.update(block)
+                f.write(block)
+                pending, pending_size = [], 0
+        block = "".join(pending).encode("utf-8")
+        digest.update(block)
+        f.write(block)
+    return digest.hexdigest()
+
+
+def write_atomic(path, content):
+    """Grava em arquivo temporário e troca (quem observa o arquivo nunca lê pela metade)"""
+    tmp_path = path + ".tmp"
+    with open(tmp_path, "wb") as f:
+        f.write(content)
+    os.replace(tmp_path, path)
+
+
+def update_vectors(vectors_path, records, old_positions, previous_hash, source_hash, folded=0):
+    """Atualiza os vetores semânticos gravados para o novo JSON
+
+    Perguntas inalteradas reaproveitam o vetor anterior; novas e alteradas
+    são vetorizadas com a projeção existente. Sem vetores válidos, ou com
+    mais de MAX_FOLDED_FRACTION do manual vetorizado assim, tudo é
+    reconstruído. Retorna (vetores recalculados, acumulado sem SVD, reconstruído).
+    """
+    signature = semantic_signature()
+    previous = load_vectors(vectors_path, previous_hash, signature) if previous_hash else None
+    old_positions = np.asarray(old_positions, dtype=np.int64)
+    new_rows = np.flatnonzero(old_positions < 0)
+
+    def documents(positions):
+        return [semantic_fields(normalize_record(QARecord.from_dict(records[pos]))) for pos in positions]
+
+    rebuilt = previous is None or folded + len(new_rows) > MAX_FOLDED_FRACTION * len(records)
+    if rebuilt:
+        semantic = SemanticIndex.build(documents(range(len(records))))
+        folded, embedded = 0, len(records)
+    else:
+        vectors = np.empty((len(records), previous.dim), dtype=np.float32)
+        kept = old_positions >= 0
+        vectors[kept] = previous.vectors[old_positions[kept]]
+        vectors[new_rows] = previous.embed_documents(documents(new_rows))
+        semantic = SemanticIndex(previous.buckets, previous.idf, previous.projection, vectors)
+        folded, embedded = folded + len(new_rows), len(new_rows)
+
+    # As posições mudaram: o índice aproximado é refeito sobre os vetores novos
+    build_ann(semantic, ANN_MIN_DOCS)
+    save_vectors(vectors_path, semantic, source_hash, signature)
+    return embedded, folded, rebuilt
+
+
+def ingest(workbook_path, output=DATA_PATH, sheet=None, snapshot=False, full=False, dry_run=False):
+    """Importa a planilha; retorna o resumo do que mudou"""
+    manifest_path = manifest_path_for(output)
+    manifest = None if full else load_manifest(manifest_path)
+    current_hash = source_digest(output) if os.path.exists(output) else None
+    # JSON editado à mão depois da última importação: os ids continuam, mas
+    # nenhuma posição ou vetor anterior é reaproveitado
+    trusted = manifest is not None and manifest.get("source_hash") == current_hash
+
+    stats = {}
+    records, manifest_rows, old_positions, summary = diff_rows(read_rows(workbook_path, sheet, stats), manifest)
+    summary.update(stats, total=len(records), written=False)
+    if not records:
+        raise IngestError("nenhuma pergunta encontrada na planilha")
+
+    unchanged = (trusted and summary["unchanged"] == len(records) and summary["removed"] == 0
+                 and old_positions == sorted(old_positions))
+    if unchanged or dry_run:
+        return summary
+    if not trusted:
+        old_positions = [-1] * len(records)
+
+    # JSON novo em arquivo temporário, trocado só depois dos vetores: quando
+    # ele aparecer (hot reload), os vetores gravados já valem para ele
+    tmp_path = output + ".tmp"
+    source_hash = write_json(tmp_path, records)
+    try:
+        vectors_path = vectors_path_for(output)
+        folded = manifest.get("folded", 0) if trusted else 0
+        if os.path.exists(vectors_path):
+            summary["embedded"], folded, summary["vectors_rebuilt"] = update_vectors(
+                vectors_path, records, old_positions, current_hash if trusted else None, source_hash, folded)
+        os.replace(tmp_path, output)
+    finally:
+        if os.path.exists(tmp_path):
+            os.remove(tmp_path)
+    summary["written"] = True
+
+    snapshot_path = snapshot_path_for(output)
+    if snapshot or os.path.exists(snapshot_path):
+        build_snapshot(output, snapshot_path)
+        summary["snapshot"] = snapshot_path
+
+    # Manifesto por último: se algo falhar antes, a próxima importação refaz tudo
+    write_atomic(manifest_path, json.dumps({
+        "format_version": MANIFEST_VERSION,
+        "workbook": os.path.basename(workbook_path),
+        "source_hash": source_hash,
+        "folded": folded,
+        "rows": manifest_rows,
+    }, ensure_ascii=False).encode("utf-8"))
+    return summary
+
+
+def main():
+    """Linha de comando"""
+    parser = argparse.ArgumentParser(description="Importa a planilha do manual para JSON")
+    parser.add_argument("workbook", help="planilha (.xlsx) com Tópico, Pergunta, Resposta e, opcionalmente, ID")
+    parser.add_argument("--sheet", help="aba da planilha (padrão: a aba ativa)")
+    parser.add_argument("--output", default=DATA_PATH, help="JSON gerado")
+    parser.add_argument("--snapshot", action="store_true", help="gera o snapshot binário mesmo que ainda não exista")
+    parser.add_argument("--full", action="store_true", help="ignora o manifesto e refaz tudo")
+    parser.add_argument("--dry-run", action="store_true", help="só mostra o que mudaria")
+    args = parser.parse_args()
+
+    try:
+        summary = ingest(args.workbook, args.output, args.sheet, args.snapshot, args.full, args.dry_run)
+    except (IngestError, KeyError, OSError) as e:
+        print(f"❌ Erro ao importar: {e}", file=sys.stderr)
+        return 1
+
+    print(f"📥 {args.workbook} (aba {summary['sheet']}): {summary['total']} perguntas, "
+          f"{summary['skipped']} linhas ignoradas")
+    print(f"  └─ Novas: {summary['added']} | Alteradas: {summary['changed']} | "
+          f"Removidas: {summary['removed']} | Iguais: {summary['unchanged']}")
+    if not summary["written"]:
+        print("ℹ️  Nada gravado" if args.dry_run else "✅ Nada mudou desde a última importação")
+        return 0
+
+    print(f"✅ {args.output} atualizado")
+    if "embedded" in summary:
+        mode = "reconstruídos" if summary["vectors_rebuilt"] else "incremental"
+        print(f"  └─ Vetores semânticos: {summary['embedded']} calculados ({mode})")
+    if "snapshot" in summary:
+        print(f"  └─ Snapshot: {summary['snapshot']}")
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,366 @@
+#!/usr/bin/env python3
+"""
+Blink GPT - Análise dos registros de perguntas (logs/queries*.jsonl)
+Lê os arquivos em fluxo, com memória constante, e mostra:
+perguntas sem resposta mais frequentes, grupos de perguntas sem resposta
+parecidas, acertos por tópico do manual e percentis de latência.
+Arquivos grandes são divididos em blocos processados em paralelo.
+
+Uso:
+    python log_analytics.py                      # logs/ (BLINK_QUERY_LOG_DIR)
+    python log_analytics.py logs/ outros/*.jsonl --top 30 --workers 8 --json
+"""
+
+import argparse
+import heapq
+import json
+import math
+import os
+import sys
+from multiprocessing import Pool
+
+from qa_engine import index_terms
+from query_log import QUERY_LOG_DIR, log_files
+
+CHUNK_BYTES = 64 * 1024 * 1024
+CAPACITY = 2000
+SIMILARITY = 0.5
+
+# Histograma de latência: baldes logarítmicos com erro relativo de até 5%
+LATENCY_BASE = 1.05
+LATENCY_MIN_MS = 0.001
+
+
+class SpaceSaving:
+    """Top-k aproximado (Space-Saving) com no máximo capacity contadores
+
+    A contagem de cada item é um limite superior; error guarda quanto dela
+    pode ter sido herdado do item substituído.
+    """
+
+    def __init__(self, capacity=CAPACITY):
+        self.capacity = capacity
+        self.counts = {}
+        self.errors = {}
+        self._heap = []
+
+    def add(self, item, amount=1):
+        counts = self.counts
+        if item in counts:
+            counts[item] += amount
+        elif len(counts) < self.capacity:
+            counts[item] = amount
+            self.errors[item] = 0
+        else:
+            # Substitui o item de menor contagem, herdando a contagem dele
+            floor, victim = self._pop_min()
+            del counts[victim]
+            del self.errors[victim]
+            counts[item] = floor + amount
+            self.errors[item] = floor
+        heapq.heappush(self._heap, (counts[item], item))
+        if len(self._heap) > 4 * self.capacity:
+            self._heap = [(count, key) for key, count in counts.items()]
+            heapq.heapify(self._heap)
+
+    def _pop_min(self):
+        # Entradas antigas do heap (contagem já desatualizada) são ignoradas
+        while True:
+            count, item = heapq.heappop(self._heap)
+            if self.counts.get(item) == count:
+                return count, item
+
+    def floor(self):
+        """Contagem máxima de um item que não está sendo acompanhado"""
+        return min(self.counts.values()) if len(self.counts) >= self.capacity else 0
+
+    def merge(self, other):
+        """Combina com outro resumo (itens ausentes contam pelo piso de cada lado)"""
+        own_floor, other_floor = self.floor(), other.floor()
+        merged = {}
+        for item in self.counts.keys() | other.counts.keys():
+            count = self.counts.get(item, own_floor) + other.counts.get(item, other_floor)
+            error = (self.errors.get(item, own_floor) + other.errors.get(item, other_floor))
+            merged[item] = (count, error)
+
+        top = heapq.nlargest(self.capacity, merged.items(), key=lambda entry: entry[1][0])
+        self.counts = {item: count for item, (count, _) in top}
+        self.errors = {item: error for item, (_, error) in top}
+        self._heap = [(count, item) for item, count in self.counts.items()]
+        heapq.heapify(self._heap)
+        return self
+
+    def top(self, n):
+        """Os n itens mais frequentes: (item, contagem, erro)"""
+        items = heapq.nlargest(n, self.counts.items(), key=lambda entry: entry[1])
+        return [(item, count, self.errors[item]) for item, count in items]
+
+    def __getstate__(self):
+        return {"capacity": self.capacity, "counts": self.counts, "errors": self.errors}
+
+    def __setstate__(self, state):
+        self.capacity = state["capacity"]
+        self.counts = state["counts"]
+        self.errors = state["errors"]
+        self._heap = [(count, item) for item, count in self.counts.items()]
+        heapq.heapify(self._heap)
+
+
+class LatencyHistogram:
+    """Histograma logarítmico de latências (somável entre blocos)"""
+
+    def __init__(self):
+        self.buckets = {}
+        self.count = 0
+        self.total = 0.0
+        self.max = 0.0
+
+    def add(self, latency_ms):
+        bucket = int(math.log(max(latency_ms, LATENCY_MIN_MS) / LATENCY_MIN_MS, LATENCY_BASE))
+        self.buckets[bucket] = self.buckets.get(bucket, 0) + 1
+        self.count += 1
+        self.total += latency_ms
+        self.max = max(self.max, latency_ms)
+
+    def merge(self, other):
+        for bucket, count in other.buckets.items():
+            self.buckets[bucket] = self.buckets.get(bucket, 0) + count
+        self.count += other.count
+        self.total += other.total
+        self.max = max(self.max, other.max)
+        return self
+
+    def percentile(self, pct):
+        """Limite superior do balde que contém o percentil"""
+        if not self.count:
+            return None
+        rank = pct / 100 * self.count
+        seen = 0
+        for bucket in sorted(self.buckets):
+            seen += self.buckets[bucket]
+            if seen >= rank:
+                return min(self.max, LATENCY_MIN_MS * LATENCY_BASE ** (bucket + 1))
+        return self.max
+
+
+class LogSummary:
+    """Resumo somável de um trecho dos logs"""
+
+    def __init__(self, capacity=CAPACITY):
+        self.queries = 0
+        self.invalid = 0
+        self.stages = {}
+        self.topics = {}
+        self.misses = SpaceSaving(capacity)
+        self.latency = LatencyHistogram()
+
+    def add(self, entry):
+        self.queries += 1
+        stage = entry.get("stage") or ("direct" if entry.get("found") else "miss")
+        self.stages[stage] = self.stages.get(stage, 0) + 1
+
+        topic = entry.get("topic")
+        if topic:
+            # [respostas, pela busca direta, soma das pontuações]
+            stats = self.topics.get(topic)
+            if stats is None:
+                stats = self.topics[topic] = [0, 0, 0.0]
+            stats[0] += 1
+            stats[1] += stage == "direct"
+            stats[2] += entry.get("score") or 0.0
+        elif stage == "miss":
+            self.misses.add(entry.get("query", ""))
+
+        latency = entry.get("latency_ms")
+        if latency is not None:
+            self.latency.add(latency)
+
+    def merge(self, other):
+        self.queries += other.queries
+        self.invalid += other.invalid
+        for stage, count in other.stages.items():
+            self.stages[stage] = self.stages.get(stage, 0) + count
+        for topic, (hits, direct, score) in other.topics.items():
+            stats = self.topics.setdefault(topic, [0, 0, 0.0])
+            stats[0] += hits
+            stats[1] += direct
+            stats[2] += score
+        self.misses.merge(other.misses)
+        self.latency.merge(other.latency)
+        return self
+
+
+def plan_chunks(paths, chunk_bytes=CHUNK_BYTES):
+    """Divide os arquivos em blocos (arquivo, início, fim) de até chunk_bytes"""
+    chunks = []
+    for path in paths:
+        size = os.path.getsize(path)
+        for start in range(0, max(size, 1), chunk_bytes):
+            chunks.append((path, start, min(size, start + chunk_bytes)))
+    return chunks
+
+
+def summarize_chunk(args):
+    """Resume as linhas que começam dentro do bloco [início, fim)"""
+    path, start, end, capacity = args
+    summary = LogSummary(capacity)
+    with open(path, "rb") as f:
+        if start:
+            # A linha que atravessa o início pertence ao bloco anterior
+            f.seek(start - 1)
+            f.readline()
+        while f.tell() < end:
+            line = f.readline()
+            if not line:
+                break
+            try:
+                entry = json.loads(line)
+            except ValueError:
+                summary.invalid += 1
+                continue
+            if isinstance(entry, dict):
+                summary.add(entry)
+            else:
+                summary.invalid += 1
+    return summary
+
+
+def summarize(paths, workers=None, capacity=CAPACITY, chunk_bytes=CHUNK_BYTES):
+    """Resume todos os arquivos, em paralelo quando houver mais de um bloco"""
+    tasks = [(path, start, end, capacity) for path, start, end in plan_chunks(paths, chunk_bytes)]
+    summary = LogSummary(capacity)
+    workers = workers or os.cpu_count() or 1
+    if workers == 1 or len(tasks) <= 1:
+        for task in tasks:
+            summary.merge(summarize_chunk(task))
+        return summary
+
+    with Pool(min(workers, len(tasks))) as pool:
+        for partial in pool.imap_unordered(summarize_chunk, tasks):
+            summary.merge(partial)
+    return summary
+
+
+def cluster_misses(misses, similarity=SIMILARITY):
+    """Agrupa perguntas sem resposta parecidas (Jaccard dos radicais)
+
+    Só os itens acompanhados pelo Space-Saving entram, então o custo não
+    depende do tamanho dos logs. A pergunta mais frequente de cada grupo é
+    a representante.
+    """
+    clusters = []
+    for query, count, _ in misses.top(len(misses.counts)):
+        terms = index_terms(query)
+        for cluster in clusters:
+            leader = cluster["terms"]
+            union = len(terms | leader)
+            if union and len(terms & leader) / union >= similarity:
+                cluster["count"] += count
+                cluster["queries"].append(query)
+                break
+        else:
+            clusters.append({"terms": terms, "leader": query, "count": count, "queries": [query]})
+
+    clusters.sort(key=lambda cluster: cluster["count"], reverse=True)
+    return [{"leader": c["leader"], "count": c["count"], "size": len(c["queries"]),
+             "examples": c["queries"][:5]} for c in clusters]
+
+
+def build_report(summary, top=20, similarity=SIMILARITY):
+    """Relatório em dicionário (base da saída em texto e em JSON)"""
+    answered = summary.queries - summary.stages.get("miss", 0) - summary.stages.get("blocked", 0)
+    topics = sorted(summary.topics.items(), key=lambda item: item[1][0], reverse=True)
+    return {
+        "queries": summary.queries,
+        "invalid_lines": summary.invalid,
+        "answered": answered,
+        "answer_rate": answered / summary.queries if summary.queries else 0.0,
+        "stages": summary.stages,
+        "top_unanswered": [{"query": query, "count": count, "error": error}
+                           for query, count, error in summary.misses.top(top)],
+        "miss_clusters": cluster_misses(summary.misses, similarity)[:top],
+        "topics": [{
+            "topic": topic,
+            "hits": hits,
+            "share": hits / summary.queries if summary.queries else 0.0,
+            "direct_rate": direct / hits if hits else 0.0,
+            "mean_score": score / hits if hits else 0.0,
+        } for topic, (hits, direct, score) in topics],
+        "latency_ms": {
+            "count": summary.latency.count,
+            "mean": summary.latency.total / summary.latency.count if summary.latency.count else None,
+            "p50": summary.latency.percentile(50),
+            "p95": summary.latency.percentile(95),
+            "p99": summary.latency.percentile(99),
+            "max": summary.latency.max if summary.latency.count else None,
+        },
+    }
+
+
+def print_report(report):
+    """Relatório em texto"""
+    print(f"📊 Perguntas: {report['queries']} (respondidas: {report['answer_rate']:.1%})")
+    for stage, count in sorted(report["stages"].items()):
+        print(f"  └─ {stage}: {count}")
+    if report["invalid_lines"]:
+        print(f"  └─ Linhas inválidas: {report['invalid_lines']}")
+
+    latency = report["latency_ms"]
+    if latency["count"]:
+        print(f"\n⏱️  Latência (ms): p50 {latency['p50']:.3f} | p95 {latency['p95']:.3f} | "
+              f"p99 {latency['p99']:.3f} | máx {latency['max']:.3f}")
+
+    print("\n❓ Perguntas sem resposta mais frequentes:")
+    for item in report["top_unanswered"]:
+        approx = f" (±{item['error']})" if item["error"] else ""
+        print(f"  {item['count']:>7}{approx}  {item['query']}")
+
+    print("\n🧩 Grupos de perguntas sem resposta:")
+    for cluster in report["miss_clusters"]:
+        print(f"  {cluster['count']:>7}  {cluster['leader']}  [{cluster['size']} variações]")
+
+    print("\n📚 Acertos por tópico:")
+    for topic in report["topics"]:
+        print(f"  {topic['hits']:>7}  {topic['share']:6.1%}  direta {topic['direct_rate']:6.1%}  "
+              f"pontuação média {topic['mean_score']:.2f}  {topic['topic']}")
+
+
+def expand_paths(paths):
+    """Diretórios viram seus arquivos de log em ordem cronológica"""
+    files = []
+    for path in paths:
+        files.extend(log_files(path) if os.path.isdir(path) else [path])
+    return files
+
+
+def main():
+    """Linha de comando"""
+    parser = argparse.ArgumentParser(description="Análise dos registros de perguntas do Blink GPT")
+    parser.add_argument("paths", nargs="*", default=[QUERY_LOG_DIR], help="arquivos ou diretórios de log")
+    parser.add_argument("--top", type=int, default=20, help="itens por lista")
+    parser.add_argument("--capacity", type=int, default=CAPACITY,
+                        help="perguntas sem resposta acompanhadas (memória do top-k)")
+    parser.add_argument("--similarity", type=float, default=SIMILARITY,
+                        help="semelhança mínima (Jaccard) para agrupar perguntas")
+    parser.add_argument("--workers", type=int, default=None, help="processos (padrão: núcleos)")
+    parser.add_argument("--chunk-mb", type=int, default=CHUNK_BYTES // (1024 * 1024),
+                        help="tamanho dos blocos de leitura em MB")
+    parser.add_argument("--json", action="store_true", help="saída em JSON")
+    args = parser.parse_args()
+
+    files = expand_paths(args.paths)
+    if not files:
+        print("❌ Nenhum arquivo de log encontrado", file=sys.stderr)
+        return 1
+
+    summary = summarize(files, args.workers, args.capacity, args.chunk_mb * 1024 * 1024)
+    report = build_report(summary, args.top, args.similarity)
+    if args.json:
+        print(json.dumps(report, indent=2, ensure_ascii=False))
+    else:
+        print_report(report)
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
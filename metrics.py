@@ -0,0 +1,192 @@
+"""
+Blink GPT - Métricas da busca (formato texto do Prometheus)
+Tempo por etapa (histogramas) e contadores de perguntas, lidos pela rota
+/metrics da API ou por um arquivo gravado periodicamente.
+Desligadas por padrão: sem BLINK_METRICS=1 os temporizadores não fazem nada.
+"""
+
+import bisect
+import os
+import threading
+import time
+
+METRICS_ENABLED = os.environ.get("BLINK_METRICS", "0") == "1"
+
+# Arquivo para coleta local (ex.: textfile collector do node_exporter)
+METRICS_FILE = os.environ.get("BLINK_METRICS_FILE", "")
+METRICS_DUMP_INTERVAL = float(os.environ.get("BLINK_METRICS_DUMP_INTERVAL", "15"))
+
+# Limites dos baldes dos histogramas, em segundos
+BUCKETS = (0.00001, 0.00005, 0.0001, 0.0005, 0.001, 0.005, 0.01, 0.05, 0.1, 0.5, 1.0, 5.0)
+
+HELP = {
+    "blink_queries_total": ("counter", "Perguntas recebidas"),
+    "blink_answers_total": ("counter", "Perguntas por desfecho (direct, substring, blocked, miss)"),
+    "blink_query_log_dropped_total": ("counter", "Registros do log de perguntas descartados (fila cheia)"),
+    "blink_stage_seconds": ("histogram", "Tempo por etapa (normalize, blocklist, scoring, fallback, batch, rerun)"),
+    "blink_answer_cache_hits_total": ("counter", "Respostas servidas pelo cache"),
+    "blink_answer_cache_misses_total": ("counter", "Consultas ao cache sem resposta guardada (ou expirada)"),
+    "blink_answer_cache_evictions_total": ("counter", "Respostas removidas do cache pelo limite de tamanho (LRU)"),
+    "blink_answer_cache_expirations_total": ("counter", "Respostas removidas do cache pela validade (TTL)"),
+    "blink_answer_cache_size": ("gauge", "Respostas guardadas no cache"),
+}
+
+
+class _NullTimer:
+    """Temporizador das métricas desligadas"""
+
+    __slots__ = ()
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc):
+        return False
+
+
+NULL_TIMER = _NullTimer()
+
+
+class _StageTimer:
+    """Mede o tempo de um bloco with e registra no histograma da etapa"""
+
+    __slots__ = ("metrics", "stage", "started")
+
+    def __init__(self, metrics, stage):
+        self.metrics = metrics
+        self.stage = stage
+
+    def __enter__(self):
+        self.started = time.perf_counter()
+        return self
+
+    def __exit__(self, *exc):
+        self.metrics.observe(self.stage, time.perf_counter() - self.started)
+        return False
+
+
+class Metrics:
+    """Contadores e histogramas de tempo, seguros para várias threads"""
+
+    def __init__(self, enabled=METRICS_ENABLED, buckets=BUCKETS):
+        self.enabled = enabled
+        self.buckets = buckets
+        self._lock = threading.Lock()
+        self._counters = {}
+        self._histograms = {}
+        self._collectors = []
+        self._last_dump = 0.0
+
+    def stage(self, name):
+        """Temporizador para usar com with; não faz nada se desligado"""
+        if not self.enabled:
+            return NULL_TIMER
+        return _StageTimer(self, name)
+
+    def observe(self, stage, seconds):
+        """Registra a duração de uma etapa"""
+        if not self.enabled:
+            return
+        pos = bisect.bisect_left(self.buckets, seconds)
+        with self._lock:
+            histogram = self._histograms.get(stage)
+            if histogram is None:
+                histogram = self._histograms[stage] = [[0] * (len(self.buckets) + 1), 0.0, 0]
+            histogram[0][pos] += 1
+            histogram[1] += seconds
+            histogram[2] += 1
+
+    def count(self, name, amount=1, **labels):
+        """Incrementa um contador"""
+        if not self.enabled:
+            return
+        key = (name, tuple(sorted(labels.items())))
+        with self._lock:
+            self._counters[key] = self._counters.get(key, 0) + amount
+
+    def add_collector(self, collect):
+        """Registra uma função chamada a cada render, que retorna {métrica: valor}
+
+        Para valores mantidos fora daqui (ex.: contadores do cache de
+        respostas); aparecem mesmo com as métricas desligadas.
+        """
+        with self._lock:
+            self._collectors.append(collect)
+
+    def reset(self):
+        """Zera contadores e histogramas"""
+        with self._lock:
+            self._counters.clear()
+            self._histograms.clear()
+
+    def render(self):
+        """Métricas no formato texto do Prometheus"""
+        with self._lock:
+            counters = sorted(self._counters.items())
+            histograms = sorted((stage, (list(data[0]), data[1], data[2]))
+                                for stage, data in self._histograms.items())
+            collectors = list(self._collectors)
+
+        lines = []
+        described = set()
+
+        def describe(name):
+            if name not in described and name in HELP:
+                kind, text = HELP[name]
+                lines.append(f"# HELP {name} {text}")
+                lines.append(f"# TYPE {name} {kind}")
+                described.add(name)
+
+        for (name, labels), value in counters:
+            describe(name)
+            lines.append(f"{name}{_labels(labels)} {value}")
+
+        for collect in collectors:
+            for name, value in collect().items():
+                describe(name)
+                lines.append(f"{name} {value}")
+
+        name = "blink_stage_seconds"
+        for stage, (bucket_counts, total, count) in histograms:
+            describe(name)
+            cumulative = 0
+            for bound, bucket_count in zip(self.buckets + (float("inf"),), bucket_counts):
+                cumulative += bucket_count
+                le = "+Inf" if bound == float("inf") else repr(bound)
+                lines.append(f'{name}_bucket{_labels((("stage", stage), ("le", le)))} {cumulative}')
+            lines.append(f'{name}_sum{_labels((("stage", stage),))} {total!r}')
+            lines.append(f'{name}_count{_labels((("stage", stage),))} {count}')
+
+        return "\n".join(lines) + "\n"
+
+    def dump(self, path=METRICS_FILE):
+        """Grava as métricas em arquivo (troca atômica, leitura sempre completa)"""
+        tmp_path = path + ".tmp"
+        with open(tmp_path, "w", encoding="utf-8") as f:
+            f.write(self.render())
+        os.replace(tmp_path, path)
+
+    def dump_if_due(self, path=METRICS_FILE, interval=METRICS_DUMP_INTERVAL):
+        """Grava o arquivo se configurado e se o último foi há mais de interval segundos"""
+        if not self.enabled or not path:
+            return
+        now = time.monotonic()
+        if now - self._last_dump < interval:
+            return
+        self._last_dump = now
+        self.dump(path)
+
+
+def _labels(labels):
+    if not labels:
+        return ""
+    pairs = ",".join(f'{key}="{_escape(str(value))}"' for key, value in labels)
+    return "{" + pairs + "}"
+
+
+def _escape(value):
+    return value.replace("\\", "\\\\").replace('"', '\\"').replace("\n", "\\n")
+
+
+# Métricas do processo (compartilhadas pelo app, pela API e pelo motor)
+METRICS = Metrics()
@@ -0,0 +1,310 @@
+#!/usr/bin/env python3
+"""
+Blink GPT - Perguntas e respostas quase iguais (MinHash + LSH)
+Cada texto vira um conjunto de n-gramas (de caracteres nas perguntas, de
+palavras nas respostas) resumido por uma assinatura MinHash. Só textos cujas
+assinaturas coincidem em alguma faixa (LSH) são comparados, e os pares
+parecidos são agrupados. O custo cresce quase linearmente com o manual, sem
+comparar todos os pares.
+
+Uso:
+    python near_duplicates.py [--input data/qa_data.json] [--synthetic 100000]
+                              [--field both] [--threshold 0.8] [--limit 20] [--json]
+"""
+
+import argparse
+import json
+import re
+import sys
+from itertools import combinations
+
+import numpy as np
+
+from qa_engine import DATA_PATH, normalize_text
+
+# n-gramas de caracteres (perguntas, textos curtos) e de palavras (respostas)
+SHINGLE_CHARS = 4
+SHINGLE_WORDS = 3
+
+# 120 permutações em 20 faixas de 6 linhas: pares com similaridade 0,8
+# viram candidatos com probabilidade > 99%, pares com 0,5 em ~27%
+NUM_PERM = 120
+BANDS = 20
+
+# Similaridade (Jaccard estimada) mínima para dois textos serem quase iguais
+THRESHOLD = 0.8
+
+# Respostas curtas ("Sim.") coincidem sem serem duplicatas; ficam de fora
+MIN_ANSWER_WORDS = 5
+
+# Faixas com mais textos que isto geram só pares com o primeiro e com o vizinho
+MAX_BUCKET_PAIRS = 32
+
+# Shingles processados por vez no cálculo das assinaturas
+SIGNATURE_BLOCK = 1 << 15
+
+WORD_RE = re.compile(r"\w+")
+_MASK32 = np.uint64(0xFFFFFFFF)
+
+
+def text_words(text):
+    """Palavras do texto normalizado (sem acentos e pontuação)"""
+    return WORD_RE.findall(normalize_text(text or ""))
+
+
+def _dedupe(doc_ids, hashes):
+    """Pares (documento, hash) distintos, ordenados por documento"""
+    # Ordenação e vizinhos (np.unique usa um hash bem mais lento aqui)
+    keys = np.sort((doc_ids.astype(np.uint64) << np.uint64(32)) | (hashes & _MASK32))
+    if len(keys):
+        keys = keys[np.r_[True, keys[1:] != keys[:-1]]]
+    return (keys >> np.uint64(32)).astype(np.int64), keys & _MASK32
+
+
+def char_shingles(word_lists, n=SHINGLE_CHARS):
+    """(documentos, hashes) dos n-gramas de caracteres de cada texto
+
+    Os n bytes de cada n-grama (n <= 8) viram um inteiro de 64 bits,
+    misturado para 32 bits. Textos mais curtos que n contam como um n-grama.
+    """
+    texts = [" ".join(words).encode("utf-8").ljust(n) if words else b"" for words in word_lists]
+    lengths = np.fromiter(map(len, texts), dtype=np.int64, count=len(texts))
+    data = np.frombuffer(b"".join(texts), dtype=np.uint8).astype(np.uint64)
+    if len(data) < n:
+        return np.empty(0, dtype=np.int64), np.empty(0, dtype=np.uint64)
+
+    packed = np.zeros(len(data) - n + 1, dtype=np.uint64)
+    for offset in range(n):
+        packed = (packed << np.uint64(8)) | data[offset:len(data) - n + 1 + offset]
+
+    # Só as janelas inteiras dentro de um mesmo texto
+    doc_of_byte = np.repeat(np.arange(len(texts)), lengths)
+    valid = doc_of_byte[:len(packed)] == doc_of_byte[n - 1:]
+    return _dedupe(doc_of_byte[:len(packed)][valid], _mix(packed[valid]))
+
+
+def word_shingles(word_lists, n=SHINGLE_WORDS):
+    """(documentos, hashes) dos n-gramas de palavras de cada texto"""
+    vocab = {}
+    ids = []
+    docs = []
+    for doc, words in enumerate(word_lists):
+        if not words:
+            continue
+        # Textos com menos de n palavras: um único n-grama completado com vazios
+        words = words + [""] * (n - len(words))
+        ids.extend(vocab.setdefault(word, len(vocab) + 1) for word in words)
+        docs.extend([doc] * len(words))
+    if not ids:
+        return np.empty(0, dtype=np.int64), np.empty(0, dtype=np.uint64)
+
+    ids = np.array(ids, dtype=np.uint64)
+    docs = np.array(docs, dtype=np.int64)
+    size = len(ids) - n + 1
+    keys = np.zeros(size, dtype=np.uint64)
+    for offset in range(n):
+        keys = keys * np.uint64(1000003) + ids[offset:offset + size]
+    valid = docs[:size] == docs[n - 1:]
+    return _dedupe(docs[:size][valid], _mix(keys[valid]))
+
+
+def _mix(keys):
+    """32 bits bem espalhados de uma chave de 64 bits (multiplicação e deslocamento)"""
+    keys = keys ^ (keys >> np.uint64(29))
+    return (keys * np.uint64(0xBF58476D1CE4E5B9)) >> np.uint64(32)
+
+
+def minhash_signatures(doc_ids, hashes, n_docs, num_perm=NUM_PERM, seed=0):
+    """Assinatura MinHash (n_docs x num_perm, uint32) de cada documento
+
+    Permutação p: h(x) = (a_p * x + b_p mod 2^64) >> 32, com a_p ímpar
+    (multiply-add-shift). Documentos sem n-gramas ficam com o valor máximo.
+    """
+    rng = np.random.default_rng(seed)
+    a = rng.integers(1, 1 << 63, size=num_perm, dtype=np.uint64) | np.uint64(1)
+    b = rng.integers(0, 1 << 63, size=num_perm, dtype=np.uint64)
+    signatures = np.full((n_docs, num_perm), np.iinfo(np.uint32).max, dtype=np.uint32)
+
+    counts = np.bincount(doc_ids, minlength=n_docs)
+    docs = np.flatnonzero(counts)
+    ends = np.cumsum(counts[docs])
+    starts = ends - counts[docs]
+    first = 0
+    # Blocos de documentos inteiros com até SIGNATURE_BLOCK n-gramas
+    while first < len(docs):
+        last = max(first + 1, int(np.searchsorted(ends, starts[first] + SIGNATURE_BLOCK, side="right")))
+        block = hashes[starts[first]:ends[last - 1]]
+        values = (block[:, None] * a + b) >> np.uint64(32)
+        signatures[docs[first:last]] = np.minimum.reduceat(values, starts[first:last] - starts[first], axis=0)
+        first = last
+    return signatures
+
+
+def candidate_pairs(signatures, valid, bands=BANDS):
+    """Pares (i < j) que coincidem em pelo menos uma faixa da assinatura"""
+    rows = signatures.shape[1] // bands
+    positions = np.flatnonzero(valid)
+    rng = np.random.default_rng(1)
+    multipliers = rng.integers(1, 1 << 63, size=rows, dtype=np.uint64) | np.uint64(1)
+
+    pairs = []
+    for band in range(bands):
+        cols = signatures[positions, band * rows:(band + 1) * rows].astype(np.uint64)
+        keys = (cols * multipliers).sum(axis=1, dtype=np.uint64)
+        order = np.argsort(keys, kind="stable")
+        keys = keys[order]
+        # Grupos de documentos com a faixa igual (2 ou mais)
+        breaks = np.flatnonzero(keys[1:] != keys[:-1]) + 1
+        starts, ends = np.r_[0, breaks], np.r_[breaks, len(keys)]
+        sizes = ends - starts
+        # Pares simples de uma vez; grupos maiores, um por um
+        twos = starts[sizes == 2]
+        pairs.append(np.stack([positions[order[twos]], positions[order[twos + 1]]], axis=1))
+        for start, end in zip(starts[sizes > 2].tolist(), ends[sizes > 2].tolist()):
+            members = positions[order[start:end]].tolist()
+            if len(members) <= MAX_BUCKET_PAIRS:
+                group = list(combinations(members, 2))
+            else:
+                group = [(members[0], other) for other in members[1:]] + list(zip(members[1:-1], members[2:]))
+            pairs.append(np.array(group, dtype=np.int64))
+
+    # Mesmo par achado em várias faixas: uma vez só
+    n_docs = len(signatures)
+    keys = np.sort(np.concatenate([group.min(axis=1) * n_docs + group.max(axis=1) for group in pairs]))
+    if len(keys):
+        keys = keys[np.r_[True, keys[1:] != keys[:-1]]]
+    return np.stack([keys // n_docs, keys % n_docs], axis=1)
+
+
+def estimated_similarity(signatures, pairs, block_size=1 << 16):
+    """Jaccard estimada de cada par: fração das permutações com o mesmo mínimo"""
+    similarity = np.empty(len(pairs), dtype=np.float32)
+    for start in range(0, len(pairs), block_size):
+        left, right = pairs[start:start + block_size].T
+        similarity[start:start + block_size] = (signatures[left] == signatures[right]).mean(axis=1)
+    return similarity
+
+
+def connected_groups(n_docs, pairs):
+    """Grupo de cada documento (menor posição do grupo) pelos pares, com union-find"""
+    parent = np.arange(n_docs).tolist()
+
+    def root(x):
+        while parent[x] != x:
+            parent[x] = parent[parent[x]]
+            x = parent[x]
+        return x
+
+    for a, b in pairs.tolist():
+        ra, rb = root(a), root(b)
+        if ra != rb:
+            parent[max(ra, rb)] = min(ra, rb)
+    return np.array([root(x) for x in range(n_docs)], dtype=np.int64)
+
+
+def find_clusters(word_lists, kind="question", threshold=THRESHOLD):
+    """Grupos de textos quase iguais: [(posições, menor e maior similaridade)]
+
+    kind: "question" usa n-gramas de caracteres; "answer", de palavras.
+    """
+    n_docs = len(word_lists)
+    if kind == "answer":
+        word_lists = [words if len(words) >= MIN_ANSWER_WORDS else [] for words in word_lists]
+        doc_ids, hashes = word_shingles(word_lists)
+    else:
+        doc_ids, hashes = char_shingles(word_lists)
+
+    signatures = minhash_signatures(doc_ids, hashes, n_docs)
+    valid = np.bincount(doc_ids, minlength=n_docs) > 0
+    pairs = candidate_pairs(signatures, valid)
+    similarity = estimated_similarity(signatures, pairs)
+    keep = similarity >= threshold
+    pairs, similarity = pairs[keep], similarity[keep]
+
+    labels = connected_groups(n_docs, pairs)
+    if not len(pairs):
+        return []
+    # Menor e maior similaridade dos pares de cada grupo
+    pair_labels = labels[pairs[:, 0]]
+    order = np.argsort(pair_labels, kind="stable")
+    pair_labels, similarity = pair_labels[order], similarity[order]
+    firsts = np.flatnonzero(np.r_[True, pair_labels[1:] != pair_labels[:-1]])
+    lows = np.minimum.reduceat(similarity, firsts)
+    highs = np.maximum.reduceat(similarity, firsts)
+
+    members = {}
+    for pos in np.unique(pairs).tolist():
+        members.setdefault(int(labels[pos]), []).append(pos)
+    clusters = [(members[label], float(low), float(high))
+                for label, low, high in zip(pair_labels[firsts].tolist(), lows, highs)]
+    clusters.sort(key=lambda cluster: (-len(cluster[0]), cluster[0][0]))
+    return clusters
+
+
+def duplicate_report(questions, fields=("question", "answer"), threshold=THRESHOLD):
+    """Relatório dos grupos quase iguais de cada campo (perguntas do manual, em ordem)"""
+    report = {}
+    for field in fields:
+        clusters = find_clusters([text_words(q.get(field)) for q in questions], field, threshold)
+        report[field] = [{
+            "size": len(members),
+            "cross_topic": len({questions[pos].get("topic") for pos in members}) > 1,
+            "similarity": [round(low, 3), round(high, 3)],
+            "entries": [{"id": questions[pos].get("id"), "topic": questions[pos].get("topic"),
+                         "text": questions[pos].get(field)} for pos in members],
+        } for members, low, high in clusters]
+    return report
+
+
+FIELD_LABELS = {"question": "Perguntas", "answer": "Respostas"}
+
+
+def print_report(report, limit=20, width=80, indent=""):
+    """Mostra os maiores grupos de cada campo"""
+    for field, clusters in report.items():
+        same = sum(not cluster["cross_topic"] for cluster in clusters)
+        print(f"{indent}🔁 {FIELD_LABELS.get(field, field)} quase iguais: {len(clusters)} grupos "
+              f"({same} no mesmo tópico, {len(clusters) - same} entre tópicos)")
+        for cluster in clusters[:limit]:
+            low, high = cluster["similarity"]
+            where = "entre tópicos" if cluster["cross_topic"] else "mesmo tópico"
+            print(f"{indent}  • {cluster['size']} itens, similaridade {low:.2f}-{high:.2f}, {where}")
+            for entry in cluster["entries"][:5]:
+                text = " ".join(str(entry["text"]).split())
+                text = text if len(text) <= width else text[:width - 3] + "..."
+                print(f"{indent}     └─ #{entry['id']} [{entry['topic']}] {text}")
+            if cluster["size"] > 5:
+                print(f"{indent}     └─ ... e mais {cluster['size'] - 5}")
+        if len(clusters) > limit:
+            print(f"{indent}  ... e mais {len(clusters) - limit} grupos")
+
+
+def main():
+    """Linha de comando"""
+    parser = argparse.ArgumentParser(description="Perguntas e respostas quase iguais no manual")
+    parser.add_argument("--input", default=DATA_PATH, help="manual (JSON)")
+    parser.add_argument("--synthetic", type=int, help="usa um manual sintético com este número de perguntas")
+    parser.add_argument("--field", choices=("question", "answer", "both"), default="both")
+    parser.add_argument("--threshold", type=float, default=THRESHOLD, help="similaridade mínima (0-1)")
+    parser.add_argument("--limit", type=int, default=20, help="grupos mostrados por campo")
+    parser.add_argument("--json", action="store_true", help="saída em JSON (todos os grupos)")
+    args = parser.parse_args()
+
+    if args.synthetic:
+        from benchmark import generate_corpus
+        questions = generate_corpus(args.synthetic)["questions"]
+    else:
+        with open(args.input, "r", encoding="utf-8") as f:
+            questions = json.load(f)["questions"]
+
+    fields = ("question", "answer") if args.field == "both" else (args.field,)
+    report = duplicate_report(questions, fields, args.threshold)
+    if args.json:
+        print(json.dumps(report, ensure_ascii=False, indent=2))
+    else:
+        print_report(report, args.limit)
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
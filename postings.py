@@ -0,0 +1,38 @@
+"""
+Blink GPT - Posting lists em formato CSR
+Usado pelos índices carregados do snapshot binário (arrays mapeados em memória)
+"""
+
+import numpy as np
+
+
+class CSRPostings:
+    """Posting lists lidas direto de arrays CSR: termo -> ids[indptr[i]:indptr[i + 1]]"""
+
+    def __init__(self, vocab, indptr, ids):
+        self.vocab = vocab
+        self.indptr = indptr
+        self.ids = ids
+
+    def get(self, term, default=()):
+        row = self.vocab.get(term)
+        if row is None:
+            return default
+        return self.ids[self.indptr[row]:self.indptr[row + 1]].tolist()
+
+    def __contains__(self, term):
+        return term in self.vocab
+
+    def __len__(self):
+        return len(self.vocab)
+
+
+def to_csr(postings):
+    """Converte {termo: [ids]} em (termos, indptr, ids) para gravação"""
+    terms = list(postings)
+    sizes = np.fromiter((len(postings[term]) for term in terms), dtype=np.int64, count=len(terms))
+    indptr = np.zeros(len(terms) + 1, dtype=np.int64)
+    np.cumsum(sizes, out=indptr[1:])
+    ids = np.fromiter((i for term in terms for i in postings[term]),
+                      dtype=np.int32, count=int(indptr[-1]))
+    return terms, indptr, ids
@@ -0,0 +1,756 @@
+"""
+Blink GPT - Motor de busca de perguntas e respostas
+Compartilhado entre blink_gpt.py e app.py (sem dependência do Streamlit)
+"""
+
+import hashlib
+import json
+import os
+import time
+import unicodedata
+from functools import lru_cache
+
+import numpy as np
+
+from aho_corasick import AhoCorasick
+from ann_index import ANN_MIN_DOCS, build_ann, load_vectors, save_vectors, store_signature, vectors_path_for
+from answer_cache import AnswerCache
+from bm25 import BM25Index
+from corpus_store import FieldView, LazyRecords, compact_corpus
+from metrics import METRICS
+from postings import CSRPostings
+from query_log import QUERY_LOG
+from semantic import ANSWER_WEIGHT, TOPIC_WEIGHT, SemanticIndex
+from spelling import SpellCorrector
+from stemmer import stem, stem_words
+from trigram_index import TrigramIndex
+
+DATA_PATH = "data/qa_data.json"
+
+# Motores de busca disponíveis: "overlap" (palavras em comum), "bm25" ou
+# "semantic" (similaridade de vetores densos, encontra paráfrases)
+ENGINES = ("overlap", "bm25", "semantic")
+DEFAULT_ENGINE = os.environ.get("BLINK_ENGINE", "overlap")
+
+# Correção de erros de digitação nas palavras da pergunta; a palavra
+# corrigida pesa menos que a digitada certa, então não dá acerto completo
+SPELL_CORRECTION = os.environ.get("BLINK_SPELL_CORRECTION", "1") == "1"
+CORRECTION_WEIGHT = 0.8
+
+# Limiares de pontuação (fração da pergunta coberta pela melhor resposta)
+MIN_SCORE = 0.3
+FALLBACK_SCORE = 0.6
+# Limiares da busca semântica (cosseno): paráfrases certas ficam bem abaixo
+# de 0.6, e perguntas fora do manual abaixo de 0.25
+SEMANTIC_MIN_SCORE = 0.25
+SEMANTIC_FALLBACK_SCORE = 0.4
+# Por motor: (mínimo para responder, abaixo do qual a busca por trecho vem antes)
+SCORE_THRESHOLDS = {
+    "overlap": (MIN_SCORE, FALLBACK_SCORE),
+    "bm25": (MIN_SCORE, FALLBACK_SCORE),
+    "semantic": (SEMANTIC_MIN_SCORE, SEMANTIC_FALLBACK_SCORE),
+}
+
+# Cache de respostas compartilhado por todas as sessões do processo
+ANSWER_CACHE = AnswerCache(
+    max_size=int(os.environ.get("BLINK_CACHE_SIZE", "1024")),
+    ttl=float(os.environ.get("BLINK_CACHE_TTL", "3600")),
+)
+
+
+# Palavras genéricas ignoradas na comparação
+GENERIC_WORDS = {'o', 'a', 'os', 'as', 'um', 'uma', 'de', 'da', 'do', 'das', 'dos',
+                 'em', 'na', 'no', 'nas', 'nos', 'para', 'por', 'com', 'como', 'quando',
+                 'onde', 'que', 'qual', 'quais', 'quem', 'é', 'são', 'foi', 'será',
+                 'tem', 'ter', 'fazer', 'feito', 'pode', 'posso', 'devo', 'deve'}
+
+# Filtros de perguntas irrelevantes (um padrão por linha)
+BLOCKLIST_PATH = "data/blocklist.txt"
+
+# Sinônimos (palavras da loja -> palavras do manual) e peso padrão de um sinônimo
+SYNONYMS_PATH = "data/synonyms.json"
+SYNONYM_WEIGHT = 0.5
+
+# Tamanho do cache de normalização (entradas repetidas: perguntas, buscas)
+NORMALIZE_CACHE_SIZE = 8192
+
+IRRELEVANT_ANSWER = "Não encontrei informações específicas sobre sua pergunta no Manual de Procedimentos. Tente reformular sua pergunta ou selecione sugestões no painel lateral."
+NOT_FOUND_ANSWER = "Não encontrei uma resposta exata para sua pergunta. Tente usar as sugestões no painel lateral ou reformule sua pergunta."
+
+
+def _build_accent_table():
+    """Tabela str.translate: letras acentuadas -> letra base, marcas combinantes -> removidas"""
+    table = {}
+    # Latin-1 e Latin Extended-A/B cobrem todos os diacríticos do português
+    for code in range(0x00C0, 0x0250):
+        char = chr(code)
+        base = ''.join(c for c in unicodedata.normalize('NFD', char)
+                       if unicodedata.category(c) != 'Mn')
+        if base != char:
+            table[code] = base
+    for code in range(0x0300, 0x0370):
+        table[code] = None
+    return table
+
+
+ACCENT_TABLE = _build_accent_table()
+
+
+@lru_cache(maxsize=NORMALIZE_CACHE_SIZE)
+def normalize_text(text):
+    """Normaliza texto removendo acentos, til, cedilha, etc."""
+    if not text:
+        return text
+
+    text = text.lower()
+    if text.isascii():
+        return text
+
+    text = text.translate(ACCENT_TABLE)
+    if text.isascii():
+        return text
+
+    # Caracteres fora da tabela (emojis, outros alfabetos): caminho completo
+    text = unicodedata.normalize('NFD', text)
+    return ''.join(char for char in text if unicodedata.category(char) != 'Mn')
+
+
+def tokenize(normalized_text):
+    """Separa texto já normalizado em palavras, sem as palavras genéricas"""
+    return set(normalized_text.split()) - GENERIC_WORDS
+
+
+def index_terms(normalized_text):
+    """Radicais das palavras do texto (termos do índice)"""
+    return stem_words(tokenize(normalized_text))
+
+
+class QAIndex:
+    """Índice invertido: radical -> posições das perguntas que o contêm"""
+
+    def __init__(self, questions, bm25=None, trigrams=None):
+        self.records = questions
+        if isinstance(questions, LazyRecords):
+            # Snapshot: os registros só são decodificados quando usados
+            self.normalized = FieldView(questions, "normalized_question")
+            self.tokens = FieldView(questions, "tokens")
+        else:
+            self.normalized = [q.normalized_question for q in questions]
+            self.tokens = [q.tokens for q in questions]
+        self.trigrams = trigrams or TrigramIndex(self.normalized)
+        self._bm25 = bm25
+        self._semantic = None
+        # Arquivo dos vetores semânticos e hash do JSON de origem (definidos por quem carrega)
+        self.vectors_path = None
+        self.source_hash = None
+        self._speller = None
+        self._positions = None
+        # Estruturas construídas no primeiro uso (bm25, semantic, speller) até agora
+        self.builds = 0
+
+        # Com a matriz BM25 pronta (snapshot), as posting lists são as linhas dela
+        if bm25 is not None:
+            self.postings = CSRPostings(bm25.vocab, bm25.indptr, bm25.doc_ids)
+            return
+
+        self.postings = {}
+        for pos, words in enumerate(self.tokens):
+            for word in words:
+                self.postings.setdefault(word, []).append(pos)
+
+    @property
+    def bm25(self):
+        """Matriz BM25, construída uma única vez no primeiro uso"""
+        if self._bm25 is None:
+            self._bm25 = BM25Index([
+                [stem(word) for word in text.split() if word not in GENERIC_WORDS]
+                for text in self.normalized
+            ])
+            self.builds += 1
+        return self._bm25
+
+    @property
+    def semantic(self):
+        """Vetores semânticos das perguntas, lidos do arquivo ou construídos no primeiro uso
+
+        Manuais grandes ganham também o índice aproximado (IVF). O resultado é
+        gravado em vectors_path para as próximas partidas.
+        """
+        if self._semantic is None:
+            signature = semantic_signature()
+            semantic = None
+            if self.vectors_path:
+                semantic = load_vectors(self.vectors_path, self.source_hash, signature)
+            changed = semantic is None
+            if changed:
+                semantic = SemanticIndex.build([semantic_fields(record) for record in self.records])
+            if semantic.n_docs < ANN_MIN_DOCS:
+                semantic.ann = None
+            changed = build_ann(semantic) or changed
+
+            if changed and self.vectors_path:
+                try:
+                    save_vectors(self.vectors_path, semantic, self.source_hash, signature)
+                except OSError:
+                    # Pasta somente leitura: os vetores são refeitos na próxima partida
+                    pass
+            self._semantic = semantic
+            self.builds += 1
+        return self._semantic
+
+    @property
+    def speller(self):
+        """Corretor ortográfico do vocabulário, construído no primeiro uso"""
+        if self._speller is None:
+            # Corrige palavras inteiras (não radicais), depois radicalizadas
+            frequencies = {}
+            for text in self.normalized:
+                for word in tokenize(text):
+                    frequencies[word] = frequencies.get(word, 0) + 1
+            self._speller = SpellCorrector(frequencies)
+            self.builds += 1
+        return self._speller
+
+    def warm(self):
+        """Constrói agora as estruturas que seriam criadas no primeiro uso"""
+        self.speller
+        self.bm25
+        self.semantic
+        return self
+
+    def correct_words(self, words, known=()):
+        """Corrige palavras fora do vocabulário; retorna (palavras, correções)
+
+        Palavras cujo radical está em known (ex.: sinônimos) não são corrigidas.
+        """
+        corrections = {}
+        corrected = set()
+        for word in words:
+            if stem(word) not in self.postings and stem(word) not in known:
+                fixed = self.speller.correct(word)
+                if fixed is not None:
+                    corrections[word] = fixed
+                    word = fixed
+            corrected.add(word)
+        return corrected, corrections
+
+    def record_by_id(self, question_id):
+        """Registro da pergunta com este id, ou None"""
+        if self._positions is None:
+            ids = self.records.ids if isinstance(self.records, LazyRecords) else (
+                record.id for record in self.records)
+            self._positions = {qid: pos for pos, qid in enumerate(ids)}
+        pos = self._positions.get(question_id)
+        return None if pos is None else self.records[pos]
+
+    def substring_match(self, question_lower):
+        """Primeira posição cuja pergunta contém o texto buscado, ou None"""
+        return next(self.trigrams.iter_search(question_lower), None)
+
+
+def semantic_signature():
+    """Assinatura dos vetores semânticos gravados (parâmetros e palavras genéricas)"""
+    return store_signature(sorted(GENERIC_WORDS))
+
+
+def semantic_fields(record):
+    """Campos de uma pergunta para a busca semântica: (termos, peso) da pergunta, tópico e resposta"""
+    return ((record.tokens, 1.0),
+            (index_terms(record.normalized_topic or ""), TOPIC_WEIGHT),
+            (index_terms(normalize_text(record.answer or "")), ANSWER_WEIGHT))
+
+
+def normalize_record(record):
+    """Guarda no registro a pergunta e o tópico normalizados e suas palavras"""
+    record.normalized_question = normalize_text(record.question)
+    record.normalized_topic = normalize_text(record.topic or '')
+    record.tokens = frozenset(index_terms(record.normalized_question))
+    return record
+
+
+def build_index(qa_data, vectors_path=None):
+    """Constrói os índices derivados e anexa em qa_data
+
+    vectors_path: arquivo onde os vetores semânticos são gravados e relidos.
+    """
+    # Um registro por id, compartilhado pela lista e pelos tópicos
+    compact_corpus(qa_data)
+    for question_obj in qa_data["questions"]:
+        normalize_record(question_obj)
+    for topic, data in qa_data.get("topics", {}).items():
+        data["normalized_topic"] = normalize_text(topic)
+
+    index = QAIndex(qa_data["questions"])
+    index.vectors_path = vectors_path
+    index.source_hash = qa_data.get("content_hash")
+    if DEFAULT_ENGINE == "bm25":
+        index.bm25
+    elif DEFAULT_ENGINE == "semantic":
+        index.semantic
+    qa_data["index"] = index
+    qa_data["topic_search"] = build_topic_search(qa_data)
+    return qa_data
+
+
+def build_topic_search(qa_data):
+    """Índice de trigramas dos nomes de tópicos normalizados"""
+    return TrigramIndex([data.get("normalized_topic") or normalize_text(topic)
+                         for topic, data in qa_data.get("topics", {}).items()])
+
+
+def filter_topics(qa_data, search_text, whole_topics=False):
+    """Tópicos (e perguntas) que contêm o texto buscado, já normalizado
+
+    Tópico cujo nome contém a busca aparece completo. Os demais aparecem só
+    com as perguntas encontradas, ou completos se whole_topics=True.
+    """
+    topics = qa_data.get("topics", {})
+    if not search_text:
+        return topics
+
+    topic_search = qa_data.get("topic_search") or build_topic_search(qa_data)
+    matched_topics = set(topic_search.search(search_text))
+
+    index = qa_data["index"]
+    found_questions = {}
+    for pos in index.trigrams.iter_search(search_text):
+        record = index.records[pos]
+        found_questions.setdefault(record.topic, []).append(record)
+
+    filtered = {}
+    for pos, (topic, data) in enumerate(topics.items()):
+        if pos in matched_topics or (whole_topics and topic in found_questions):
+            filtered[topic] = data
+        elif topic in found_questions:
+            filtered[topic] = {"questions": found_questions[topic]}
+    return filtered
+
+
+def load_corpus(path=DATA_PATH):
+    """Lê o JSON de perguntas e constrói os índices"""
+    with open(path, "rb") as f:
+        content = f.read()
+    qa_data = json.loads(content.decode("utf-8"))
+    qa_data["content_hash"] = hashlib.sha256(content).hexdigest()
+    return build_index(qa_data, vectors_path_for(path))
+
+
+def overlap_match(words_user_filtered, index, weights=None):
+    """Melhor pergunta pela fração de palavras em comum
+
+    weights: termo -> peso (palavras da pergunta com peso 1 e sinônimos com
+    peso menor); sem weights, só as palavras da pergunta contam.
+    """
+    if weights is None:
+        weights = dict.fromkeys(words_user_filtered, 1.0)
+
+    # Cada palavra da pergunta vale o maior peso entre ela e seus sinônimos
+    # presentes; soma por pergunta, percorrendo só as posting lists dos termos
+    matched = {}
+    for group in query_groups(words_user_filtered, weights):
+        if len(group) == 1:
+            for term, weight in group.items():
+                for pos in index.postings.get(term, ()):
+                    matched[pos] = matched.get(pos, 0) + weight
+            continue
+        best = {}
+        for term, weight in group.items():
+            for pos in index.postings.get(term, ()):
+                if best.get(pos, 0) < weight:
+                    best[pos] = weight
+        for pos, weight in best.items():
+            matched[pos] = matched.get(pos, 0) + weight
+
+    best_pos = None
+    best_score = 0
+
+    for pos, total in matched.items():
+        if len(words_user_filtered) > 3 and total < 2:
+            continue
+
+        # Empate: vale a primeira pergunta do manual
+        score = min(1.0, total / len(words_user_filtered))
+        if score > best_score or (score == best_score and pos < best_pos):
+            best_score = score
+            best_pos = pos
+
+    return best_pos, best_score
+
+
+def bm25_match(words_user_filtered, index, weights=None):
+    """Melhor pergunta pelo BM25; a pontuação é a fração do IDF da pergunta coberta"""
+    if weights is None:
+        weights = dict.fromkeys(words_user_filtered, 1.0)
+
+    bm25 = index.bm25
+    if not bm25.n_docs:
+        return None, 0
+
+    groups = query_groups(words_user_filtered, weights)
+    scores = bm25.score(groups)
+    best_pos = int(scores.argmax())
+    if scores[best_pos] <= 0:
+        return None, 0
+
+    return best_pos, idf_coverage(words_user_filtered, groups, index.tokens[best_pos], bm25)
+
+
+def idf_coverage(words_user_filtered, groups, tokens, bm25):
+    """Fração do IDF da pergunta coberta pela pergunta encontrada
+
+    groups: os grupos de query_groups; cada palavra cobre o maior IDF entre
+    ela e seus sinônimos presentes (sinônimos pelo peso).
+    """
+    total_idf = sum(bm25.term_idf(word) for word in words_user_filtered)
+    covered = 0
+    for group in groups:
+        best = 0
+        for term, weight in group.items():
+            if term in tokens:
+                idf = bm25.term_idf(term) * weight
+                if idf > best:
+                    best = idf
+        covered += best
+    return min(1.0, covered / total_idf)
+
+
+def semantic_match(words_user_filtered, index, weights=None):
+    """Melhor pergunta pela similaridade de cosseno dos vetores semânticos"""
+    if weights is None:
+        weights = dict.fromkeys(words_user_filtered, 1.0)
+
+    positions, scores = index.semantic.top_k(weights, 1)
+    if not len(positions) or scores[0] <= 0:
+        return None, 0
+    return int(positions[0]), float(scores[0])
+
+
+MATCHERS = {
+    "overlap": overlap_match,
+    "bm25": bm25_match,
+    "semantic": semantic_match,
+}
+
+
+class MatchResult:
+    """Resultado da busca: resposta, fontes e como foi encontrada
+
+    stage: "direct" (pontuação), "substring" (fallback), "blocked" (filtro de
+    irrelevância, padrão em blocked_by) ou "miss" (nada encontrado).
+    corrections: palavras da pergunta corrigidas pelo corretor ortográfico,
+    em todas as etapas (inclusive "miss"); também copiadas nas fontes de
+    as_tuple.
+    """
+
+    __slots__ = ("answer", "sources", "score", "stage", "blocked_by", "corrections")
+
+    def __init__(self, answer, sources=(), score=0.0, stage="miss", blocked_by=None, corrections=None):
+        self.answer = answer
+        self.sources = tuple(sources)
+        self.score = score
+        self.stage = stage
+        self.blocked_by = blocked_by
+        self.corrections = corrections or {}
+
+    def as_tuple(self):
+        """Formato de ask_question: (resposta, lista de fontes)
+
+        Cada fonte é um dicionário com os campos do JSON (id, topic,
+        question, answer), mais "corrections" se alguma palavra foi corrigida.
+        """
+        sources = [source.to_dict() for source in self.sources]
+        if self.corrections:
+            for source in sources:
+                source["corrections"] = dict(self.corrections)
+        return self.answer, sources
+
+
+def resolve_answer(question_lower, best_pos, best_score, index, corrections=None, engine=None):
+    """Aplica o fallback por substring e os limiares do motor ao melhor resultado"""
+    min_score, fallback_score = SCORE_THRESHOLDS[engine or DEFAULT_ENGINE]
+
+    # Se não encontrou boa correspondência, usar keywords
+    if best_score < fallback_score:
+        with METRICS.stage("fallback"):
+            pos = index.substring_match(question_lower)
+        if pos is not None:
+            return MatchResult(index.records[pos].answer, [index.records[pos]],
+                               best_score, "substring", corrections=corrections)
+
+    if best_pos is not None and best_score > min_score:
+        best_match = index.records[best_pos]
+        return MatchResult(best_match.answer, [best_match], best_score, "direct",
+                           corrections=corrections)
+
+    return MatchResult(NOT_FOUND_ANSWER, [], best_score, "miss", corrections=corrections)
+
+
+@lru_cache(maxsize=None)
+def load_blocklist(path=BLOCKLIST_PATH):
+    """Compila o arquivo de padrões bloqueados (normalizados) em um autômato"""
+    patterns = []
+    if os.path.exists(path):
+        with open(path, "r", encoding="utf-8") as f:
+            for line in f:
+                line = line.strip()
+                if line and not line.startswith("#"):
+                    patterns.append(normalize_text(line))
+    return AhoCorasick(patterns)
+
+
+@lru_cache(maxsize=None)
+def load_synonyms(path=SYNONYMS_PATH):
+    """Compila o arquivo de sinônimos em radical -> ((radical sinônimo, peso), ...)"""
+    if not os.path.exists(path):
+        return {}
+    with open(path, "r", encoding="utf-8") as f:
+        config = json.load(f)
+
+    default_weight = config.get("weight", SYNONYM_WEIGHT)
+    expansions = {}
+    for group in config.get("groups", []):
+        if isinstance(group, dict):
+            terms, weight = group.get("terms", []), group.get("weight", default_weight)
+        else:
+            terms, weight = group, default_weight
+        stems = set()
+        for term in terms:
+            stems |= index_terms(normalize_text(term))
+        for term in stems:
+            targets = expansions.setdefault(term, {})
+            for synonym in stems - {term}:
+                targets[synonym] = max(weight, targets.get(synonym, 0))
+
+    return {term: tuple(targets.items()) for term, targets in expansions.items() if targets}
+
+
+def expand_query(words_user_filtered, corrected=()):
+    """Pesos da busca: radicais da pergunta com peso 1, sinônimos com o peso configurado
+
+    corrected: radicais que vieram do corretor ortográfico (peso
+    CORRECTION_WEIGHT, e seus sinônimos no máximo isso).
+    """
+    weights = {word: CORRECTION_WEIGHT if word in corrected else 1.0 for word in words_user_filtered}
+    synonyms = load_synonyms()
+    for word in words_user_filtered:
+        for synonym, weight in synonyms.get(word, ()):
+            weight = min(weight, weights[word])
+            if weights.get(synonym, 0) < weight:
+                weights[synonym] = weight
+    return weights
+
+
+def corrected_terms(words, corrections):
+    """Radicais que só existem na pergunta por causa de uma correção"""
+    if not corrections:
+        return set()
+    typed = stem_words(word for word in words if word not in corrections.values())
+    return stem_words(corrections.values()) - typed
+
+
+def query_groups(words_user_filtered, weights):
+    """Um grupo termo -> peso por palavra da pergunta: ela mesma e seus sinônimos
+
+    Uma pergunta do manual que tem a palavra e também seus sinônimos não deve
+    somar pontos duas vezes: a palavra vale o maior peso do grupo.
+    """
+    synonyms = load_synonyms()
+    groups = []
+    for word in words_user_filtered:
+        group = {word: weights.get(word, 1.0)}
+        groups.append(group)
+        for synonym, weight in synonyms.get(word, ()):
+            if synonym in weights:
+                group[synonym] = max(group.get(synonym, 0), min(weight, weights[synonym]))
+    return groups
+
+
+def blocked_pattern(question_lower):
+    """Padrão de irrelevância encontrado na pergunta (normalizada), ou None"""
+    return load_blocklist().first_match(question_lower)
+
+
+def corpus_version(qa_data):
+    """Identifica a versão do manual carregado"""
+    return qa_data.get("version"), qa_data.get("last_updated"), qa_data.get("content_hash")
+
+
+def answer_cache_metrics():
+    """Contadores do cache de respostas no formato de METRICS.render"""
+    stats = ANSWER_CACHE.stats()
+    return {
+        "blink_answer_cache_hits_total": stats["hits"],
+        "blink_answer_cache_misses_total": stats["misses"],
+        "blink_answer_cache_evictions_total": stats["evictions"],
+        "blink_answer_cache_expirations_total": stats["expirations"],
+        "blink_answer_cache_size": stats["size"],
+    }
+
+
+METRICS.add_collector(answer_cache_metrics)
+
+
+def ask_question(question, qa_data, engine=None, cache=ANSWER_CACHE):
+    """Busca resposta para uma pergunta (cache=None desativa o cache)"""
+
+    if not qa_data:
+        return None, []
+
+    return match_question(question, qa_data, engine, cache).as_tuple()
+
+
+def match_question(question, qa_data, engine=None, cache=ANSWER_CACHE):
+    """Como ask_question, mas retorna o MatchResult completo"""
+
+    engine = engine or DEFAULT_ENGINE
+    started = time.perf_counter()
+    METRICS.count("blink_queries_total")
+    with METRICS.stage("normalize"):
+        question_lower = normalize_text(question)
+
+    if cache is None:
+        result = _match_normalized(question_lower, qa_data, engine)
+    else:
+        # Chave: a pergunta normalizada inteira (a busca por trecho depende
+        # da ordem e da repetição das palavras)
+        key = (engine, question_lower)
+        version = corpus_version(qa_data)
+        result = cache.get(key, version)
+        if result is None:
+            result = _match_normalized(question_lower, qa_data, engine)
+            cache.put(key, version, result)
+
+    METRICS.count("blink_answers_total", stage=result.stage)
+    QUERY_LOG.record(question_lower, result, time.perf_counter() - started, engine)
+    return result
+
+
+def _match_normalized(question_lower, qa_data, engine):
+    """Busca resposta para uma pergunta já normalizada"""
+
+    with METRICS.stage("blocklist"):
+        pattern = blocked_pattern(question_lower)
+    if pattern is not None:
+        return MatchResult(IRRELEVANT_ANSWER, stage="blocked", blocked_by=pattern)
+
+    index = qa_data.get("index")
+    if index is None:
+        index = build_index(qa_data)["index"]
+
+    # Busca direta (apenas perguntas que compartilham palavras)
+    best_pos = None
+    best_score = 0
+
+    with METRICS.stage("scoring"):
+        words_user_filtered = tokenize(question_lower)
+        corrections = {}
+        if SPELL_CORRECTION:
+            words_user_filtered, corrections = index.correct_words(words_user_filtered, load_synonyms())
+        corrected = corrected_terms(words_user_filtered, corrections)
+        words_user_filtered = stem_words(words_user_filtered)
+
+        if words_user_filtered:
+            best_pos, best_score = MATCHERS[engine](words_user_filtered, index,
+                                                    expand_query(words_user_filtered, corrected))
+
+    return resolve_answer(question_lower, best_pos, best_score, index, corrections, engine)
+
+
+def ask_questions(questions, qa_data, engine=None):
+    """Busca respostas para várias perguntas de uma vez
+
+    Equivalente a chamar ask_question para cada pergunta, mas pontua o lote
+    inteiro contra a matriz termo-documento. Retorna as tuplas
+    (resposta, fontes) na mesma ordem da entrada.
+    """
+    if not qa_data:
+        return [(None, []) for _ in questions]
+
+    return [result.as_tuple() for result in match_questions(questions, qa_data, engine)]
+
+
+def match_questions(questions, qa_data, engine=None):
+    """Como ask_questions, mas retorna os MatchResult completos"""
+
+    started = time.perf_counter()
+    with METRICS.stage("batch"):
+        results, normalized = _match_batch(questions, qa_data, engine)
+
+    if QUERY_LOG.enabled:
+        # Latência de cada pergunta: fração do tempo do lote
+        latency = (time.perf_counter() - started) / max(1, len(results))
+        for question_lower, result in zip(normalized, results):
+            QUERY_LOG.record(question_lower, result, latency, engine or DEFAULT_ENGINE)
+
+    if METRICS.enabled:
+        METRICS.count("blink_queries_total", len(results))
+        for result in results:
+            METRICS.count("blink_answers_total", stage=result.stage)
+    return results
+
+
+def _match_batch(questions, qa_data, engine):
+    """Pontua o lote inteiro contra a matriz termo-documento (ou os vetores semânticos)
+
+    Retorna (resultados, perguntas normalizadas).
+    """
+
+    engine = engine or DEFAULT_ENGINE
+    index = qa_data.get("index")
+    if index is None:
+        index = build_index(qa_data)["index"]
+
+    normalized = [normalize_text(question) for question in questions]
+    blocked = [blocked_pattern(text) for text in normalized]
+    query_words = [set() if block is not None else tokenize(text)
+                   for text, block in zip(normalized, blocked)]
+    corrections = [{} for _ in questions]
+    if SPELL_CORRECTION:
+        for i, words in enumerate(query_words):
+            query_words[i], corrections[i] = index.correct_words(words, load_synonyms())
+    corrected = [corrected_terms(words, fixed) for words, fixed in zip(query_words, corrections)]
+    query_words = [stem_words(words) for words in query_words]
+    query_weights = [expand_query(words, terms) for words, terms in zip(query_words, corrected)]
+
+    query_sizes = np.fromiter((len(words) for words in query_words),
+                              dtype=np.float64, count=len(query_words))
+    best_pos = np.full(len(questions), -1, dtype=np.int64)
+    best_score = np.zeros(len(questions))
+
+    if engine == "semantic":
+        batches = index.semantic.iter_batch_scores(query_weights)
+    else:
+        bm25 = index.bm25
+        query_group_lists = [query_groups(words, weights) for words, weights in zip(query_words, query_weights)]
+        batches = bm25.iter_batch_scores(query_group_lists, binary=(engine == "overlap"))
+
+    for start, scores in batches:
+        if not scores.shape[1]:
+            continue
+        if engine == "overlap":
+            sizes = query_sizes[start:start + len(scores), None]
+            scores[(sizes > 3) & (scores < 2)] = 0
+            scores /= np.maximum(sizes, 1)
+            np.minimum(scores, 1.0, out=scores)
+
+        # argmax devolve a primeira posição em caso de empate, como a busca simples
+        positions = scores.argmax(axis=1)
+        top = scores[np.arange(len(scores)), positions]
+        found = top > 0
+        best_pos[start:start + len(scores)][found] = positions[found]
+        best_score[start:start + len(scores)][found] = top[found]
+
+    results = []
+    for i, question_lower in enumerate(normalized):
+        if blocked[i] is not None:
+            results.append(MatchResult(IRRELEVANT_ANSWER, stage="blocked", blocked_by=blocked[i]))
+            continue
+
+        pos = int(best_pos[i]) if best_pos[i] >= 0 else None
+        score = float(best_score[i])
+        if engine == "bm25" and pos is not None:
+            score = idf_coverage(query_words[i], query_group_lists[i], index.tokens[pos], bm25)
+
+        results.append(resolve_answer(question_lower, pos, score, index, corrections[i], engine))
+
+    return results, normalized
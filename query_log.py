@@ -0,0 +1,176 @@
+"""
+Blink GPT - Registro das perguntas feitas (JSONL com rotação)
+Cada pergunta vira uma linha com data, pergunta normalizada, id e tópico
+encontrados, pontuação e latência. A gravação roda em uma thread separada, em
+lotes: a busca só coloca o registro em uma fila limitada e, se a fila estiver
+cheia, o registro é descartado (e contado) em vez de esperar pelo disco.
+"""
+
+import atexit
+import glob
+import json
+import os
+import queue
+import threading
+import time
+from datetime import datetime, timezone
+
+from metrics import METRICS
+
+QUERY_LOG_ENABLED = os.environ.get("BLINK_QUERY_LOG", "0") == "1"
+QUERY_LOG_DIR = os.environ.get("BLINK_QUERY_LOG_DIR", "logs")
+QUERY_LOG_MAX_BYTES = int(os.environ.get("BLINK_QUERY_LOG_MAX_BYTES", str(10 * 1024 * 1024)))
+QUERY_LOG_BACKUPS = int(os.environ.get("BLINK_QUERY_LOG_BACKUPS", "50"))
+QUERY_LOG_QUEUE_SIZE = int(os.environ.get("BLINK_QUERY_LOG_QUEUE_SIZE", "10000"))
+
+LOG_NAME = "queries.jsonl"
+BATCH_SIZE = 500
+FLUSH_INTERVAL = 1.0
+
+_STOP = object()
+
+
+def rotated_files(directory=QUERY_LOG_DIR):
+    """Arquivos já rotacionados, do mais antigo ao mais novo"""
+    return sorted(glob.glob(os.path.join(directory, "queries.*.jsonl")))
+
+
+def log_files(directory=QUERY_LOG_DIR):
+    """Arquivos de log em ordem cronológica (rotacionados primeiro, atual por último)"""
+    current = os.path.join(directory, LOG_NAME)
+    return rotated_files(directory) + ([current] if os.path.exists(current) else [])
+
+
+class QueryLog:
+    """Fila limitada + thread de gravação em lote com rotação por tamanho"""
+
+    def __init__(self, directory=QUERY_LOG_DIR, enabled=QUERY_LOG_ENABLED,
+                 max_bytes=QUERY_LOG_MAX_BYTES, backups=QUERY_LOG_BACKUPS,
+                 queue_size=QUERY_LOG_QUEUE_SIZE, batch_size=BATCH_SIZE,
+                 flush_interval=FLUSH_INTERVAL):
+        self.directory = directory
+        self.enabled = enabled
+        self.max_bytes = max_bytes
+        self.backups = backups
+        self.batch_size = batch_size
+        self.flush_interval = flush_interval
+        self._queue = queue.Queue(maxsize=queue_size)
+        self._thread = None
+        self._start_lock = threading.Lock()
+        self.written = 0
+        self.dropped = 0
+        self.errors = 0
+
+    @property
+    def path(self):
+        return os.path.join(self.directory, LOG_NAME)
+
+    def record(self, question_lower, result, latency, engine):
+        """Enfileira uma pergunta respondida; nunca bloqueia"""
+        if not self.enabled:
+            return
+        if self._thread is None:
+            self._start()
+
+        source = result.sources[0] if result.sources else None
+        entry = (time.time(), question_lower, engine, result.stage,
+                 source.get("id") if source else None,
+                 source.get("topic") if source else None,
+                 result.score, latency)
+        try:
+            self._queue.put_nowait(entry)
+        except queue.Full:
+            self.dropped += 1
+            METRICS.count("blink_query_log_dropped_total")
+
+    def _start(self):
+        with self._start_lock:
+            if self._thread is None:
+                self._thread = threading.Thread(target=self._run, name="query-log", daemon=True)
+                self._thread.start()
+                atexit.register(self.close)
+
+    def close(self, timeout=5.0):
+        """Grava o que estiver na fila e encerra a thread"""
+        thread = self._thread
+        if thread is None:
+            return
+        try:
+            self._queue.put(_STOP, timeout=timeout)
+        except queue.Full:
+            pass
+        thread.join(timeout)
+        self._thread = None
+
+    def _run(self):
+        stopping = False
+        while not stopping:
+            item = self._queue.get()
+            if item is _STOP:
+                break
+
+            # Junta o que chegar até o lote encher ou o intervalo acabar
+            batch = [item]
+            deadline = time.monotonic() + self.flush_interval
+            while len(batch) < self.batch_size:
+                timeout = deadline - time.monotonic()
+                if timeout <= 0:
+                    break
+                try:
+                    item = self._queue.get(timeout=timeout)
+                except queue.Empty:
+                    break
+                if item is _STOP:
+                    stopping = True
+                    break
+                batch.append(item)
+
+            self._write(batch)
+
+    def _write(self, batch):
+        lines = []
+        for timestamp, question, engine, stage, qid, topic, score, latency in batch:
+            lines.append(json.dumps({
+                "timestamp": datetime.fromtimestamp(timestamp, timezone.utc).isoformat(timespec="milliseconds"),
+                "query": question,
+                "engine": engine,
+                "stage": stage,
+                "found": qid is not None,
+                "id": qid,
+                "topic": topic,
+                "score": round(score, 4),
+                "latency_ms": round(latency * 1000, 3),
+            }, ensure_ascii=False))
+
+        try:
+            os.makedirs(self.directory, exist_ok=True)
+            with open(self.path, "a", encoding="utf-8") as f:
+                f.write("\n".join(lines) + "\n")
+                size = f.tell()
+            self.written += len(batch)
+            if size >= self.max_bytes:
+                self._rotate()
+        except OSError:
+            self.errors += len(batch)
+
+    def _rotate(self):
+        """Renomeia o arquivo atual com data e hora e apaga os mais antigos"""
+        stamp = datetime.now(timezone.utc).strftime("%Y%m%dT%H%M%S%f")
+        os.replace(self.path, os.path.join(self.directory, f"queries.{stamp}.jsonl"))
+        rotated = rotated_files(self.directory)
+        for old in rotated[:max(0, len(rotated) - self.backups)]:
+            os.remove(old)
+
+    def stats(self):
+        """Contadores do registro"""
+        return {
+            "enabled": self.enabled,
+            "queued": self._queue.qsize(),
+            "written": self.written,
+            "dropped": self.dropped,
+            "errors": self.errors,
+        }
+
+
+# Registro do processo (compartilhado por todas as sessões)
+QUERY_LOG = QueryLog()
@@ -0,0 +1,340 @@
+"""
+Blink GPT - Busca semântica offline (vetores densos, só NumPy)
+Cada pergunta do manual, com tópico e resposta, vira um vetor de n-gramas de
+caracteres com hash, ponderado por IDF e reduzido por SVD (análise semântica
+latente). Palavras diferentes com o mesmo sentido no manual ("parcelar" e
+"parcelas", "fechar o caixa" e "fechamento de caixa") ficam próximas. Os
+vetores ficam em uma matriz float32 contígua e cada pergunta é pontuada com
+um único produto matriz-vetor.
+"""
+
+import os
+import zlib
+from collections import Counter
+from functools import lru_cache
+
+import numpy as np
+
+# Dimensão dos vetores (limitada pelo número de perguntas do manual)
+SEMANTIC_DIM = int(os.environ.get("BLINK_SEMANTIC_DIM", "64"))
+
+# n-gramas de caracteres por palavra e tamanho da tabela de hash (2^bits)
+NGRAM_SIZES = (3, 4)
+HASH_BITS = 18
+
+# Peso das palavras do tópico e da resposta em relação às da pergunta
+TOPIC_WEIGHT = 0.5
+ANSWER_WEIGHT = 0.5
+
+# SVD aleatorizada: colunas extras, iterações de potência e perguntas usadas
+# para aprender a projeção (manuais maiores usam uma amostra)
+OVERSAMPLE = 10
+POWER_ITERATIONS = 2
+SVD_SAMPLE = 10000
+
+# Documentos processados por vez na montagem da matriz TF-IDF
+BUILD_BLOCK = 5000
+
+TERM_CACHE_SIZE = 16384
+
+
+@lru_cache(maxsize=TERM_CACHE_SIZE)
+def term_features(term):
+    """Baldes de hash da palavra inteira e dos seus n-gramas de caracteres"""
+    padded = f"<{term}>"
+    grams = [f"w:{term}"]
+    for n in NGRAM_SIZES:
+        grams.extend(padded[i:i + n] for i in range(len(padded) - n + 1))
+    mask = (1 << HASH_BITS) - 1
+    # crc32 em vez de hash(): o mesmo balde em todo processo (e no disco)
+    return tuple(zlib.crc32(gram.encode("utf-8")) & mask for gram in grams)
+
+
+def _spmm(row_ids, col_ids, values, matrix, n_rows, max_cells=1 << 18):
+    """Produto esparsa x densa; row_ids em ordem crescente (formato coordenada)
+
+    As linhas são agrupadas pelo número de não nulos (formato ELL em fatias):
+    cada bloco de linhas de tamanho parecido vira uma matriz linhas x largura,
+    completada com zeros, e o produto do bloco é um único matmul em lote,
+    sem laço por linha. O bloco tem no máximo max_cells células da matriz
+    densa reunidas.
+    """
+    width = matrix.shape[1]
+    out = np.zeros((n_rows, width), dtype=np.float32)
+    counts = np.bincount(row_ids, minlength=n_rows)
+    indptr = np.zeros(n_rows + 1, dtype=np.int64)
+    np.cumsum(counts, out=indptr[1:])
+
+    # Linhas da mais curta para a mais longa; as vazias ficam zeradas
+    order = np.argsort(counts, kind="stable")
+    sizes = counts[order]
+    start = int(np.searchsorted(sizes, 1))
+    while start < n_rows:
+        stop = min(n_rows, start + max(1, max_cells // (width * int(sizes[start]))))
+        while stop - start > 1 and (stop - start) * int(sizes[stop - 1]) * width > max_cells:
+            stop = start + max(1, max_cells // (width * int(sizes[stop - 1])))
+        rows = order[start:stop]
+        offsets = np.arange(int(sizes[stop - 1]))
+        present = offsets < counts[rows, None]
+        cells = np.where(present, indptr[rows, None] + offsets, 0)
+        weights = np.where(present, values[cells], 0).astype(np.float32)
+        out[rows] = np.matmul(weights[:, None, :], matrix[col_ids[cells]])[:, 0]
+        start = stop
+    return out
+
+
+def _orthonormal(matrix):
+    return np.linalg.qr(matrix)[0].astype(np.float32)
+
+
+def _tfidf_matrix(documents, block_size=BUILD_BLOCK):
+    """Matriz documento x balde (formato coordenada, ordenada por documento)
+
+    Retorna (documentos, colunas, valores, baldes, idf). Cada campo vira um
+    TF-IDF de norma 1 multiplicado pelo peso do campo, então uma resposta
+    longa não abafa a pergunta. Os documentos são processados em blocos
+    (uma passada para o IDF, outra para os valores) para limitar a memória.
+    """
+    # Termos de cada campo (entrada = um campo de um documento), como ids
+    term_ids = {}
+    occurrence_terms = []
+    entry_sizes = []
+    entry_weights = []
+    doc_entries = [0]
+    for fields in documents:
+        for terms, weight in fields:
+            occurrence_terms.extend(term_ids.setdefault(term, len(term_ids)) for term in terms)
+            entry_sizes.append(len(terms))
+            entry_weights.append(weight)
+        doc_entries.append(len(entry_sizes))
+
+    # Colunas (baldes distintos) de cada termo, calculadas uma vez por termo
+    term_buckets = [term_features(term) for term in term_ids]
+    term_sizes = np.fromiter(map(len, term_buckets), dtype=np.int64, count=len(term_buckets))
+    term_indptr = np.zeros(len(term_buckets) + 1, dtype=np.int64)
+    np.cumsum(term_sizes, out=term_indptr[1:])
+    buckets, term_cols = np.unique(
+        np.fromiter((b for features in term_buckets for b in features), dtype=np.int64,
+                    count=int(term_indptr[-1])),
+        return_inverse=True)
+    n_cols = max(1, len(buckets))
+
+    occurrence_terms = np.array(occurrence_terms, dtype=np.int64)
+    entry_weights = np.array(entry_weights)
+    entry_docs = np.repeat(np.arange(len(documents)), np.diff(doc_entries))
+    entry_indptr = np.zeros(len(entry_sizes) + 1, dtype=np.int64)
+    np.cumsum(entry_sizes, out=entry_indptr[1:])
+
+    def block_counts(first_doc, last_doc):
+        """(entradas, colunas, contagens) do bloco, ordenados por entrada e coluna"""
+        first_entry, last_entry = doc_entries[first_doc], doc_entries[last_doc]
+        terms = occurrence_terms[entry_indptr[first_entry]:entry_indptr[last_entry]]
+        entries = np.repeat(np.arange(first_entry, last_entry), entry_sizes[first_entry:last_entry])
+        sizes = term_sizes[terms]
+        offsets = np.arange(int(sizes.sum())) - np.repeat(np.cumsum(sizes) - sizes, sizes)
+        keys = np.repeat(entries, sizes) * n_cols + term_cols[np.repeat(term_indptr[terms], sizes) + offsets]
+        keys, counts = _sorted_unique(keys)
+        return keys // n_cols, keys % n_cols, counts
+
+    blocks = [(start, min(start + block_size, len(documents)))
+              for start in range(0, len(documents), block_size)]
+
+    # 1ª passada: em quantos documentos aparece cada balde
+    df = np.zeros(n_cols, dtype=np.int64)
+    for first_doc, last_doc in blocks:
+        entries, cols, _ = block_counts(first_doc, last_doc)
+        doc_keys, _ = _sorted_unique(entry_docs[entries] * n_cols + cols)
+        df += np.bincount(doc_keys % n_cols, minlength=n_cols)
+    idf = np.log(1 + len(documents) / np.maximum(df, 1))
+
+    # 2ª passada: TF-IDF normalizado por campo, somando os campos de cada documento
+    doc_ids, doc_cols, doc_values = [], [], []
+    for first_doc, last_doc in blocks:
+        entries, cols, counts = block_counts(first_doc, last_doc)
+        values = counts * idf[cols]
+        local = entries - doc_entries[first_doc]
+        norms = np.sqrt(np.bincount(local, weights=values ** 2))
+        values *= (entry_weights[entries] / np.maximum(norms[local], 1e-12))
+
+        doc_keys, values = _sum_duplicates(entry_docs[entries] * n_cols + cols, values)
+        doc_ids.append((doc_keys // n_cols).astype(np.int32))
+        doc_cols.append((doc_keys % n_cols).astype(np.int32))
+        doc_values.append(values.astype(np.float32))
+
+    def joined(parts, dtype):
+        return np.concatenate(parts) if parts else np.empty(0, dtype=dtype)
+
+    return (joined(doc_ids, np.int32), joined(doc_cols, np.int32), joined(doc_values, np.float32),
+            buckets, idf.astype(np.float32))
+
+
+def _sum_duplicates(keys, values):
+    """Chaves distintas (em ordem) e a soma dos valores de cada uma"""
+    order = np.argsort(keys, kind="stable")
+    keys, values = keys[order], values[order]
+    if not len(keys):
+        return keys, values
+    firsts = np.flatnonzero(np.r_[True, keys[1:] != keys[:-1]])
+    return keys[firsts], np.add.reduceat(values, firsts)
+
+
+def _sorted_unique(keys):
+    """Valores distintos e contagens por ordenação (mais rápido que o hash de np.unique aqui)"""
+    keys = np.sort(keys)
+    if not len(keys):
+        return keys, np.empty(0, dtype=np.int64)
+    firsts = np.flatnonzero(np.r_[True, keys[1:] != keys[:-1]])
+    return keys[firsts], np.diff(np.r_[firsts, len(keys)])
+
+
+def _svd_projection(doc_ids, cols, values, n_docs, n_buckets, dim, rng):
+    """Vetores singulares à direita de X (balde x dim) por SVD aleatorizada (Halko et al.)"""
+    rank = min(dim + OVERSAMPLE, n_docs, n_buckets)
+    if rank == 0:
+        return np.zeros((n_buckets, 0), dtype=np.float32)
+
+    # A transposta (balde x documento) para X.T @ M
+    order = np.argsort(cols, kind="stable")
+    t_rows, t_cols, t_values = cols[order], doc_ids[order], values[order]
+
+    def x_dot(matrix):
+        return _spmm(doc_ids, cols, values, matrix, n_docs)
+
+    def xt_dot(matrix):
+        return _spmm(t_rows, t_cols, t_values, matrix, n_buckets)
+
+    # Base da imagem de X, refinada por iterações de potência, e SVD pequena
+    basis = _orthonormal(x_dot(rng.standard_normal((n_buckets, rank)).astype(np.float32)))
+    for _ in range(POWER_ITERATIONS):
+        basis = _orthonormal(x_dot(_orthonormal(xt_dot(basis))))
+    _, _, vt = np.linalg.svd(xt_dot(basis).T, full_matrices=False)
+    return np.ascontiguousarray(vt[:min(dim, rank)].T, dtype=np.float32)
+
+
+class SemanticIndex:
+    """Vetores densos das perguntas e projeção para vetorizar as consultas
+
+    buckets: baldes de hash vistos no manual (em ordem); idf e projection
+    têm uma linha por balde; vectors, uma linha de norma 1 por pergunta.
+    ann: índice aproximado (ann_index.IVFIndex) usado no lugar da busca
+    exata quando presente.
+    """
+
+    def __init__(self, buckets, idf, projection, vectors):
+        self.buckets = buckets
+        self.idf = idf
+        self.projection = projection
+        self.vectors = np.ascontiguousarray(vectors, dtype=np.float32)
+        self.n_docs, self.dim = self.vectors.shape
+        self.ann = None
+        # Balde fora do manual: IDF de um termo que não aparece em nenhuma pergunta
+        self.unseen_idf = float(np.log(1 + max(1, self.n_docs)))
+
+    @classmethod
+    def build(cls, documents, dim=SEMANTIC_DIM, sample_size=SVD_SAMPLE, seed=0):
+        """Constrói o índice; cada documento é uma lista de campos (termos, peso)"""
+        doc_ids, cols, values, buckets, idf = _tfidf_matrix(documents)
+        n_docs = len(documents)
+
+        # A projeção é aprendida em uma amostra; todas as perguntas são projetadas depois
+        rng = np.random.default_rng(seed)
+        if n_docs > sample_size:
+            sample = np.zeros(n_docs, dtype=bool)
+            sample[rng.choice(n_docs, sample_size, replace=False)] = True
+            keep = sample[doc_ids]
+            renumber = np.cumsum(sample) - 1
+            projection = _svd_projection(renumber[doc_ids[keep]], cols[keep], values[keep],
+                                         sample_size, len(buckets), dim, rng)
+        else:
+            projection = _svd_projection(doc_ids, cols, values, n_docs, len(buckets), dim, rng)
+
+        vectors = _spmm(doc_ids, cols, values, projection, n_docs)
+        vectors /= np.maximum(np.linalg.norm(vectors, axis=1, keepdims=True), 1e-12)
+        return cls(buckets, idf, projection, vectors)
+
+    def embed(self, weights):
+        """Vetor da consulta (termo -> peso), ou None se nenhum balde é conhecido
+
+        É a projeção do TF-IDF da consulta dividida pela norma do TF-IDF
+        inteiro: o produto com uma pergunta é o cosseno, descontada a parte da
+        consulta que o manual não conhece (palavras sem relação com nada).
+        """
+        features = []
+        term_weights = []
+        for term, weight in weights.items():
+            term_buckets = term_features(term)
+            features.extend(term_buckets)
+            term_weights.extend([weight] * len(term_buckets))
+        if not features or not len(self.buckets):
+            return None
+
+        features, inverse = np.unique(np.array(features, dtype=np.int64), return_inverse=True)
+        counts = np.bincount(inverse, weights=term_weights)
+        rows = np.minimum(np.searchsorted(self.buckets, features), len(self.buckets) - 1)
+        known = self.buckets[rows] == features
+
+        values = counts * np.where(known, self.idf[rows], self.unseen_idf)
+        norm = np.linalg.norm(values)
+        if not known.any() or norm == 0:
+            return None
+        return (values[known] / norm).astype(np.float32) @ self.projection[rows[known]]
+
+    def embed_documents(self, documents):
+        """Vetores de novas perguntas com a projeção atual, sem refazer a SVD
+
+        Cada campo é vetorizado como uma consulta (baldes que o manual não
+        conhecia ficam de fora) e os campos são somados com seus pesos.
+        """
+        vectors = np.zeros((len(documents), self.dim), dtype=np.float32)
+        for i, fields in enumerate(documents):
+            for terms, weight in fields:
+                field = self.embed(Counter(terms)) if terms else None
+                if field is not None:
+                    vectors[i] += weight * field
+        vectors /= np.maximum(np.linalg.norm(vectors, axis=1, keepdims=True), 1e-12)
+        return vectors
+
+    def top_k(self, weights, k=1):
+        """(posições, similaridades) das k perguntas mais próximas, da melhor para a pior"""
+        query = self.embed(weights)
+        if query is None or not self.n_docs:
+            return np.empty(0, dtype=np.int64), np.empty(0, dtype=np.float32)
+        if self.ann is not None:
+            return self.ann.search(query, k)
+
+        # Um único produto matriz-vetor sobre a matriz contígua
+        scores = self.vectors @ query
+        if k == 1:
+            # argmax devolve a primeira posição em caso de empate
+            best = np.array([int(scores.argmax())])
+        else:
+            k = min(k, self.n_docs)
+            best = np.argpartition(-scores, k - 1)[:k]
+            best = best[np.lexsort((best, -scores[best]))]
+        return best, scores[best]
+
+    def iter_batch_scores(self, query_weights, max_cells=1 << 16):
+        """Pontua várias consultas em blocos: (início do bloco, consultas x perguntas)
+
+        Mesma saída de BM25Index.iter_batch_scores, mas cada consulta é um
+        dicionário termo -> peso (o de expand_query). Com o índice
+        aproximado, só as perguntas candidatas de cada consulta são pontuadas
+        (as demais ficam com 0), então o lote responde igual à busca simples.
+        """
+        chunk_size = max(1, max_cells // max(1, self.n_docs))
+        for chunk_start in range(0, len(query_weights), chunk_size):
+            chunk = query_weights[chunk_start:chunk_start + chunk_size]
+            if self.ann is not None:
+                scores = np.zeros((len(chunk), self.n_docs), dtype=np.float32)
+                for i, weights in enumerate(chunk):
+                    positions, similarities = self.top_k(weights, 1)
+                    scores[i, positions] = similarities
+                yield chunk_start, scores
+                continue
+
+            queries = np.zeros((len(chunk), self.dim), dtype=np.float32)
+            for i, weights in enumerate(chunk):
+                query = self.embed(weights)
+                if query is not None:
+                    queries[i] = query
+            yield chunk_start, queries @ self.vectors.T
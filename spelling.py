@@ -0,0 +1,103 @@
+"""
+Blink GPT - Correção de erros de digitação (estilo SymSpell)
+Dicionário de deleções pré-calculado a partir do vocabulário do manual
+"""
+
+import sys
+from itertools import combinations
+
+MAX_DISTANCE = 2
+PREFIX_LENGTH = 7
+MIN_WORD_LENGTH = 4
+# Palavras a partir deste tamanho aceitam dois erros; as menores, só um
+LONG_WORD_LENGTH = 8
+
+
+def deletes(word, max_distance):
+    """Todas as variações de word com até max_distance letras removidas"""
+    variants = {word}
+    for distance in range(1, min(max_distance, len(word) - 1) + 1):
+        for removed in combinations(range(len(word)), distance):
+            variants.add("".join(char for i, char in enumerate(word) if i not in removed))
+    return variants
+
+
+def edit_distance(a, b, max_distance):
+    """Distância de Damerau-Levenshtein (transposição simples), limitada a max_distance + 1"""
+    if abs(len(a) - len(b)) > max_distance:
+        return max_distance + 1
+
+    previous2 = None
+    previous = list(range(len(b) + 1))
+    for i in range(1, len(a) + 1):
+        current = [i] + [0] * len(b)
+        for j in range(1, len(b) + 1):
+            cost = 0 if a[i - 1] == b[j - 1] else 1
+            current[j] = min(previous[j] + 1, current[j - 1] + 1, previous[j - 1] + cost)
+            if (i > 1 and j > 1 and a[i - 1] == b[j - 2] and a[i - 2] == b[j - 1]):
+                current[j] = min(current[j], previous2[j - 2] + 1)
+        if min(current) > max_distance:
+            return max_distance + 1
+        previous2, previous = previous, current
+    return previous[-1]
+
+
+class SpellCorrector:
+    """Corrige palavras fora do vocabulário em tempo ~constante por palavra
+
+    Cada palavra do vocabulário é indexada pelas suas deleções (do prefixo);
+    uma palavra digitada só é comparada com as palavras que compartilham
+    alguma deleção com ela.
+    """
+
+    def __init__(self, frequencies, max_distance=MAX_DISTANCE, prefix_length=PREFIX_LENGTH):
+        self.frequencies = frequencies
+        self.max_distance = max_distance
+        self.prefix_length = prefix_length
+        self.deletes = {}
+        for word in frequencies:
+            if len(word) < MIN_WORD_LENGTH or not word.isalpha():
+                continue
+            for variant in deletes(word[:prefix_length], max_distance):
+                self.deletes.setdefault(variant, []).append(word)
+
+    @property
+    def nbytes(self):
+        """Memória aproximada do dicionário de deleções e das frequências"""
+        size = sys.getsizeof(self.deletes) + sys.getsizeof(self.frequencies)
+        for variant, words in self.deletes.items():
+            size += sys.getsizeof(variant) + sys.getsizeof(words)
+        return size + sum(sys.getsizeof(word) for word in self.frequencies)
+
+    def allowed_distance(self, word):
+        # Palavras curtas e médias aceitam só um erro para evitar correções
+        # absurdas ("almoco" -> "bloco")
+        return 1 if len(word) < LONG_WORD_LENGTH else self.max_distance
+
+    def correct(self, word):
+        """Palavra do vocabulário mais próxima, ou None se não houver"""
+        if word in self.frequencies:
+            return word
+        if len(word) < MIN_WORD_LENGTH or not word.isalpha():
+            return None
+
+        max_distance = self.allowed_distance(word)
+        best = None
+        best_key = None
+        seen = set()
+        for variant in deletes(word[:self.prefix_length], max_distance):
+            for candidate in self.deletes.get(variant, ()):
+                if candidate in seen:
+                    continue
+                seen.add(candidate)
+                # Erros de digitação raramente trocam a primeira letra
+                if candidate[0] != word[0]:
+                    continue
+                distance = edit_distance(word, candidate, max_distance)
+                if distance > max_distance:
+                    continue
+                # Menor distância; empate: palavra mais frequente, depois ordem alfabética
+                key = (distance, -self.frequencies[candidate], candidate)
+                if best_key is None or key < best_key:
+                    best, best_key = candidate, key
+        return best
@@ -0,0 +1,184 @@
+"""
+Blink GPT - Radicalização de palavras em português (estilo RSLP)
+Regras de sufixo aplicadas sobre o texto já normalizado (sem acentos), para que
+"troca", "trocas" e "trocar" virem o mesmo radical.
+"""
+
+from functools import lru_cache
+
+# Tamanho do cache de radicais (palavras das perguntas digitadas)
+STEM_CACHE_SIZE = 16384
+
+# Regras: (sufixo, tamanho mínimo do radical, substituição, exceções)
+# Em cada passo vale a primeira regra (mais longa) que se aplicar.
+PLURAL_RULES = (
+    ("ns", 1, "m", ()),
+    ("oes", 3, "ao", ()),
+    ("aes", 1, "ao", ("maes",)),
+    ("ais", 1, "al", ("cais", "mais")),
+    ("eis", 2, "el", ()),
+    ("ois", 1, "ol", ("depois",)),
+    ("is", 2, "il", ("lapis", "cais", "mais", "crucis", "biquinis", "pois", "depois",
+                     "dois", "leis", "tenis", "gratis")),
+    ("les", 3, "l", ()),
+    ("res", 3, "r", ("ares", "pires")),
+    ("s", 2, "", ("alias", "pires", "lapis", "cais", "mais", "mas", "menos", "ferias",
+                  "fezes", "pesames", "gas", "atras", "atraves", "pais", "apos",
+                  "ambas", "ambos", "messias", "simples", "antes", "lados")),
+)
+
+FEMININE_RULES = (
+    ("ona", 3, "ao", ("abandona", "lona", "iona", "cortisona", "monotona", "maratona",
+                      "acetona", "detona", "carona")),
+    ("ora", 3, "or", ()),
+    ("inha", 3, "inho", ("rainha", "linha", "minha")),
+    ("esa", 3, "es", ("mesa", "obesa", "princesa", "turquesa", "ilesa", "pesa", "presa",
+                      "despesa", "empresa", "defesa", "surpresa")),
+    ("osa", 3, "oso", ("mucosa", "prosa")),
+    ("iaca", 3, "iaco", ()),
+    ("ica", 3, "ico", ("dica",)),
+    ("ada", 2, "ado", ("pitada", "entrada", "saida", "jornada", "estrada")),
+    ("ida", 3, "ido", ("vida", "duvida", "saida", "comida", "bebida", "ferida", "medida")),
+    ("ima", 3, "imo", ("vitima",)),
+    ("iva", 3, "ivo", ("saliva", "oliva")),
+    ("eira", 3, "eiro", ("beira", "cadeira", "frigideira", "bandeira", "feira", "capoeira",
+                         "barreira", "fronteira", "besteira", "poeira", "carteira")),
+)
+
+ADVERB_RULES = (
+    ("mente", 4, "", ("experimente",)),
+)
+
+AUGMENTATIVE_RULES = (
+    ("issimo", 3, "", ()),
+    ("issima", 3, "", ()),
+    ("zinho", 2, "", ()),
+    ("zinha", 2, "", ()),
+    ("inho", 3, "", ("caminho", "carinho", "cominho", "golfinho", "padrinho", "sobrinho",
+                     "vizinho", "espinho")),
+)
+
+NOUN_RULES = (
+    ("amentos", 3, "", ()),
+    ("imentos", 3, "", ()),
+    ("amento", 3, "", ()),
+    ("imento", 3, "", ()),
+    ("mento", 6, "", ("firmamento",)),
+    ("alizado", 4, "", ()),
+    ("izacao", 5, "", ()),
+    ("acao", 3, "", ("educacao",)),
+    ("icao", 3, "", ()),
+    ("cao", 3, "", ()),
+    ("idade", 4, "", ("autoridade", "comunidade")),
+    ("ancia", 3, "", ("ambulancia",)),
+    ("encia", 3, "", ()),
+    ("agem", 3, "", ("coragem", "chantagem", "vantagem", "carruagem")),
+    ("ismo", 3, "", ("cinismo",)),
+    ("ista", 4, "", ("lista", "vista", "pista", "revista")),
+    ("avel", 2, "", ("movel",)),
+    ("ivel", 5, "", ()),
+    ("ador", 3, "", ()),
+    ("edor", 3, "", ()),
+    ("idor", 4, "", ("ouvidor",)),
+    ("ativo", 4, "", ()),
+    ("tivo", 4, "", ("relativo",)),
+    ("ivo", 4, "", ()),
+    ("eza", 3, "", ()),
+    ("ado", 2, "", ("grado",)),
+    ("ido", 3, "", ("vido",)),
+)
+
+VERB_RULES = (
+    ("ariamos", 2, "", ()),
+    ("eriamos", 3, "", ()),
+    ("iriamos", 3, "", ()),
+    ("assemos", 2, "", ()),
+    ("essemos", 3, "", ()),
+    ("issemos", 3, "", ()),
+    ("aremos", 2, "", ()),
+    ("eremos", 3, "", ()),
+    ("iremos", 3, "", ()),
+    ("avamos", 2, "", ()),
+    ("aramos", 2, "", ()),
+    ("ando", 2, "", ()),
+    ("endo", 3, "", ()),
+    ("indo", 3, "", ()),
+    ("arao", 2, "", ()),
+    ("erao", 3, "", ()),
+    ("irao", 3, "", ()),
+    ("aram", 2, "", ()),
+    ("eram", 3, "", ()),
+    ("iram", 3, "", ()),
+    ("avam", 2, "", ()),
+    ("arem", 2, "", ()),
+    ("erem", 3, "", ()),
+    ("irem", 3, "", ()),
+    ("asse", 2, "", ()),
+    ("esse", 3, "", ()),
+    ("isse", 3, "", ()),
+    ("aria", 3, "", ()),
+    ("eria", 3, "", ()),
+    ("iria", 3, "", ()),
+    ("ava", 2, "", ()),
+    ("ar", 2, "", ()),
+    ("er", 2, "", ()),
+    ("ir", 3, "", ()),
+    ("am", 2, "", ()),
+    ("em", 2, "", ()),
+    ("ou", 3, "", ()),
+    ("eu", 3, "", ()),
+    ("iu", 3, "", ()),
+)
+
+VOWEL_RULES = (
+    ("a", 3, "", ()),
+    ("e", 3, "", ()),
+    ("o", 3, "", ()),
+)
+
+RULES = {
+    "plural": PLURAL_RULES,
+    "feminine": FEMININE_RULES,
+    "adverb": ADVERB_RULES,
+    "augmentative": AUGMENTATIVE_RULES,
+    "noun": NOUN_RULES,
+    "verb": VERB_RULES,
+    "vowel": VOWEL_RULES,
+}
+
+
+def apply_rules(word, rules):
+    """Aplica a primeira regra que servir; retorna (palavra, aplicou)"""
+    for suffix, min_stem, replacement, exceptions in rules:
+        if (word.endswith(suffix) and len(word) - len(suffix) >= min_stem
+                and word not in exceptions):
+            return word[:len(word) - len(suffix)] + replacement, True
+    return word, False
+
+
+def stem_uncached(word):
+    """Radical de uma palavra normalizada (minúsculas, sem acentos)"""
+    if len(word) <= 3 or not word.isalpha():
+        return word
+
+    if word.endswith("s"):
+        word, _ = apply_rules(word, PLURAL_RULES)
+    if word.endswith("a"):
+        word, _ = apply_rules(word, FEMININE_RULES)
+    word, _ = apply_rules(word, ADVERB_RULES)
+    word, _ = apply_rules(word, AUGMENTATIVE_RULES)
+
+    word, changed = apply_rules(word, NOUN_RULES)
+    if not changed:
+        word, changed = apply_rules(word, VERB_RULES)
+        if not changed:
+            word, _ = apply_rules(word, VOWEL_RULES)
+    return word
+
+
+stem = lru_cache(maxsize=STEM_CACHE_SIZE)(stem_uncached)
+
+
+def stem_words(words):
+    """Conjunto de radicais de um conjunto de palavras"""
+    return {stem(word) for word in words}
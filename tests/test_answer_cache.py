@@ -0,0 +1,33 @@
+"""
+Blink GPT - Testes do cache de respostas e da exposição dos seus contadores
+"""
+
+import os
+import sys
+
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+sys.path.insert(0, ROOT)
+
+from answer_cache import AnswerCache  # noqa: E402
+from metrics import Metrics  # noqa: E402
+
+
+def test_versions_never_share_entries():
+    cache = AnswerCache(max_size=2)
+    cache.put("pergunta", "v1", "resposta antiga")
+    assert cache.get("pergunta", "v2") is None
+    assert cache.get("pergunta", "v1") == "resposta antiga"
+    cache.put("outra", "v2", 1)
+    cache.put("mais uma", "v2", 2)
+    stats = cache.stats()
+    assert (stats["hits"], stats["misses"], stats["evictions"], stats["size"]) == (1, 1, 1, 2)
+
+
+def test_collectors_appear_in_render_even_when_disabled():
+    cache = AnswerCache()
+    cache.get("pergunta", "v1")
+    metrics = Metrics(enabled=False)
+    metrics.add_collector(lambda: {"blink_answer_cache_misses_total": cache.stats()["misses"]})
+    text = metrics.render()
+    assert "# TYPE blink_answer_cache_misses_total counter" in text
+    assert "blink_answer_cache_misses_total 1" in text
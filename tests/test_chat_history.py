@@ -0,0 +1,41 @@
+"""
+Blink GPT - Testes do histórico de conversa
+Só respostas vindas do manual são marcadas como atualizadas
+"""
+
+import os
+import sys
+
+import pytest
+
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+sys.path.insert(0, ROOT)
+
+import qa_engine  # noqa: E402
+from chat_history import ChatMessage, answer_message, resolve_message  # noqa: E402
+
+
+@pytest.fixture(scope="module")
+def qa_data():
+    cwd = os.getcwd()
+    os.chdir(ROOT)
+    try:
+        yield qa_engine.load_corpus()
+    finally:
+        os.chdir(cwd)
+
+
+def test_hit_is_updated_only_after_manual_change(qa_data):
+    msg = answer_message(qa_engine.match_question("como trocar produto", qa_data, cache=None), qa_data)
+    answer, _, updated = resolve_message(msg, qa_data)
+    assert answer != qa_engine.NOT_FOUND_ANSWER
+    assert not updated
+    msg.version = "versao-antiga"
+    assert resolve_message(msg, qa_data)[2]
+
+
+@pytest.mark.parametrize("stage, answer", [("miss", qa_engine.NOT_FOUND_ANSWER),
+                                           ("blocked", qa_engine.IRRELEVANT_ANSWER)])
+def test_default_answers_are_never_updated(qa_data, stage, answer):
+    msg = ChatMessage("assistant", stage=stage, version="versao-antiga")
+    assert resolve_message(msg, qa_data) == (answer, None, False)
@@ -0,0 +1,47 @@
+"""
+Blink GPT - Testes do registro de manuais
+A memória estimada inclui os índices construídos no primeiro uso
+"""
+
+import os
+import shutil
+import sys
+
+import pytest
+
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+sys.path.insert(0, ROOT)
+
+from corpus_registry import CorpusRegistry, estimate_size  # noqa: E402
+
+
+@pytest.fixture
+def registry(tmp_path, monkeypatch):
+    # Blocklist e sinônimos são lidos de caminhos relativos à raiz
+    monkeypatch.chdir(ROOT)
+    for name in ("a", "b"):
+        shutil.copy(os.path.join(ROOT, "data", "qa_data.json"), tmp_path / f"{name}.json")
+    registry = CorpusRegistry(default_path=None, manuals_dir=str(tmp_path), hot_reload=False)
+    yield registry
+    registry.close()
+
+
+def test_lazy_builds_are_counted(registry):
+    qa_data = registry.get("a")
+    before = estimate_size(qa_data)
+    index = qa_data["index"]
+    index.bm25, index.speller, index.semantic
+    assert estimate_size(qa_data) > before + index.semantic.vectors.nbytes + index.speller.nbytes
+
+
+def test_lazy_build_triggers_eviction(registry):
+    qa_data = registry.get("a")
+    registry.get("b")
+    registry.memory_budget = sum(size for _, size, _ in registry._loaded.values()) + 1
+    assert registry.loaded() == ["a", "b"]
+
+    qa_data["index"].speller
+    assert registry.get("a") is qa_data
+    assert registry.loaded() == ["a"]
+    assert registry.evictions == 1
+    assert registry.stats()["loaded_mb"]["a"] * 1024 * 1024 == pytest.approx(estimate_size(qa_data), abs=1e4)
@@ -0,0 +1,35 @@
+"""
+Blink GPT - Testes da recarga automática do manual
+O manual novo só é publicado com os índices do primeiro uso já construídos
+"""
+
+import json
+import os
+import shutil
+import sys
+
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+sys.path.insert(0, ROOT)
+
+from corpus_reloader import CorpusReloader  # noqa: E402
+
+
+def test_reload_publishes_warm_index(tmp_path, monkeypatch):
+    # Blocklist e sinônimos são lidos de caminhos relativos à raiz
+    monkeypatch.chdir(ROOT)
+    path = tmp_path / "qa_data.json"
+    shutil.copy(os.path.join(ROOT, "data", "qa_data.json"), path)
+    reloader = CorpusReloader(str(path))
+    old = reloader.current()
+
+    data = json.loads(path.read_text(encoding="utf-8"))
+    data["questions"] = data["questions"][:-1]
+    path.write_text(json.dumps(data, ensure_ascii=False), encoding="utf-8")
+    os.utime(path, ns=(0, 0))
+
+    assert reloader.check()
+    index = reloader.current()["index"]
+    assert reloader.current() is not old
+    assert index._speller is not None
+    assert index._bm25 is not None
+    assert index._semantic is not None
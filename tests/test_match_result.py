@@ -0,0 +1,51 @@
+"""
+Blink GPT - Testes do formato das respostas (MatchResult e ask_question)
+As fontes são sempre dicionários do JSON, com ou sem correção ortográfica
+"""
+
+import json
+import os
+import sys
+
+import pytest
+
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+sys.path.insert(0, ROOT)
+
+import qa_engine  # noqa: E402
+
+
+@pytest.fixture(scope="module")
+def qa_data():
+    cwd = os.getcwd()
+    os.chdir(ROOT)
+    try:
+        yield qa_engine.load_corpus()
+    finally:
+        os.chdir(cwd)
+
+
+@pytest.mark.parametrize("question", ["como trocar produto", "como funciona o pagamnto em cheqe"])
+def test_sources_are_json_dicts(qa_data, question):
+    _, sources = qa_engine.ask_question(question, qa_data, cache=None)
+    _, batch_sources = qa_engine.ask_questions([question], qa_data)[0]
+    assert sources == batch_sources
+    for source in sources:
+        assert type(source) is dict
+        assert set(source) - {"corrections"} == {"id", "topic", "question", "answer"}
+    json.dumps(sources)
+
+
+def test_corrections_in_sources(qa_data):
+    _, sources = qa_engine.ask_question("como funciona o pagamnto em cheqe", qa_data, cache=None)
+    assert sources[0]["corrections"] == {"pagamnto": "pagamento", "cheqe": "cheque"}
+    _, sources = qa_engine.ask_question("como trocar produto", qa_data, cache=None)
+    assert "corrections" not in sources[0]
+
+
+def test_miss_keeps_corrections(qa_data):
+    question = "zzzz fechamnto xyzw plugh abcd"
+    result = qa_engine.match_question(question, qa_data, cache=None)
+    assert result.stage == "miss"
+    assert result.corrections == {"fechamnto": "fechamento"}
+    assert qa_engine.match_questions([question], qa_data)[0].corrections == {"fechamnto": "fechamento"}
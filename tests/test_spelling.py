@@ -0,0 +1,57 @@
+"""
+Blink GPT - Testes do corretor ortográfico
+Palavras fora do manual não podem virar palavras sem relação com elas
+"""
+
+import os
+import sys
+
+import pytest
+
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+sys.path.insert(0, ROOT)
+
+import qa_engine  # noqa: E402
+from spelling import SpellCorrector  # noqa: E402
+
+
+@pytest.fixture(scope="module")
+def qa_data():
+    # Os caminhos do manual, da blocklist e dos sinônimos são relativos à raiz
+    cwd = os.getcwd()
+    os.chdir(ROOT)
+    try:
+        yield qa_engine.load_corpus()
+    finally:
+        os.chdir(cwd)
+
+
+def test_medium_word_accepts_one_edit_only():
+    speller = SpellCorrector({"bloco": 3, "pagamento": 5, "fechamento": 2})
+    assert speller.correct("almoco") is None
+    assert speller.correct("pagamnto") == "pagamento"
+    assert speller.correct("fechamnto") == "fechamento"
+
+
+def test_first_letter_must_match():
+    speller = SpellCorrector({"cheque": 1})
+    assert speller.correct("xheque") is None
+    assert speller.correct("cheqe") == "cheque"
+
+
+@pytest.mark.parametrize("engine", qa_engine.ENGINES)
+def test_out_of_vocabulary_question_still_misses(qa_data, engine):
+    question = "qual o horário de almoço"
+    result = qa_engine.match_question(question, qa_data, engine, cache=None)
+    assert result.stage == "miss"
+    assert result.corrections == {}
+    assert qa_engine.match_questions([question], qa_data, engine)[0].stage == "miss"
+
+
+@pytest.mark.parametrize("engine", ("overlap", "bm25"))
+def test_corrected_word_scores_below_exact_match(qa_data, engine):
+    typo = qa_engine.match_question("como fazer o fechamnto de caixa", qa_data, engine, cache=None)
+    exact = qa_engine.match_question("como fazer o fechamento de caixa", qa_data, engine, cache=None)
+    assert typo.corrections == {"fechamnto": "fechamento"}
+    assert typo.sources[0]["id"] == exact.sources[0]["id"]
+    assert typo.score < exact.score == 1.0
@@ -0,0 +1,45 @@
+"""
+Blink GPT - Índice de trigramas para busca por substring
+Usado na busca de sugestões (sidebar e celular) e no fallback de ask_question
+"""
+
+
+def trigrams(text):
+    """Conjunto de trigramas de caracteres do texto"""
+    return {text[i:i + 3] for i in range(len(text) - 2)}
+
+
+class TrigramIndex:
+    """Trigrama -> posições dos textos que o contêm (em ordem crescente)"""
+
+    def __init__(self, texts, postings=None):
+        self.texts = texts
+        if postings is None:
+            postings = {}
+            for pos, text in enumerate(texts):
+                for gram in trigrams(text):
+                    postings.setdefault(gram, []).append(pos)
+        self.postings = postings
+
+    def iter_search(self, query):
+        """Posições (em ordem) dos textos que contêm query como substring"""
+        if len(query) < 3:
+            # Busca curta demais para trigramas: os textos já estão normalizados
+            candidates = range(len(self.texts))
+        else:
+            lists = sorted((self.postings.get(gram, ()) for gram in trigrams(query)), key=len)
+            found = set(lists[0])
+            for posting in lists[1:]:
+                if not found:
+                    return
+                found.intersection_update(posting)
+            candidates = sorted(found)
+
+        # Trigramas em comum não garantem a substring: confirma no texto
+        for pos in candidates:
+            if query in self.texts[pos]:
+                yield pos
+
+    def search(self, query):
+        """Lista das posições dos textos que contêm query"""
+        return list(self.iter_search(query))
@@ -17,6 +17,8 @@ def check_files():
         "README.md": "Documentação",
         ".gitignore": "Configuração Git",
         "data/qa_data.json": "Base de dados Q&A",
+        "data/blocklist.txt": "Padrões de perguntas bloqueadas",
+        "data/synonyms.json": "Sinônimos da busca",
         ".streamlit/config.toml": "Configuração Streamlit"
     }
     
@@ -58,6 +60,59 @@ def check_json_data():
         print(f"  ❌ Erro ao validar JSON: {str(e)}")
         return False
 
+def check_near_duplicates():
+    """Procura perguntas e respostas quase iguais (MinHash + LSH)"""
+    print("\n🔁 Verificando perguntas quase iguais...")
+    
+    try:
+        from near_duplicates import THRESHOLD, duplicate_report, print_report
+        
+        with open("data/qa_data.json", "r", encoding="utf-8") as f:
+            questions = json.load(f).get("questions", [])
+        report = duplicate_report(questions)
+    except Exception as e:
+        print(f"  ❌ Erro ao verificar duplicatas: {str(e)}")
+        return False
+    
+    if not any(report.values()):
+        print(f"  ✅ Nenhuma pergunta ou resposta quase igual (similaridade ≥ {THRESHOLD})")
+        return True
+    
+    print_report(report, limit=5, indent="  ")
+    print(f"\n  Relatório completo: python near_duplicates.py")
+    
+    # Perguntas quase iguais disputam a mesma busca; respostas iguais são só aviso
+    if report["question"]:
+        print(f"  ❌ Junte ou diferencie as perguntas quase iguais")
+        return False
+    print(f"  ⚠️  Respostas quase iguais: confira se não são a mesma pergunta")
+    return True
+
+def check_blocklist():
+    """Garante que nenhuma pergunta do manual cai na lista de bloqueio"""
+    print("\n🚫 Verificando lista de bloqueio...")
+    
+    try:
+        from qa_engine import blocked_pattern, normalize_text
+        
+        with open("data/qa_data.json", "r", encoding="utf-8") as f:
+            questions = json.load(f).get("questions", [])
+        hits = [(q.get("id"), q.get("question", ""), blocked_pattern(normalize_text(q.get("question", ""))))
+                for q in questions]
+    except Exception as e:
+        print(f"  ❌ Erro ao verificar lista de bloqueio: {str(e)}")
+        return False
+    
+    hits = [hit for hit in hits if hit[2] is not None]
+    if not hits:
+        print(f"  ✅ Nenhuma pergunta do manual é bloqueada")
+        return True
+    
+    for qid, question, pattern in hits:
+        print(f"  ❌ Q{qid}: \"{question}\" bloqueada por \"{pattern}\"")
+    print(f"  Ajuste data/blocklist.txt: essas perguntas nunca seriam respondidas")
+    return False
+
 def check_python_packages():
     """Verifica se os pacotes Python estão instalados"""
     print("\n📦 Verificando pacotes Python...")
@@ -65,6 +120,7 @@ def check_python_packages():
     required_packages = {
         "streamlit": "Framework web",
         "pandas": "Manipulação de dados",
+        "numpy": "Ranqueamento BM25",
         "openpyxl": "Suporte Excel"
     }
     
@@ -113,6 +169,8 @@ def main():
     results = {
         "Arquivos": check_files(),
         "Dados JSON": check_json_data(),
+        "Duplicatas": check_near_duplicates(),
+        "Lista de bloqueio": check_blocklist(),
         "Pacotes Python": check_python_packages(),
         "Git Repository": check_git_repo()
     }